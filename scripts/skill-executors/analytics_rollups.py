@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+"""
+Incremental Analytics Rollups for HeadElf
+
+Keeps one small aggregate file per day (decision counts by role and type,
+confidence sum/count and distribution) that is updated as each decision
+is persisted. Analytics for any time range merge the daily partials, so
+they cost O(days) instead of re-reading every decision in the window.
+"""
+
+import json
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional
+
+from write_journal import atomic_write
+
+COMPLETE_MARKER = ".complete"
+
+
+def empty_rollup() -> Dict[str, Any]:
+    """Get an aggregate with no decisions in it."""
+    return {
+        'total': 0,
+        'by_role': {},
+        'decision_types': {},
+        'confidence_sum': 0.0,
+        'confidence_count': 0,
+        'confidence_distribution': {}
+    }
+
+
+def add_decision(rollup: Dict[str, Any], decision: Dict[str, Any]) -> Dict[str, Any]:
+    """Fold one decision into an aggregate in place."""
+    role = decision.get('executive_role', 'unknown')
+    decision_type = decision.get('decision_type', 'unknown')
+
+    rollup['total'] += 1
+    rollup['by_role'][role] = rollup['by_role'].get(role, 0) + 1
+    rollup['decision_types'][decision_type] = rollup['decision_types'].get(decision_type, 0) + 1
+
+    if 'confidence' in decision:
+        confidence = decision.get('confidence', 0.0)
+        bucket = str(round(confidence, 1))
+        rollup['confidence_sum'] += confidence
+        rollup['confidence_count'] += 1
+        rollup['confidence_distribution'][bucket] = rollup['confidence_distribution'].get(bucket, 0) + 1
+
+    return rollup
+
+
+def merge_rollups(rollups: Iterable[Dict[str, Any]]) -> Dict[str, Any]:
+    """Merge daily partial aggregates into one."""
+    merged = empty_rollup()
+    for rollup in rollups:
+        merged['total'] += rollup['total']
+        merged['confidence_sum'] += rollup['confidence_sum']
+        merged['confidence_count'] += rollup['confidence_count']
+        for field in ('by_role', 'decision_types', 'confidence_distribution'):
+            for key, count in rollup[field].items():
+                merged[field][key] = merged[field].get(key, 0) + count
+    return merged
+
+
+def aggregate(decisions: Iterable[Dict[str, Any]]) -> Dict[str, Any]:
+    """Aggregate decisions from scratch."""
+    rollup = empty_rollup()
+    for decision in decisions:
+        add_decision(rollup, decision)
+    return rollup
+
+
+class DailyRollups:
+    """Per-day decision aggregates stored as one JSON file per day."""
+
+    def __init__(self, rollups_dir: Path):
+        self.rollups_dir = Path(rollups_dir)
+        self.rollups_dir.mkdir(parents=True, exist_ok=True)
+        self.marker_path = self.rollups_dir / COMPLETE_MARKER
+        self._marker_uncommitted = False
+
+    @property
+    def complete(self) -> bool:
+        """Whether every stored decision is covered, so ranges can be served from rollups."""
+        return self.marker_path.exists()
+
+    def mark_complete(self) -> None:
+        """Mark the rollups as covering every stored decision."""
+        self.marker_path.write_text("")
+        self._marker_uncommitted = True
+
+    def path(self, day: str) -> Path:
+        return self.rollups_dir / f"{day}.json"
+
+    def load(self, day: str) -> Optional[Dict[str, Any]]:
+        """Get a day's aggregate, or None if no decisions were rolled up that day."""
+        path = self.path(day)
+        if not path.exists():
+            return None
+        try:
+            return json.loads(path.read_text())
+        except (json.JSONDecodeError, Exception) as e:
+            print(f"Error reading analytics rollup {path}: {e}")
+            return None
+
+    def record(self, decision: Dict[str, Any]) -> List[Path]:
+        """Fold a persisted decision into its day's aggregate. Returns the files to commit."""
+        day = decision['timestamp'].split('T')[0]
+        rollup = add_decision(self.load(day) or empty_rollup(), decision)
+        atomic_write(self.path(day), json.dumps(rollup, indent=2, sort_keys=True))
+
+        written = [self.path(day)]
+        if self._marker_uncommitted:
+            written.append(self.marker_path)
+            self._marker_uncommitted = False
+        return written
+
+    def rebuild_day(self, day: str, decisions: Iterable[Dict[str, Any]]) -> Path:
+        """Recompute one day's aggregate from that day's decisions. Returns the file written or removed."""
+        rollup = aggregate(decisions)
+        if rollup['total']:
+            atomic_write(self.path(day), json.dumps(rollup, indent=2, sort_keys=True))
+        elif self.path(day).exists():
+            self.path(day).unlink()
+        return self.path(day)
+
+    def merge_days(self, days: Iterable[str]) -> Dict[str, Any]:
+        """Merge the aggregates of the given days."""
+        return merge_rollups(rollup for rollup in (self.load(day) for day in days) if rollup)
+
+    def monthly_totals(self) -> Dict[str, int]:
+        """Get the number of rolled-up decisions per month ("YYYY-MM")."""
+        totals: Dict[str, int] = {}
+        for path in self.rollups_dir.glob("*.json"):
+            rollup = self.load(path.stem)
+            if rollup:
+                totals[path.stem[:7]] = totals.get(path.stem[:7], 0) + rollup['total']
+        return totals
+
+    def backfill(self, decisions: Iterable[Dict[str, Any]]) -> List[Path]:
+        """Rebuild every daily aggregate from scratch. Returns the files written or removed."""
+        by_day: Dict[str, Dict[str, Any]] = {}
+        for decision in decisions:
+            day = decision.get('timestamp', '').split('T')[0]
+            if day:
+                add_decision(by_day.setdefault(day, empty_rollup()), decision)
+
+        stale = [path for path in self.rollups_dir.glob("*.json") if path.stem not in by_day]
+        for path in stale:
+            path.unlink()
+
+        for day, rollup in by_day.items():
+            atomic_write(self.path(day), json.dumps(rollup, indent=2, sort_keys=True))
+
+        self.mark_complete()
+        self._marker_uncommitted = False
+        return [self.path(day) for day in sorted(by_day)] + stale + [self.marker_path]
@@ -0,0 +1,47 @@
+#!/usr/bin/env python3
+"""
+Bounded Executor for Blocking Persistence I/O
+
+Runs synchronous filesystem work (reads, writes, directory listings,
+SQLite lookups) issued from the async persistence API on a dedicated,
+bounded thread pool, so a large history scan never stalls the event loop
+that executors and other coroutines share.
+"""
+
+import asyncio
+import functools
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Optional, TypeVar
+
+T = TypeVar("T")
+
+DEFAULT_IO_WORKERS = 4
+
+
+class BlockingIOExecutor:
+    """Bounded thread pool for filesystem work issued from async code."""
+
+    def __init__(self, max_workers: int = DEFAULT_IO_WORKERS):
+        """
+        Args:
+            max_workers: Maximum concurrent blocking operations; further
+                operations queue until a worker is free
+        """
+        self.max_workers = max(1, max_workers)
+        self._executor: Optional[ThreadPoolExecutor] = None
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="headelf-io")
+        return self._executor
+
+    async def run(self, func: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+        """Run a blocking callable on the pool and await its result."""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._get_executor(), functools.partial(func, *args, **kwargs))
+
+    def shutdown(self) -> None:
+        """Wait for running operations and release the worker threads."""
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
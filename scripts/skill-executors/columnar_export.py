@@ -0,0 +1,153 @@
+#!/usr/bin/env python3
+"""
+Columnar Decision Export for HeadElf Analytics
+
+Compacts the analytics-relevant decision fields (timestamp, role, type,
+confidence, user, session) into one columnar file per month, so BI and
+trend jobs run vectorized scans instead of parsing thousands of decision
+JSON files. Partitions are written as Parquet when pyarrow is installed
+and as NumPy ``.npz`` archives otherwise; both dependencies are optional.
+"""
+
+import json
+import os
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional
+
+from write_journal import atomic_write
+
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    np = None
+    NUMPY_AVAILABLE = False
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+    PYARROW_AVAILABLE = True
+except ImportError:
+    pa = None
+    pq = None
+    PYARROW_AVAILABLE = False
+
+STRING_COLUMNS = ('id', 'executive_role', 'decision_type', 'user_id', 'session_id')
+EXPORT_COLUMNS = ('timestamp', 'confidence') + STRING_COLUMNS
+COLUMN_DTYPES = {'timestamp': 'datetime64[us]', 'confidence': 'float64', **{column: 'U' for column in STRING_COLUMNS}}
+FORMAT_SUFFIXES = {'parquet': '.parquet', 'npz': '.npz'}
+
+
+def default_format() -> Optional[str]:
+    """Pick the best columnar format the installed libraries support."""
+    if PYARROW_AVAILABLE:
+        return 'parquet'
+    if NUMPY_AVAILABLE:
+        return 'npz'
+    return None
+
+
+class ColumnarDecisionExport:
+    """Month-partitioned columnar export of decision fields."""
+
+    def __init__(self, export_dir: Path, export_format: Optional[str] = None):
+        self.export_dir = Path(export_dir)
+        self.format = export_format or default_format()
+        if self.format not in (None, *FORMAT_SUFFIXES):
+            raise ValueError(f"Unknown columnar format: {self.format}")
+        if self.format == 'parquet' and not PYARROW_AVAILABLE:
+            raise ImportError("pyarrow is required for the parquet export format")
+        if self.format and not NUMPY_AVAILABLE:
+            raise ImportError("numpy is required for the columnar export")
+
+        self.manifest_path = self.export_dir / "manifest.json"
+
+    @property
+    def available(self) -> bool:
+        """Whether a columnar library is installed."""
+        return self.format is not None
+
+    def partition_path(self, month: str) -> Path:
+        return self.export_dir / f"{month}{FORMAT_SUFFIXES[self.format]}"
+
+    def load_manifest(self) -> Dict[str, int]:
+        """Get the exported row count per month."""
+        if not self.manifest_path.exists():
+            return {}
+        return json.loads(self.manifest_path.read_text())
+
+    def _columns(self, decisions: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """Convert decisions, sorted by timestamp, into NumPy columns."""
+        decisions = sorted(decisions, key=lambda decision: decision.get('timestamp', ''))
+        timestamps = [decision.get('timestamp', '').rstrip('Z').split('+')[0] for decision in decisions]
+
+        columns = {
+            'timestamp': np.array(timestamps, dtype=COLUMN_DTYPES['timestamp']),
+            'confidence': np.array(
+                [float(decision['confidence']) if 'confidence' in decision else np.nan for decision in decisions],
+                dtype=COLUMN_DTYPES['confidence']
+            )
+        }
+        for column in STRING_COLUMNS:
+            columns[column] = np.array([str(decision.get(column, '')) for decision in decisions],
+                                       dtype=COLUMN_DTYPES[column])
+        return columns
+
+    def write_partition(self, month: str, decisions: List[Dict[str, Any]]) -> Path:
+        """Write (replace) one month's partition atomically."""
+        self.export_dir.mkdir(parents=True, exist_ok=True)
+        columns = self._columns(decisions)
+        path = self.partition_path(month)
+        temp_path = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+
+        if self.format == 'parquet':
+            table = pa.table({
+                'timestamp': pa.array(columns['timestamp'], type=pa.timestamp('us', tz='UTC')),
+                'confidence': pa.array(columns['confidence'], from_pandas=True),
+                **{column: pa.array(columns[column].tolist(), type=pa.string()) for column in STRING_COLUMNS}
+            })
+            pq.write_table(table, temp_path, compression='zstd')
+        else:
+            with open(temp_path, "wb") as f:
+                np.savez_compressed(f, **columns)
+
+        os.replace(temp_path, path)
+
+        manifest = self.load_manifest()
+        manifest[month] = len(decisions)
+        atomic_write(self.manifest_path, json.dumps(manifest, indent=2, sort_keys=True))
+        return path
+
+    def read(self, months: Optional[Iterable[str]] = None) -> Dict[str, Any]:
+        """
+        Load the exported columns as NumPy arrays, concatenated across months.
+
+        Reads every exported month unless ``months`` narrows the scan.
+        """
+        months = sorted(months) if months is not None else sorted(self.load_manifest())
+        parts: Dict[str, List[Any]] = {column: [] for column in EXPORT_COLUMNS}
+
+        for month in months:
+            path = self.partition_path(month)
+            if not path.exists():
+                continue
+
+            if self.format == 'parquet':
+                table = pq.read_table(path)
+                part = {
+                    'timestamp': table.column('timestamp').to_numpy().astype('datetime64[us]'),
+                    'confidence': table.column('confidence').to_numpy(zero_copy_only=False),
+                    **{column: np.array(table.column(column).to_pylist(), dtype=COLUMN_DTYPES[column])
+                       for column in STRING_COLUMNS}
+                }
+            else:
+                with np.load(path) as archive:
+                    part = {column: archive[column] for column in EXPORT_COLUMNS}
+
+            for column in EXPORT_COLUMNS:
+                parts[column].append(part[column])
+
+        return {
+            column: np.concatenate(arrays) if arrays else np.array([], dtype=COLUMN_DTYPES[column])
+            for column, arrays in parts.items()
+        }
@@ -0,0 +1,264 @@
+#!/usr/bin/env python3
+"""
+Write-Coalescing User Context Store for HeadElf
+
+Keeps user contexts in memory and merges updates into the cached copy,
+tracking which users have unflushed changes. Dirty contexts are written
+and committed together once the flush window closes or enough users are
+dirty, so a burst of decisions from one user costs one file write and one
+commit per window instead of one per decision. Without a flush window the
+store writes every update through, as the persistence layer always did.
+
+The cache alone does not survive a crash, so an update may carry a token
+(the persist's write-ahead journal entry). Tokens are handed to
+``on_written`` only once the user's context holding that update has been
+written and committed; until then the journal entry stays open and is
+replayed if the process dies first. A flush whose commit fails keeps its
+users dirty and its tokens held for the next flush. The last-chance write
+at interpreter exit keeps its tokens open, so the next start commits those
+contexts.
+
+A coalescing store serves reads and merges from its own cache and never
+re-reads a cached context, so it must be the only writer of its users'
+contexts: run at most one coalescing process per data directory. Without
+a flush window every update re-reads the stored context, and callers
+holding a per-user lock may share the directory between processes.
+"""
+
+import asyncio
+import atexit
+import copy
+import datetime
+import json
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Set
+
+from blocking_io import BlockingIOExecutor
+from write_journal import atomic_write, fsync_paths
+
+CommitFunction = Callable[[List[Path], str], Awaitable[Optional[str]]]
+WrittenCallback = Callable[[List[str]], None]
+
+
+class UserContextStore:
+    """User contexts with an in-memory write-back cache and dirty tracking."""
+
+    def __init__(self, users_dir: Path, io: BlockingIOExecutor, commit_fn: CommitFunction,
+                 flush_interval: Optional[float] = None, max_dirty: int = 64,
+                 on_written: Optional[WrittenCallback] = None, sync: bool = False):
+        """
+        Args:
+            users_dir: Directory holding one ``<user_id>.json`` per user
+            io: Executor running the blocking file reads and writes
+            commit_fn: Coroutine committing (file_paths, message) on flush
+            flush_interval: Seconds the first unflushed update waits before
+                a flush; None writes every update through immediately
+            max_dirty: Flush as soon as this many users have unflushed updates
+            on_written: Called on an executor thread with the tokens of
+                updates whose context has been written and committed
+            sync: Fsync context files once written
+        """
+        self.users_dir = Path(users_dir)
+        self.io = io
+        self.commit_fn = commit_fn
+        self.flush_interval = flush_interval
+        self.max_dirty = max(1, max_dirty)
+        self.on_written = on_written
+        self.sync = sync
+
+        self._cache: Dict[str, Dict[str, Any]] = {}
+        self._dirty: Set[str] = set()
+        self._tokens: Dict[str, List[str]] = {}
+        self._flush_lock = asyncio.Lock()
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._flush_task: Optional[asyncio.Task] = None
+
+        self.flushes = 0
+        self.writes = 0
+
+        if self.coalescing:
+            # Last-chance write of unflushed contexts if the process exits without close()
+            atexit.register(self.flush_to_disk)
+
+    @property
+    def coalescing(self) -> bool:
+        """Whether updates are held in memory until the next flush."""
+        return self.flush_interval is not None
+
+    @property
+    def dirty(self) -> Set[str]:
+        """Users whose cached context has not been written yet."""
+        return set(self._dirty)
+
+    def path(self, user_id: str) -> Path:
+        return self.users_dir / f"{user_id}.json"
+
+    def _read(self, user_id: str) -> Optional[Dict[str, Any]]:
+        """Read a user context file, or None if the user has none."""
+        context_path = self.path(user_id)
+        if not context_path.exists():
+            return None
+
+        try:
+            return json.loads(context_path.read_text())
+        except (json.JSONDecodeError, Exception) as e:
+            print(f"Error reading user context for {user_id}: {e}")
+            return None
+
+    def _write(self, contexts: Dict[str, Dict[str, Any]]) -> List[Path]:
+        """Write contexts through a temp file and rename, so a crash never leaves a torn file."""
+        self.users_dir.mkdir(parents=True, exist_ok=True)
+        written = [
+            atomic_write(self.path(user_id), json.dumps(context, indent=2, ensure_ascii=False))
+            for user_id, context in contexts.items()
+        ]
+        self.writes += len(written)
+        if self.sync:
+            fsync_paths(written)
+        return written
+
+    async def _release(self, tokens: List[str]) -> None:
+        """Hand back the tokens of updates that are now written and committed."""
+        if tokens and self.on_written is not None:
+            await self.io.run(self.on_written, tokens)
+
+    def _take_tokens(self, user_ids: List[str]) -> Dict[str, List[str]]:
+        """Take the tokens of the cached updates held for some users."""
+        return {user_id: self._tokens.pop(user_id) for user_id in user_ids if user_id in self._tokens}
+
+    def _restore(self, user_ids: List[str], taken: Dict[str, List[str]]) -> None:
+        """Mark users dirty again and hand back their taken tokens, ahead of newer ones."""
+        self._dirty.update(user_ids)
+        for user_id, tokens in taken.items():
+            self._tokens[user_id] = tokens + self._tokens.get(user_id, [])
+
+    async def get(self, user_id: str) -> Optional[Dict[str, Any]]:
+        """Get a copy of a user's context, including unflushed updates."""
+        if user_id in self._cache:
+            return copy.deepcopy(self._cache[user_id])
+
+        context = await self.io.run(self._read, user_id)
+        if context is not None and self.coalescing:
+            self._cache.setdefault(user_id, context)
+            context = self._cache[user_id]
+        return copy.deepcopy(context)
+
+    async def update(self, user_id: str, updates: Dict[str, Any], default: Optional[Dict[str, Any]] = None,
+                     replace: bool = False, token: Optional[str] = None) -> Optional[Path]:
+        """
+        Merge updates into a user's context (or replace it with ``replace``).
+
+        ``default`` seeds users without a stored context. ``token`` is
+        handed to ``on_written`` once this update is written (through, or by
+        the flush that commits it). Returns the file written when updates
+        are written through, or None when the update is held for the next
+        flush.
+        """
+        context = {} if replace else (await self.get(user_id) or copy.deepcopy(default or {}))
+        context.update(updates)
+        context['user_id'] = user_id
+        context['last_updated'] = datetime.datetime.utcnow().isoformat() + "Z"
+
+        if not self.coalescing:
+            # The caller commits the written file along with its own changes
+            context_path = (await self.io.run(self._write, {user_id: context}))[0]
+            await self._release([token] if token else [])
+            return context_path
+
+        self._cache[user_id] = context
+        self._dirty.add(user_id)
+        if token:
+            self._tokens.setdefault(user_id, []).append(token)
+
+        loop = asyncio.get_running_loop()
+        if len(self._dirty) >= self.max_dirty:
+            self._schedule_flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.flush_interval, self._schedule_flush)
+        return None
+
+    async def write(self, user_id: str, context: Dict[str, Any]) -> Path:
+        """Write a user's full context immediately; the caller commits it."""
+        context = {**context, 'user_id': user_id, 'last_updated': datetime.datetime.utcnow().isoformat() + "Z"}
+        tokens: List[str] = []
+        if self.coalescing:
+            self._cache[user_id] = context
+            self._dirty.discard(user_id)
+            tokens = self._take_tokens([user_id]).get(user_id, [])
+        context_path = (await self.io.run(self._write, {user_id: copy.deepcopy(context)}))[0]
+        await self._release(tokens)
+        return context_path
+
+    def recover(self, user_id: str, updates: Dict[str, Any], default: Optional[Dict[str, Any]] = None) -> Optional[Path]:
+        """
+        Re-apply a journaled decision's context updates at startup.
+
+        Skipped when the stored context already reflects a later decision,
+        so replaying the same entry twice is harmless. Returns the file
+        written, if any.
+        """
+        context = self._read(user_id) or dict(default or {})
+        stored_count = context.get('decision_count')
+        if isinstance(stored_count, int) and stored_count > updates.get('decision_count', 0):
+            return None
+
+        context.update(updates)
+        context['user_id'] = user_id
+        context.setdefault('last_updated', datetime.datetime.utcnow().isoformat() + "Z")
+        self._cache.pop(user_id, None)
+        return self._write({user_id: context})[0]
+
+    def _schedule_flush(self) -> None:
+        """Start a background flush of the dirty contexts."""
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        self._flush_task = asyncio.ensure_future(self.flush())
+
+    async def flush(self) -> List[Path]:
+        """Write every dirty context and commit them together. Returns the files written."""
+        async with self._flush_lock:
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+
+            dirty, self._dirty = sorted(self._dirty), set()
+            if not dirty:
+                return []
+
+            contexts = {user_id: copy.deepcopy(self._cache[user_id]) for user_id in dirty}
+            taken = self._take_tokens(dirty)
+            try:
+                context_paths = await self.io.run(self._write, contexts)
+            except Exception as e:
+                # Keep the updates dirty so the next flush retries them
+                print(f"Error writing user contexts: {e}")
+                self._restore(dirty, taken)
+                return []
+
+            message = (f"Update user context: {dirty[0]}" if len(dirty) == 1
+                       else f"Update user contexts: {len(dirty)} users")
+            if await self.commit_fn(context_paths, message) is None:
+                # Written but not committed: the journal entries stay open
+                print(f"Error committing user contexts: {', '.join(dirty)}")
+                self._restore(dirty, taken)
+                return context_paths
+            await self._release([token for tokens in taken.values() for token in tokens])
+            self.flushes += 1
+            return context_paths
+
+    def flush_to_disk(self) -> List[Path]:
+        """Synchronously write dirty contexts without committing (for interpreter exit)."""
+        dirty, self._dirty = sorted(self._dirty), set()
+        if not dirty:
+            return []
+        # Tokens stay held: these contexts are not committed
+        return self._write({user_id: self._cache[user_id] for user_id in dirty})
+
+    async def close(self) -> None:
+        """Flush outstanding updates, e.g. on shutdown."""
+        await self.flush()
+        if self._flush_task is not None and not self._flush_task.done():
+            await self._flush_task
+        if self.coalescing:
+            atexit.unregister(self.flush_to_disk)
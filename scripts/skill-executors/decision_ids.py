@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""
+Time-Ordered Decision IDs for HeadElf
+
+Decision ids are ULIDs: a 48-bit millisecond timestamp followed by 80
+random bits, written as 26 Crockford base32 characters. Ids sort
+lexicographically in creation order, so a day's decision files, the view
+indexes and the log index can be walked newest first by id alone instead
+of reading and sorting every decision.
+
+Within a process the generator is monotonic: ids issued in the same
+millisecond (or after the clock steps back) increment the previous id's
+random part rather than drawing a new one, under a lock shared by all
+threads. Separate processes draw their own random bits, so their ids stay
+unique and are ordered to the millisecond; a forked child starts afresh
+instead of continuing its parent's sequence.
+"""
+
+import datetime
+import os
+import re
+import threading
+import time
+from typing import Callable, Optional
+
+ENCODING = "0123456789ABCDEFGHJKMNPQRSTVWXYZ"
+ID_LENGTH = 26
+TIME_LENGTH = 10
+RANDOM_BITS = 80
+RANDOM_MAX = (1 << RANDOM_BITS) - 1
+TIME_MAX = (1 << 48) - 1
+
+DECISION_ID_PATTERN = r"[0-7][0-9A-HJKMNP-TV-Z]{25}"
+_DECISION_ID = re.compile(f"^{DECISION_ID_PATTERN}$")
+_UNIX_EPOCH = datetime.datetime(1970, 1, 1)
+
+
+def _encode(value: int, length: int) -> str:
+    chars = []
+    for _ in range(length):
+        value, index = divmod(value, 32)
+        chars.append(ENCODING[index])
+    return "".join(reversed(chars))
+
+
+def _now_ms() -> int:
+    return time.time_ns() // 1_000_000
+
+
+class MonotonicIdGenerator:
+    """Thread-safe generator of lexicographically increasing ULIDs."""
+
+    def __init__(self, clock: Optional[Callable[[], int]] = None):
+        """
+        Args:
+            clock: Returns the current Unix time in milliseconds
+        """
+        self.clock = clock or _now_ms
+        self.reset()
+
+    def reset(self) -> None:
+        """Forget the last id issued, e.g. in a freshly forked child."""
+        self._lock = threading.Lock()
+        self._last_ms = -1
+        self._last_random = 0
+
+    def new_id(self) -> str:
+        """Issue an id greater than every id this generator issued before."""
+        with self._lock:
+            now = self.clock()
+            if now > self._last_ms:
+                random_part = int.from_bytes(os.urandom(RANDOM_BITS // 8), 'big')
+            elif self._last_random < RANDOM_MAX:
+                # Same millisecond, or the clock stepped back
+                now, random_part = self._last_ms, self._last_random + 1
+            else:
+                # Random part exhausted: borrow the next millisecond
+                now, random_part = self._last_ms + 1, int.from_bytes(os.urandom(RANDOM_BITS // 8), 'big')
+
+            if now > TIME_MAX:
+                raise ValueError(f"Timestamp {now} does not fit a decision id")
+            self._last_ms, self._last_random = now, random_part
+
+        return _encode(now, TIME_LENGTH) + _encode(random_part, ID_LENGTH - TIME_LENGTH)
+
+
+_generator = MonotonicIdGenerator()
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_generator.reset)
+
+
+def new_decision_id() -> str:
+    """Issue a time-ordered decision id from the process-wide generator."""
+    return _generator.new_id()
+
+
+def is_decision_id(value: object) -> bool:
+    """Check whether a value is a time-ordered decision id."""
+    return isinstance(value, str) and _DECISION_ID.match(value) is not None
+
+
+def decision_id_ms(decision_id: str) -> int:
+    """Get the Unix time in milliseconds a decision id was issued at."""
+    if not is_decision_id(decision_id):
+        raise ValueError(f"Not a time-ordered decision id: {decision_id!r}")
+    value = 0
+    for char in decision_id[:TIME_LENGTH]:
+        value = value * 32 + ENCODING.index(char)
+    return value
+
+
+def decision_id_time(decision_id: str) -> datetime.datetime:
+    """Get the (naive UTC) time a decision id was issued at."""
+    return _UNIX_EPOCH + datetime.timedelta(milliseconds=decision_id_ms(decision_id))
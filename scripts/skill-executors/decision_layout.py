@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+"""
+Partitioned Decision Directory Layout for HeadElf
+
+Decision files live under ``YYYY/MM/DD/<shard>/`` below the decisions
+directory, where the shard is the leading hex digit(s) of a hash of the
+file name. No directory grows without bound, Git tree objects stay small,
+and a date-range read only lists the day directories the range overlaps.
+Flat files from the earlier layout stay readable until they are migrated.
+File names end in the decision id, so time-ordered ids order a day's
+files without reading them.
+"""
+
+import hashlib
+import os
+import re
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional
+
+from decision_ids import DECISION_ID_PATTERN, decision_id_time, is_decision_id
+
+SHARD_WIDTH = 1
+DAY_GLOB = "[0-9][0-9][0-9][0-9]/[0-9][0-9]/[0-9][0-9]"
+DATED_NAME = re.compile(r"^\d{4}-\d{2}-\d{2}-")
+ID_SUFFIX = re.compile(f"-({DECISION_ID_PATTERN})\\.json$")
+
+
+def decision_file_name(decision: Dict[str, Any]) -> str:
+    """Get a decision's file name: ``<date>-<role>-<id>.json``."""
+    date_str = decision['timestamp'].split('T')[0]
+    executive_role = decision.get('executive_role', 'unknown').lower()
+    return f"{date_str}-{executive_role}-{decision['id']}.json"
+
+
+def name_decision_id(name: str) -> Optional[str]:
+    """Get the time-ordered id a decision file is named after, if it has one."""
+    match = ID_SUFFIX.search(name)
+    return match.group(1) if match else None
+
+
+class PartitionedLayout:
+    """Maps decision files to year/month/day/shard partitions."""
+
+    def __init__(self, decisions_dir: Path, shard_width: int = SHARD_WIDTH):
+        self.decisions_dir = Path(decisions_dir)
+        self.shard_width = shard_width
+
+    def shard(self, name: str) -> str:
+        return hashlib.sha1(name.encode('utf-8')).hexdigest()[:self.shard_width]
+
+    def relative_path(self, name: str) -> str:
+        """Get the partitioned path of a decision file name, relative to the decisions directory."""
+        return f"{name[0:4]}/{name[5:7]}/{name[8:10]}/{self.shard(name)}/{name}"
+
+    def path(self, name: str) -> Path:
+        return self.decisions_dir / self.relative_path(name)
+
+    def day_dir(self, day: str) -> Path:
+        return self.decisions_dir / day[0:4] / day[5:7] / day[8:10]
+
+    def days(self, first_day: Optional[str] = None, last_day: Optional[str] = None) -> List[str]:
+        """
+        List days ("YYYY-MM-DD") holding partitioned decisions, newest first.
+
+        Only year and month directories overlapping the range are listed.
+        """
+        def overlaps(prefix: str) -> bool:
+            return (not first_day or prefix >= first_day[:len(prefix)]) and \
+                (not last_day or prefix <= last_day[:len(prefix)])
+
+        days = []
+        for year_dir in sorted(self.decisions_dir.glob("[0-9][0-9][0-9][0-9]"), reverse=True):
+            if not overlaps(year_dir.name):
+                continue
+            for month_dir in sorted(year_dir.glob("[0-9][0-9]"), reverse=True):
+                month = f"{year_dir.name}-{month_dir.name}"
+                if not overlaps(month):
+                    continue
+                days += [
+                    f"{month}-{day_dir.name}"
+                    for day_dir in sorted(month_dir.glob("[0-9][0-9]"), reverse=True)
+                    if overlaps(f"{month}-{day_dir.name}")
+                ]
+        return days
+
+    def day_files(self, day_dir: Path) -> List[Path]:
+        """List the decision files of one day partition."""
+        return list(day_dir.glob("*/*.json"))
+
+    def flat_files(self) -> Iterator[Path]:
+        """Yield decision files still stored flat, awaiting migration."""
+        return (path for path in self.decisions_dir.glob("*.json") if DATED_NAME.match(path.name))
+
+    def all_files(self) -> Iterator[Path]:
+        """Yield every decision file, flat or partitioned."""
+        yield from self.flat_files()
+        yield from self.decisions_dir.glob(f"{DAY_GLOB}/*/*.json")
+
+    def find(self, decision_id: str) -> Optional[Path]:
+        """Find a decision's file by id; a time-ordered id names the day partition to look in first."""
+        pattern = f"*-{decision_id}.json"
+        if is_decision_id(decision_id):
+            day = decision_id_time(decision_id).date().isoformat()
+            found = next(self.day_dir(day).glob(f"*/{pattern}"), None)
+            if found:
+                return found
+        return next(self.decisions_dir.glob(f"{DAY_GLOB}/*/{pattern}"), None) or \
+            next(self.decisions_dir.glob(pattern), None)
+
+    def resolve(self, path: Path) -> Path:
+        """Locate a decision file recorded under its flat or partitioned location, whichever exists now."""
+        for candidate in (path, self.path(path.name), self.decisions_dir / path.name):
+            if candidate.exists():
+                return candidate
+        return path
+
+    def current_entry(self, entry: str) -> str:
+        """Map a view entry recorded before migration to the file's partitioned path."""
+        if "/" in entry or not DATED_NAME.match(entry) or (self.decisions_dir / entry).exists():
+            return entry
+        return self.relative_path(entry)
+
+    def migrate(self, limit: Optional[int] = None) -> Dict[str, str]:
+        """
+        Move flat decision files into their partitions.
+
+        Moves at most ``limit`` files per call, each with an atomic rename.
+        Returns the moved files as {old relative path: new relative path}.
+        """
+        moved = {}
+        for path in sorted(self.flat_files()):
+            if limit and len(moved) >= limit:
+                break
+            target = self.path(path.name)
+            target.parent.mkdir(parents=True, exist_ok=True)
+            os.replace(path, target)
+            moved[path.name] = self.relative_path(path.name)
+        return moved
@@ -0,0 +1,419 @@
+#!/usr/bin/env python3
+"""
+Append-Only Decision Log for HeadElf
+
+Storage backend for GitPersistenceManager that appends decisions to
+segmented JSONL files and keeps a local SQLite index of their location.
+Filtered history queries become indexed lookups instead of directory
+scans, while the log segments themselves stay under Git for the audit
+trail. The index is derived data and is rebuilt from the segments when
+missing or behind.
+
+Records are immutable, so the Git commit that captured a decision is
+learned only after its append. Commit hashes go to an append-only
+``commits.jsonl`` sidecar next to the segments, which is committed with
+the following decisions; a rebuilt index restores them from it.
+"""
+
+import base64
+import datetime
+import json
+import os
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from process_lock import exclusive_file_lock
+
+SEGMENT_PREFIX = "segment-"
+SEGMENT_SUFFIX = ".jsonl"
+DEFAULT_SEGMENT_MAX_BYTES = 8 * 1024 * 1024
+COMMITS_FILE = "commits.jsonl"
+
+INDEX_SCHEMA = """
+CREATE TABLE IF NOT EXISTS decisions (
+    id TEXT PRIMARY KEY,
+    user_id TEXT,
+    executive_role TEXT,
+    decision_type TEXT,
+    timestamp TEXT,
+    epoch REAL,
+    segment TEXT NOT NULL,
+    offset INTEGER NOT NULL,
+    length INTEGER NOT NULL,
+    git_commit_hash TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_decisions_epoch ON decisions(epoch, id);
+CREATE INDEX IF NOT EXISTS idx_decisions_user ON decisions(user_id, epoch, id);
+CREATE INDEX IF NOT EXISTS idx_decisions_role ON decisions(executive_role, epoch, id);
+CREATE INDEX IF NOT EXISTS idx_decisions_type ON decisions(decision_type, epoch, id);
+CREATE TABLE IF NOT EXISTS segments (
+    name TEXT PRIMARY KEY,
+    indexed_bytes INTEGER NOT NULL
+);
+"""
+
+
+def parse_timestamp(timestamp: str) -> datetime.datetime:
+    """Parse a HeadElf ISO timestamp ("...Z" or with offset) to an aware datetime."""
+    parsed = datetime.datetime.fromisoformat(timestamp.replace('Z', '+00:00'))
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=datetime.timezone.utc)
+    return parsed
+
+
+def timestamp_epoch(timestamp: Optional[str]) -> Optional[float]:
+    """Convert a HeadElf ISO timestamp to epoch seconds, or None if unparseable."""
+    if not timestamp:
+        return None
+    try:
+        return parse_timestamp(timestamp).timestamp()
+    except ValueError:
+        return None
+
+
+def history_key(decision: Dict[str, Any]) -> Tuple[float, str]:
+    """Get the (epoch, id) key decision history is ordered by, newest first."""
+    return timestamp_epoch(decision.get('timestamp')) or 0.0, str(decision.get('id', ''))
+
+
+def encode_cursor(decision: Dict[str, Any]) -> str:
+    """Encode a resumable history cursor positioned after a decision."""
+    return base64.urlsafe_b64encode(json.dumps(list(history_key(decision))).encode('utf-8')).decode('ascii')
+
+
+def decode_cursor(cursor: Optional[str]) -> Optional[Tuple[float, str]]:
+    """Decode a history cursor into the (epoch, id) key to resume after."""
+    if not cursor:
+        return None
+    try:
+        epoch, decision_id = json.loads(base64.urlsafe_b64decode(cursor.encode('ascii')))
+        return float(epoch), str(decision_id)
+    except (ValueError, TypeError) as e:
+        raise ValueError(f"Invalid history cursor: {cursor}") from e
+
+
+class DecisionLog:
+    """Segmented JSONL decision log with an embedded SQLite index."""
+
+    def __init__(self, log_dir: Path, index_path: Optional[Path] = None,
+                 segment_max_bytes: int = DEFAULT_SEGMENT_MAX_BYTES):
+        self.log_dir = Path(log_dir)
+        self.index_path = Path(index_path) if index_path else self.log_dir / "index.sqlite"
+        self.segment_max_bytes = segment_max_bytes
+        self.commits_path = self.log_dir / COMMITS_FILE
+        self.log_dir.mkdir(parents=True, exist_ok=True)
+
+        self._lock = threading.RLock()
+        self._segment: Optional[Path] = None
+        self._connection = sqlite3.connect(str(self.index_path), check_same_thread=False)
+        self._connection.executescript(INDEX_SCHEMA)
+        self.truncate_torn_tail()
+        self.catch_up()
+
+    def segment_paths(self) -> List[Path]:
+        """Get log segment files in append order."""
+        return sorted(self.log_dir.glob(f"{SEGMENT_PREFIX}*{SEGMENT_SUFFIX}"))
+
+    def _active_segment(self) -> Path:
+        """Get the segment to append to, rotating once it reaches the size limit."""
+        if self._segment is None:
+            segments = self.segment_paths()
+            self._segment = segments[-1] if segments else self.log_dir / f"{SEGMENT_PREFIX}{1:06d}{SEGMENT_SUFFIX}"
+
+        if self._segment.exists() and self._segment.stat().st_size >= self.segment_max_bytes:
+            number = int(self._segment.name[len(SEGMENT_PREFIX):-len(SEGMENT_SUFFIX)]) + 1
+            self._segment = self.log_dir / f"{SEGMENT_PREFIX}{number:06d}{SEGMENT_SUFFIX}"
+
+        return self._segment
+
+    def append(self, decision: Dict[str, Any]) -> Path:
+        """Append a decision record to the log and index it. Returns the segment written."""
+        line = (json.dumps(decision, ensure_ascii=False, separators=(',', ':')) + "\n").encode('utf-8')
+
+        with self._lock:
+            segment = self._active_segment()
+            # Other processes may append to the same segment
+            with open(segment, "ab") as f, exclusive_file_lock(f):
+                offset = f.seek(0, os.SEEK_END)
+                f.write(line)
+
+            self._index_record(decision, segment.name, offset, len(line))
+            self._connection.execute(
+                "INSERT OR REPLACE INTO segments (name, indexed_bytes) VALUES (?, ?)",
+                (segment.name, offset + len(line))
+            )
+            self._connection.commit()
+
+        return segment
+
+    def _index_record(self, decision: Dict[str, Any], segment: str, offset: int, length: int) -> None:
+        """Insert or update the index row for one log record, keeping any known commit hash."""
+        self._connection.execute(
+            "INSERT INTO decisions "
+            "(id, user_id, executive_role, decision_type, timestamp, epoch, segment, offset, length, git_commit_hash) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?) "
+            "ON CONFLICT(id) DO UPDATE SET user_id = excluded.user_id, executive_role = excluded.executive_role, "
+            "decision_type = excluded.decision_type, timestamp = excluded.timestamp, epoch = excluded.epoch, "
+            "segment = excluded.segment, offset = excluded.offset, length = excluded.length",
+            (
+                decision.get('id'),
+                decision.get('user_id'),
+                str(decision.get('executive_role', 'unknown')).lower(),
+                decision.get('decision_type'),
+                decision.get('timestamp'),
+                timestamp_epoch(decision.get('timestamp')),
+                segment,
+                offset,
+                length,
+                decision.get('git_commit_hash')
+            )
+        )
+
+    def truncate_torn_tail(self) -> int:
+        """
+        Cut an unterminated record off the newest segment and the commits sidecar.
+
+        Only an append interrupted by a crash leaves one: appends write whole
+        lines under the file's lock, which is held here too. Removing it
+        keeps the next append on a line of its own. Returns the bytes removed.
+        """
+        segments = self.segment_paths()
+        tails = segments[-1:] + ([self.commits_path] if self.commits_path.exists() else [])
+        return sum(self._truncate_torn_tail(path) for path in tails)
+
+    def _truncate_torn_tail(self, path: Path) -> int:
+        # Hold the lock appends take, so a live writer's append is never cut off
+        with self._lock, open(path, "r+b") as f, exclusive_file_lock(f):
+            size = f.seek(0, 2)
+            if size == 0:
+                return 0
+            f.seek(size - 1)
+            if f.read(1) == b"\n":
+                return 0
+            f.seek(0)
+            keep = f.read().rfind(b"\n") + 1
+            f.truncate(keep)
+            return size - keep
+
+    def catch_up(self) -> int:
+        """
+        Index records appended to segments since the index last saw them.
+
+        Covers a missing or deleted index as well as a crash between the
+        append and the index update. A trailing partial line is left
+        unindexed. Commit hashes recorded since are restored from the
+        commits sidecar. Returns the number of records indexed.
+        """
+        indexed = 0
+        with self._lock:
+            known = dict(self._connection.execute("SELECT name, indexed_bytes FROM segments"))
+
+            for segment in self.segment_paths():
+                start = known.get(segment.name, 0)
+                if segment.stat().st_size <= start:
+                    continue
+
+                with open(segment, "rb") as f:
+                    f.seek(start)
+                    offset = start
+                    for line in f:
+                        if not line.endswith(b"\n"):
+                            break
+                        try:
+                            self._index_record(json.loads(line), segment.name, offset, len(line))
+                            indexed += 1
+                        except json.JSONDecodeError as e:
+                            print(f"Skipping corrupt record in {segment.name} at {offset}: {e}")
+                        offset += len(line)
+
+                self._connection.execute(
+                    "INSERT OR REPLACE INTO segments (name, indexed_bytes) VALUES (?, ?)",
+                    (segment.name, offset)
+                )
+
+            self._catch_up_commits(known.get(COMMITS_FILE, 0))
+            self._connection.commit()
+
+        return indexed
+
+    def _catch_up_commits(self, start: int) -> None:
+        """Apply commit hashes appended to the commits sidecar past ``start``."""
+        if not self.commits_path.exists() or self.commits_path.stat().st_size <= start:
+            return
+
+        hashes = []
+        with open(self.commits_path, "rb") as f:
+            f.seek(start)
+            offset = start
+            for line in f:
+                if not line.endswith(b"\n"):
+                    break
+                try:
+                    entry = json.loads(line)
+                    hashes.append((entry['git_commit_hash'], entry['id']))
+                except (json.JSONDecodeError, KeyError) as e:
+                    print(f"Skipping corrupt entry in {COMMITS_FILE} at {offset}: {e}")
+                offset += len(line)
+
+        self._connection.executemany("UPDATE decisions SET git_commit_hash = ? WHERE id = ?", hashes)
+        self._connection.execute(
+            "INSERT OR REPLACE INTO segments (name, indexed_bytes) VALUES (?, ?)", (COMMITS_FILE, offset)
+        )
+
+    def rebuild_index(self) -> int:
+        """Drop the index and rebuild it from the log segments."""
+        with self._lock:
+            self._connection.execute("DELETE FROM decisions")
+            self._connection.execute("DELETE FROM segments")
+            self._connection.commit()
+            return self.catch_up()
+
+    def set_commit_hash(self, decision_ids: Iterable[str], commit_hash: str) -> Path:
+        """
+        Record the Git commit that captured the given decisions.
+
+        Appends them to the commits sidecar and updates the index. Returns
+        the sidecar, for the caller to commit with its next changes.
+        """
+        hashes = [(commit_hash, decision_id) for decision_id in decision_ids]
+        lines = b"".join(
+            (json.dumps({'id': decision_id, 'git_commit_hash': commit_hash}, separators=(',', ':')) + "\n").encode('utf-8')
+            for commit_hash, decision_id in hashes
+        )
+
+        with self._lock:
+            # Other processes may record their commits at the same time
+            with open(self.commits_path, "ab") as f, exclusive_file_lock(f):
+                end = f.seek(0, os.SEEK_END) + f.write(lines)
+
+            self._connection.executemany("UPDATE decisions SET git_commit_hash = ? WHERE id = ?", hashes)
+            self._connection.execute(
+                "INSERT OR REPLACE INTO segments (name, indexed_bytes) VALUES (?, ?)", (COMMITS_FILE, end)
+            )
+            self._connection.commit()
+
+        return self.commits_path
+
+    def _build_query(self, filters: Dict[str, Any],
+                     after: Optional[Tuple[float, str]] = None) -> Tuple[str, List[Any]]:
+        """Translate history filters (and a resume position) into an indexed SQL lookup."""
+        clauses = []
+        params: List[Any] = []
+
+        if after is not None:
+            # Row-value comparison seeks the (epoch, id) indexes instead of sorting ties
+            clauses.append("(epoch, id) < (?, ?)")
+            params.extend([after[0], after[1]])
+
+        if filters.get('user_id'):
+            clauses.append("user_id = ?")
+            params.append(filters['user_id'])
+        if filters.get('executive_role'):
+            clauses.append("executive_role = ?")
+            params.append(filters['executive_role'].lower())
+        if filters.get('decision_type'):
+            clauses.append("decision_type = ?")
+            params.append(filters['decision_type'])
+
+        date_range = filters.get('date_range') or {}
+        if date_range.get('start'):
+            clauses.append("epoch >= ?")
+            params.append(timestamp_epoch(date_range['start']))
+        if date_range.get('end'):
+            clauses.append("epoch <= ?")
+            params.append(timestamp_epoch(date_range['end']))
+
+        sql = "SELECT segment, offset, length, git_commit_hash, epoch, id FROM decisions"
+        if clauses:
+            sql += " WHERE " + " AND ".join(clauses)
+        sql += " ORDER BY epoch DESC, id DESC"
+
+        if filters.get('limit'):
+            sql += " LIMIT ?"
+            params.append(int(filters['limit']))
+
+        return sql, params
+
+    def query(self, filters: Optional[Dict[str, Any]] = None) -> List[Dict[str, Any]]:
+        """Get decisions matching history filters, newest first."""
+        sql, params = self._build_query(filters or {})
+        with self._lock:
+            rows = self._connection.execute(sql, params).fetchall()
+        return self._read_records(rows)
+
+    def iter_query(self, filters: Optional[Dict[str, Any]] = None,
+                   after: Optional[Tuple[float, str]] = None, batch_size: int = 100) -> Iterator[Dict[str, Any]]:
+        """
+        Yield decisions matching history filters, newest first, in index batches.
+
+        Resumes strictly after the (epoch, id) position ``after``; only one
+        batch of records is read from the log ahead of the consumer.
+        """
+        filters = {**(filters or {}), 'limit': batch_size}
+        while True:
+            sql, params = self._build_query(filters, after)
+            with self._lock:
+                rows = self._connection.execute(sql, params).fetchall()
+
+            yield from self._read_records(rows)
+
+            if len(rows) < batch_size:
+                return
+            after = (rows[-1][4], rows[-1][5])
+
+    def get(self, decision_id: str) -> Optional[Dict[str, Any]]:
+        """Get a single decision by id."""
+        with self._lock:
+            rows = self._connection.execute(
+                "SELECT segment, offset, length, git_commit_hash FROM decisions WHERE id = ?",
+                (decision_id,)
+            ).fetchall()
+        records = self._read_records(rows)
+        return records[0] if records else None
+
+    def locate(self, decision_id: str) -> Optional[Tuple[str, int, int]]:
+        """Get the (segment, offset, length) of a decision's log record."""
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT segment, offset, length FROM decisions WHERE id = ?", (decision_id,)
+            ).fetchone()
+        return tuple(row) if row else None
+
+    def count(self, filters: Optional[Dict[str, Any]] = None) -> int:
+        """Count decisions matching history filters without reading the log."""
+        sql, params = self._build_query({**(filters or {}), 'limit': None})
+        with self._lock:
+            return self._connection.execute(f"SELECT COUNT(*) FROM ({sql})", params).fetchone()[0]
+
+    def _read_records(self, rows: List[Tuple[Any, ...]]) -> List[Dict[str, Any]]:
+        """Read indexed records from their segments, keeping the row order."""
+        records = []
+        handles = {}
+        try:
+            for segment, offset, length, commit_hash, *_ in rows:
+                handle = handles.get(segment)
+                if handle is None:
+                    handle = handles[segment] = open(self.log_dir / segment, "rb")
+                handle.seek(offset)
+
+                try:
+                    record = json.loads(handle.read(length))
+                except json.JSONDecodeError as e:
+                    print(f"Error reading decision record in {segment} at {offset}: {e}")
+                    continue
+
+                if commit_hash:
+                    record['git_commit_hash'] = commit_hash
+                records.append(record)
+        finally:
+            for handle in handles.values():
+                handle.close()
+
+        return records
+
+    def close(self) -> None:
+        """Close the index connection."""
+        with self._lock:
+            self._connection.close()
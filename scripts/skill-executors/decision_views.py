@@ -0,0 +1,180 @@
+#!/usr/bin/env python3
+"""
+Decision Role, User and Date Views for HeadElf
+
+Each decision is stored once. The by-role, by-user and by-date views are
+generated index files (``by-role/<role>/<YYYY-MM>.txt``,
+``by-user/<user_id>/<YYYY-MM>.txt``, ``by-date/<date>/index.txt``) listing the canonical decision files, one path per line relative to the
+decisions directory. Adding a decision appends a line to three small files
+instead of writing two more full copies, and the views can never hold a
+stale copy of a decision.
+
+Role and user views are sharded by month, so no index file grows without
+bound: each commit stores a new blob of one month's shard rather than of
+the whole history, and a query over a date range only reads the months
+it overlaps.
+"""
+
+import os
+from pathlib import Path
+from typing import Callable, Iterable, List, Optional, Tuple
+
+INDEX_FILENAME = "index.txt"
+MONTH_SHARD_GLOB = "[0-9][0-9][0-9][0-9]-[0-9][0-9].txt"
+
+
+class DecisionViews:
+    """Role, user and date secondary indexes over the single-copy decision store."""
+
+    def __init__(self, decisions_dir: Path):
+        self.decisions_dir = Path(decisions_dir)
+        self.role_dir = self.decisions_dir / "by-role"
+        self.user_dir = self.decisions_dir / "by-user"
+        self.date_dir = self.decisions_dir / "by-date"
+        self.refresh()
+
+    def refresh(self) -> None:
+        """
+        Re-check whether the views are authoritative.
+
+        Trees still holding triplicated copies from before the views
+        existed only get complete views once fold_triplicated_decisions()
+        has run; until then readers fall back to scanning.
+        """
+        self.authoritative = next(self.legacy_copies(), None) is None
+
+    def legacy_copies(self) -> Iterable[Path]:
+        """Yield decision copies left in by-role/ and by-date/ by the triplicated layout."""
+        for view_dir in (self.role_dir, self.date_dir):
+            yield from view_dir.glob("*/*.json")
+
+    def role_index_path(self, role: str, date_str: str) -> Path:
+        return self.role_dir / role.lower() / f"{date_str[:7]}.txt"
+
+    def user_index_path(self, user_id: str, date_str: str) -> Path:
+        return self.user_dir / user_id / f"{date_str[:7]}.txt"
+
+    def _index_paths(self) -> List[Path]:
+        return [
+            *self.role_dir.glob(f"*/{MONTH_SHARD_GLOB}"),
+            *self.user_dir.glob(f"*/{MONTH_SHARD_GLOB}"),
+            *self.date_dir.glob(f"*/{INDEX_FILENAME}")
+        ]
+
+    def _view_paths(self, role: str, date_str: str, user_id: Optional[str]) -> List[Path]:
+        index_paths = [self.role_index_path(role, date_str), self.date_index_path(date_str)]
+        if user_id:
+            index_paths.append(self.user_index_path(user_id, date_str))
+        return index_paths
+
+    def date_index_path(self, date_str: str) -> Path:
+        return self.date_dir / date_str / INDEX_FILENAME
+
+    def add(self, relative_path: str, role: str, date_str: str, user_id: Optional[str] = None) -> List[Path]:
+        """Add a decision file to its role, date and user views. Returns the index files written."""
+        index_paths = self._view_paths(role, date_str, user_id)
+        for index_path in index_paths:
+            self._append(index_path, relative_path)
+        return index_paths
+
+    def ensure(self, relative_path: str, role: str, date_str: str, user_id: Optional[str] = None) -> List[Path]:
+        """Add a decision file to whichever of its views do not list it yet (used by recovery)."""
+        index_paths = self._view_paths(role, date_str, user_id)
+        for index_path in index_paths:
+            listed = index_path.read_text(encoding="utf-8").splitlines() if index_path.exists() else []
+            if relative_path not in listed:
+                self._append(index_path, relative_path)
+        return index_paths
+
+    def _append(self, index_path: Path, relative_path: str) -> None:
+        """Append one entry, first dropping an unterminated line left by an interrupted append."""
+        index_path.parent.mkdir(parents=True, exist_ok=True)
+        with open(index_path, "a+b") as f:
+            size = f.seek(0, os.SEEK_END)
+            if size:
+                f.seek(size - 1)
+                if f.read(1) != b"\n":
+                    f.seek(0)
+                    f.truncate(f.read().rfind(b"\n") + 1)
+            f.write((relative_path + "\n").encode("utf-8"))
+
+    def entries(self, index_path: Path) -> Optional[List[str]]:
+        """
+        Get the decision files listed in a view index, without duplicates.
+
+        Returns None when the views are not authoritative yet, so callers
+        know to scan instead of trusting an empty view.
+        """
+        if not self.authoritative:
+            return None
+        if not index_path.exists():
+            return []
+        content = index_path.read_text(encoding="utf-8")
+        # An unterminated last line is an interrupted append, not an entry
+        lines = content.split("\n")[:-1]
+        return list(dict.fromkeys(line for line in lines if line))
+
+    def role_entries(self, role: str, first_day: Optional[str] = None,
+                     last_day: Optional[str] = None) -> Optional[List[str]]:
+        """Get a role's decision files, reading only the month shards overlapping [first_day, last_day]."""
+        return self._shard_entries(self.role_dir / role.lower(), first_day, last_day)
+
+    def user_entries(self, user_id: str, first_day: Optional[str] = None,
+                     last_day: Optional[str] = None) -> Optional[List[str]]:
+        """Get a user's decision files, reading only the month shards overlapping [first_day, last_day]."""
+        return self._shard_entries(self.user_dir / user_id, first_day, last_day)
+
+    def _shard_entries(self, view_dir: Path, first_day: Optional[str],
+                       last_day: Optional[str]) -> Optional[List[str]]:
+        if not self.authoritative:
+            return None
+
+        names = []
+        for shard_path in sorted(view_dir.glob(MONTH_SHARD_GLOB), reverse=True):
+            month = shard_path.stem
+            if (first_day and month < first_day[:7]) or (last_day and month > last_day[:7]):
+                continue
+            names += self.entries(shard_path)
+        return names
+
+    def date_entries(self, date_str: str) -> Optional[List[str]]:
+        return self.entries(self.date_index_path(date_str))
+
+    def relocate(self, current_entry: Callable[[str], str]) -> List[Path]:
+        """
+        Rewrite view entries through ``current_entry`` (old entry -> current path).
+
+        Returns the index files that changed.
+        """
+        changed = []
+        for index_path in self._index_paths():
+            content = index_path.read_text(encoding="utf-8")
+            lines = content.split("\n")[:-1]
+            relocated = "".join(current_entry(line) + "\n" for line in lines if line)
+            if relocated != content:
+                index_path.write_text(relocated, encoding="utf-8")
+                changed.append(index_path)
+        return changed
+
+    def rebuild(self, decisions: Iterable[Tuple[str, str, str, Optional[str]]]) -> List[Path]:
+        """
+        Regenerate every view index from (relative_path, role, date, user_id) entries.
+
+        Index files of views that no longer have decisions are removed.
+        Returns every index file written or removed.
+        """
+        views = {}
+        for relative_path, role, date_str, user_id in decisions:
+            for index_path in self._view_paths(role, date_str, user_id):
+                views.setdefault(index_path, []).append(relative_path)
+
+        stale = [path for path in self._index_paths() if path not in views]
+        for index_path in stale:
+            index_path.unlink()
+
+        for index_path, relative_paths in views.items():
+            index_path.parent.mkdir(parents=True, exist_ok=True)
+            index_path.write_text("".join(path + "\n" for path in sorted(set(relative_paths))), encoding="utf-8")
+
+        self.refresh()
+        return list(views) + stale
@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+"""
+Plumbing Commit Engine for HeadElf Git Persistence
+
+Commits decision files straight into a dedicated ref using Git plumbing
+(hash-object, update-index on a private index file, write-tree,
+commit-tree, update-ref). The working-tree index and .git/index.lock are
+never touched, so persistence does not stall on, or disturb, interactive
+git use in the same repository, and commit cost does not depend on the
+size of the working tree.
+"""
+
+import os
+from pathlib import Path
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple
+
+DEFAULT_COMMIT_REF = "refs/headelf/decisions"
+NULL_SHA = "0" * 40
+
+GitRunner = Callable[..., Awaitable[Tuple[bool, str]]]
+
+
+class PlumbingCommitEngine:
+    """Commits files to a dedicated ref without using the working-tree index."""
+
+    def __init__(self, repo_root: Path, run_git: GitRunner, ref: str = DEFAULT_COMMIT_REF,
+                 max_retries: int = 3):
+        """
+        Args:
+            repo_root: Repository root; committed paths are relative to it
+            run_git: Coroutine running git (args, input_data=, env=) -> (ok, output)
+            ref: Ref the commits are written to
+            max_retries: Attempts when another writer moves the ref concurrently
+        """
+        self.repo_root = Path(repo_root)
+        self.run_git = run_git
+        self.ref = ref
+        self.max_retries = max_retries
+
+        self._index_env: Optional[Dict[str, str]] = None
+        # Commit the private index currently mirrors (None until loaded)
+        self._index_commit: Optional[str] = None
+        self._index_loaded = False
+
+    async def _git(self, args: List[str], input_data: Optional[bytes] = None) -> str:
+        """Run a git plumbing command against the private index, raising on failure."""
+        ok, output = await self.run_git(args, input_data=input_data, env=self._index_env)
+        if not ok:
+            raise RuntimeError(f"git {args[0]} failed: {output.strip()}")
+        return output
+
+    async def _prepare_index(self) -> None:
+        """Locate the private index file inside the git directory."""
+        if self._index_env is not None:
+            return
+
+        ok, git_dir = await self.run_git(['rev-parse', '--absolute-git-dir'])
+        if not ok:
+            raise RuntimeError(f"not a git repository: {git_dir.strip()}")
+
+        index_name = "headelf-" + self.ref.replace("/", "-") + ".index"
+        self._index_env = {'GIT_INDEX_FILE': os.path.join(git_dir.strip(), index_name)}
+
+    async def resolve_ref(self) -> Optional[str]:
+        """Get the commit the dedicated ref points at, or None if it does not exist yet."""
+        ok, output = await self.run_git(['rev-parse', '--verify', '--quiet', f"{self.ref}^{{commit}}"])
+        return output.strip() if ok and output.strip() else None
+
+    async def _load_index(self, commit: Optional[str]) -> None:
+        """Reset the private index to the tree of a commit (or to empty)."""
+        if commit:
+            await self._git(['read-tree', commit])
+        else:
+            await self._git(['read-tree', '--empty'])
+        self._index_commit = commit
+        self._index_loaded = True
+
+    async def commit(self, file_paths: List[Path], message: str) -> str:
+        """
+        Commit the current contents of files onto the dedicated ref.
+
+        Files that no longer exist are removed from the ref's tree. Returns
+        the new commit hash.
+        """
+        await self._prepare_index()
+
+        relative_paths = [str(Path(file_path).relative_to(self.repo_root)) for file_path in file_paths]
+        existing = [path for path in relative_paths if (self.repo_root / path).exists()]
+        removed = [path for path in relative_paths if path not in existing]
+
+        blob_hashes = []
+        if existing:
+            output = await self._git(['hash-object', '-w', '--stdin-paths'],
+                                     input_data="\n".join(existing).encode('utf-8') + b"\n")
+            blob_hashes = output.split()
+
+        index_info = [f"100644 {blob}\t{path}" for blob, path in zip(blob_hashes, existing)]
+        index_info += [f"0 {NULL_SHA}\t{path}" for path in removed]
+
+        for _ in range(self.max_retries):
+            if not self._index_loaded:
+                await self._load_index(await self.resolve_ref())
+
+            parent = self._index_commit
+            await self._git(['update-index', '--index-info'], input_data=("\n".join(index_info) + "\n").encode('utf-8'))
+            tree = (await self._git(['write-tree'])).strip()
+
+            parent_args = ['-p', parent] if parent else []
+            commit = (await self._git(['commit-tree', tree, *parent_args],
+                                      input_data=message.encode('utf-8'))).strip()
+
+            ok, _ = await self.run_git(['update-ref', '-m', message.splitlines()[0], self.ref, commit,
+                                        parent or NULL_SHA])
+            if ok:
+                self._index_commit = commit
+                return commit
+
+            # Another writer moved the ref; reload its tree and reapply our changes
+            self._index_loaded = False
+
+        raise RuntimeError(f"could not update {self.ref}: concurrent writers kept moving it")
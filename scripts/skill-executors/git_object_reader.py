@@ -0,0 +1,169 @@
+#!/usr/bin/env python3
+"""
+Long-Lived Git Object Reader for HeadElf
+
+Keeps a small pool of ``git cat-file --batch`` and ``--batch-check``
+processes open and multiplexes object reads over their pipes. Requests
+are written as they arrive and responses are matched back to callers in
+order, so historical reads ("this decision as of commit X") cost a pipe
+round trip instead of a fork/exec per read.
+"""
+
+import asyncio
+import itertools
+import json
+from collections import deque
+from pathlib import Path
+from typing import Any, Deque, Dict, List, Optional, Tuple
+
+# (sha, type, size, content); content is None for --batch-check lookups
+ObjectResult = Optional[Tuple[str, str, int, Optional[bytes]]]
+
+
+class CatFileProcess:
+    """One long-lived ``git cat-file`` process with in-order response matching."""
+
+    def __init__(self, repo_root: Path, mode: str = "--batch"):
+        self.repo_root = Path(repo_root)
+        self.mode = mode
+        self.with_content = mode == "--batch"
+
+        self._process: Optional[asyncio.subprocess.Process] = None
+        self._reader_task: Optional[asyncio.Task] = None
+        self._waiters: Deque[asyncio.Future] = deque()
+        self._start_lock = asyncio.Lock()
+
+    @property
+    def pending(self) -> int:
+        """Number of requests awaiting a response."""
+        return len(self._waiters)
+
+    @property
+    def running(self) -> bool:
+        return self._process is not None and self._process.returncode is None
+
+    async def _ensure_started(self) -> None:
+        """Start the helper process and its response reader if needed."""
+        async with self._start_lock:
+            if self.running and self._reader_task is not None and not self._reader_task.done():
+                return
+
+            self._process = await asyncio.create_subprocess_exec(
+                'git', 'cat-file', self.mode,
+                cwd=self.repo_root,
+                stdin=asyncio.subprocess.PIPE,
+                stdout=asyncio.subprocess.PIPE,
+                stderr=asyncio.subprocess.DEVNULL
+            )
+            self._reader_task = asyncio.ensure_future(self._read_responses(self._process))
+
+    async def _read_responses(self, process: asyncio.subprocess.Process) -> None:
+        """Resolve waiting requests in order as responses arrive."""
+        try:
+            while True:
+                header = await process.stdout.readline()
+                if not header:
+                    break
+
+                # "<sha> <type> <size>" for found objects, "<name> missing" otherwise
+                fields = header.decode('utf-8', 'replace').rstrip("\n").split(" ")
+                result: ObjectResult = None
+                if len(fields) == 3 and fields[2].isdigit():
+                    sha, object_type, size = fields[0], fields[1], int(fields[2])
+                    content = None
+                    if self.with_content:
+                        content = (await process.stdout.readexactly(size + 1))[:-1]
+                    result = (sha, object_type, size, content)
+
+                if self._waiters:
+                    waiter = self._waiters.popleft()
+                    if not waiter.done():
+                        waiter.set_result(result)
+        except (asyncio.IncompleteReadError, ConnectionError) as e:
+            self._fail_waiters(e)
+            return
+
+        self._fail_waiters(ConnectionError("git cat-file exited"))
+
+    def _fail_waiters(self, error: Exception) -> None:
+        """Fail every outstanding request, e.g. when the helper dies."""
+        while self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                waiter.set_exception(error)
+
+    async def request(self, spec: str) -> ObjectResult:
+        """Look up one object; returns (sha, type, size, content) or None if missing."""
+        if "\n" in spec:
+            raise ValueError("object names cannot contain newlines")
+
+        await self._ensure_started()
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        self._process.stdin.write(spec.encode('utf-8') + b"\n")
+        await self._process.stdin.drain()
+        return await waiter
+
+    async def close(self) -> None:
+        """Close the helper's stdin and wait for it to exit."""
+        if self._process is None:
+            return
+
+        if self._process.returncode is None:
+            self._process.stdin.close()
+            try:
+                await asyncio.wait_for(self._process.wait(), timeout=5)
+            except asyncio.TimeoutError:
+                self._process.kill()
+                await self._process.wait()
+
+        if self._reader_task is not None:
+            await self._reader_task
+        self._process = None
+
+
+class GitObjectReader:
+    """Pool of long-lived cat-file helpers for reading Git objects."""
+
+    def __init__(self, repo_root: Path, pool_size: int = 2):
+        self.repo_root = Path(repo_root)
+        self.pool_size = max(1, pool_size)
+        self._content_pool: List[CatFileProcess] = []
+        self._check_pool: List[CatFileProcess] = []
+        self._round_robin = itertools.count()
+
+    def _pick(self, pool: List[CatFileProcess], mode: str) -> CatFileProcess:
+        """Pick an idle helper, growing the pool up to its size."""
+        idle = [helper for helper in pool if helper.pending == 0]
+        if idle:
+            return idle[0]
+        if len(pool) < self.pool_size:
+            helper = CatFileProcess(self.repo_root, mode)
+            pool.append(helper)
+            return helper
+        return pool[next(self._round_robin) % len(pool)]
+
+    async def read(self, spec: str) -> Optional[bytes]:
+        """Read an object's content by name (e.g. "HEAD:data/file.json"), or None if missing."""
+        result = await self._pick(self._content_pool, "--batch").request(spec)
+        return result[3] if result else None
+
+    async def read_json(self, spec: str) -> Optional[Any]:
+        """Read and parse a JSON blob, or None if missing."""
+        content = await self.read(spec)
+        return None if content is None else json.loads(content)
+
+    async def info(self, spec: str) -> Optional[Dict[str, Any]]:
+        """Get an object's sha, type and size without reading its content."""
+        result = await self._pick(self._check_pool, "--batch-check").request(spec)
+        if result is None:
+            return None
+        sha, object_type, size, _ = result
+        return {'sha': sha, 'type': object_type, 'size': size}
+
+    async def close(self) -> None:
+        """Shut down every helper process."""
+        for helper in self._content_pool + self._check_pool:
+            await helper.close()
+        self._content_pool.clear()
+        self._check_pool.clear()
@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""
+Group Commit Batching for HeadElf Git Persistence
+
+Queues commit requests and flushes them as a single Git commit once the
+batch fills up or its time window closes. Every caller in a batch gets a
+future resolving to the shared commit hash, so a burst of N decisions costs
+one set of git processes instead of N.
+"""
+
+import asyncio
+from pathlib import Path
+from typing import Awaitable, Callable, List, Optional, Tuple
+
+CommitFunction = Callable[[List[Path], str], Awaitable[Optional[str]]]
+
+
+class GroupCommitter:
+    """Coalesces commit requests into one commit per batch window."""
+
+    def __init__(self, commit_fn: CommitFunction, max_batch_size: int = 32, max_delay: float = 0.05):
+        """
+        Args:
+            commit_fn: Coroutine committing (file_paths, message), returning the hash
+            max_batch_size: Flush as soon as this many requests are queued
+            max_delay: Seconds the first queued request waits before a flush
+        """
+        self.commit_fn = commit_fn
+        self.max_batch_size = max_batch_size
+        self.max_delay = max_delay
+
+        self._pending: List[Tuple[List[Path], str, asyncio.Future]] = []
+        self._flush_lock = asyncio.Lock()
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._flush_task: Optional[asyncio.Task] = None
+
+        self.commits = 0
+        self.requests = 0
+
+    def submit(self, file_paths: List[Path], message: str) -> asyncio.Future:
+        """Queue files for the next group commit and get a future for its hash."""
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((list(file_paths), message, future))
+        self.requests += 1
+
+        if len(self._pending) >= self.max_batch_size:
+            self._schedule_flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.max_delay, self._schedule_flush)
+
+        return future
+
+    def _schedule_flush(self) -> None:
+        """Start a background flush of the queued batch."""
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        self._flush_task = asyncio.ensure_future(self.flush())
+
+    async def flush(self) -> Optional[str]:
+        """Commit every queued request now and resolve their futures."""
+        async with self._flush_lock:
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+
+            batch, self._pending = self._pending, []
+            if not batch:
+                return None
+
+            file_paths = list(dict.fromkeys(path for paths, _, _ in batch for path in paths))
+            if len(batch) == 1:
+                message = batch[0][1]
+            else:
+                message = f"Group commit of {len(batch)} updates\n\n" + "\n".join(
+                    f"- {request_message}" for _, request_message, _ in batch
+                )
+
+            try:
+                commit_hash = await self.commit_fn(file_paths, message)
+            except Exception as e:
+                for _, _, future in batch:
+                    if not future.done():
+                        future.set_exception(e)
+                return None
+
+            self.commits += 1
+            for _, _, future in batch:
+                if not future.done():
+                    future.set_result(commit_hash)
+
+            return commit_hash
+
+    async def close(self) -> None:
+        """Flush outstanding requests, e.g. on shutdown."""
+        await self.flush()
+        if self._flush_task is not None and not self._flush_task.done():
+            await self._flush_task
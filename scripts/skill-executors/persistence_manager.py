@@ -11,26 +11,121 @@ Python interface to the Git-based persistence system, providing:
 
 import os
 import json
+import calendar
+import itertools
 import subprocess
+import threading
 import datetime
 from pathlib import Path
-from typing import Dict, Any, List, Optional, Tuple
-import uuid
+from typing import Dict, Any, AsyncIterator, List, Optional, Tuple
 import asyncio
 
+from decision_log import (
+    DecisionLog, decode_cursor, encode_cursor, history_key, parse_timestamp, timestamp_epoch
+)
+from decision_views import DecisionViews
+from decision_layout import PartitionedLayout, decision_file_name, name_decision_id
+from decision_ids import decision_id_time, is_decision_id, new_decision_id
+from analytics_rollups import DailyRollups, aggregate, merge_rollups
+from columnar_export import ColumnarDecisionExport
+from group_commit import GroupCommitter
+from git_commit_engine import DEFAULT_COMMIT_REF, PlumbingCommitEngine
+from git_object_reader import GitObjectReader
+from blocking_io import DEFAULT_IO_WORKERS, BlockingIOExecutor
+from context_store import UserContextStore
+from write_journal import WriteJournal, atomic_write, fsync_paths
+from process_lock import ProcessLock
+
+# Decisions handed from the log index to the event loop per executor call
+HISTORY_BATCH_SIZE = 100
+
+# Decision files read per executor call when a day is walked in id order
+DAY_READ_CHUNK = 20
+
+
 class GitPersistenceManager:
     """Python interface to HeadElf's Git-based persistence system."""
 
-    def __init__(self, repo_root: Optional[str] = None):
+    def __init__(self, repo_root: Optional[str] = None, storage_backend: str = "files",
+                 group_commit: bool = False, commit_batch_size: int = 32, commit_window: float = 0.05,
+                 commit_engine: str = "porcelain", commit_ref: str = DEFAULT_COMMIT_REF,
+                 io_workers: int = DEFAULT_IO_WORKERS, context_flush_interval: Optional[float] = None,
+                 context_flush_size: int = 64, fsync: bool = True):
+        """
+        Args:
+            repo_root: Repository holding the data/ tree (defaults to the cwd)
+            storage_backend: "files" for one JSON file per decision, or "log"
+                for segmented JSONL logs with a SQLite index
+            group_commit: Queue commits and flush them as one commit per
+                batch (commit_batch_size requests or commit_window seconds)
+            commit_engine: "porcelain" to commit through git add/commit on the
+                checked-out branch, or "plumbing" to write commits straight
+                into commit_ref without touching the working-tree index
+            io_workers: Threads available for blocking file and index I/O;
+                async methods run that work off the event loop
+            context_flush_interval: Cache user contexts and write and commit
+                their updates once per window of this many seconds (or once
+                context_flush_size users are dirty); None writes every
+                update through with its decision. Cached contexts are
+                not re-read, so only one process per data/ tree may cache
+            fsync: Sync journal entries and written files to stable storage
+                before committing; disable only for throwaway data
+        """
+        if storage_backend not in ("files", "log"):
+            raise ValueError(f"Unknown storage backend: {storage_backend}")
+        if commit_engine not in ("porcelain", "plumbing"):
+            raise ValueError(f"Unknown commit engine: {commit_engine}")
+
         self.repo_root = Path(repo_root) if repo_root else Path.cwd()
         self.data_dir = self.repo_root / "data"
         self.decisions_dir = self.data_dir / "decisions"
         self.contexts_dir = self.data_dir / "contexts"
         self.analytics_dir = self.data_dir / "analytics"
         self.extensions_dir = self.data_dir / "extensions"
+        self.storage_backend = storage_backend
 
         self.initialize_directories()
 
+        self.decision_log = DecisionLog(self.decisions_dir / "log") if storage_backend == "log" else None
+        self.decision_layout = PartitionedLayout(self.decisions_dir)
+        self.decision_views = DecisionViews(self.decisions_dir)
+        self.analytics_rollups = DailyRollups(self.analytics_dir / "rollups")
+        if not self.analytics_rollups.complete and not self._has_decisions():
+            self.analytics_rollups.mark_complete()
+        self.columnar_export = ColumnarDecisionExport(self.analytics_dir / "columnar")
+        self.group_committer = (
+            GroupCommitter(self._commit_files, max_batch_size=commit_batch_size, max_delay=commit_window)
+            if group_commit else None
+        )
+        self.plumbing_engine = (
+            PlumbingCommitEngine(self.repo_root, self.run_git_command, ref=commit_ref)
+            if commit_engine == "plumbing" else None
+        )
+        self.object_reader = GitObjectReader(self.repo_root)
+        self.io = BlockingIOExecutor(io_workers)
+        self.user_contexts = UserContextStore(
+            self.contexts_dir / "users", self.io, self.commit_to_git,
+            flush_interval=context_flush_interval, max_dirty=context_flush_size,
+            on_written=self._release_journal_entries, sync=fsync
+        )
+        # A user's context is a read-modify-write file shared with other processes
+        self._user_locks: Dict[str, ProcessLock] = {}
+        # Rollups are read-modify-write files shared with other processes
+        self._rollup_lock = ProcessLock(self.data_dir / "rollups.lock", self.io)
+        # Staging and committing go through the Git index every process shares
+        self.commit_lock = ProcessLock(self.data_dir / "commit.lock", self.io)
+        self._is_git_repo: Optional[bool] = None
+
+        self.fsync = fsync
+        self.journal_dir = self.data_dir / "journal"
+        self._recovered_journals: List[WriteJournal] = []
+        self._recovered_paths: List[Path] = []
+        # Open journal entries still waiting on more than one release
+        self._journal_holds: Dict[str, int] = {}
+        self._journal_holds_lock = threading.Lock()
+        self.recover_interrupted_writes()
+        self.journal = WriteJournal.create(self.journal_dir, sync=fsync)
+
     def initialize_directories(self) -> None:
         """Initialize the data directory structure."""
         directories = [
@@ -41,8 +136,11 @@ class GitPersistenceManager:
             self.extensions_dir,
             self.contexts_dir / "users",
             self.decisions_dir / "by-role",
+            self.decisions_dir / "by-user",
             self.decisions_dir / "by-date",
             self.analytics_dir / "snapshots",
+            self.analytics_dir / "rollups",
+            self.analytics_dir / "columnar",
             self.analytics_dir / "trends"
         ]
 
@@ -66,13 +164,28 @@ Thumbs.db
 # Temporary files
 *.log
 *.tmp
+
+# Local indexes (rebuilt from committed data)
+*.sqlite
+*.sqlite-journal
+
+# Cross-process lock files
+*.lock
 """
             gitignore_path.write_text(gitignore_content)
 
-    async def persist_decision(self, decision_data: Dict[str, Any]) -> str:
-        """Persist executive decision with Git tracking."""
-        timestamp = datetime.datetime.utcnow().isoformat() + "Z"
-        decision_id = decision_data.get('id', self.generate_decision_id())
+    async def persist_decision(self, decision_data: Dict[str, Any], durable: bool = False) -> str:
+        """
+        Persist executive decision with Git tracking.
+
+        The decision files and the user context update go into one commit.
+        With group commits enabled, durable=True flushes the pending batch
+        immediately instead of waiting for the batch window.
+        """
+        decision_id = decision_data['id'] if 'id' in decision_data else self.generate_decision_id()
+        # A time-ordered id fixes the timestamp, so id order is history order
+        issued_at = decision_id_time(decision_id) if is_decision_id(decision_id) else datetime.datetime.utcnow()
+        timestamp = issued_at.isoformat() + "Z"
 
         # Prepare enhanced decision record
         enhanced_decision = {
@@ -86,102 +199,393 @@ Thumbs.db
             }
         }
 
-        # Generate file paths
-        date_str = timestamp.split('T')[0]
         executive_role = decision_data.get('executive_role', 'unknown').lower()
+        user_id = decision_data.get('user_id', 'anonymous')
+        last_decision_path = (
+            None if self.decision_log else str(self._decision_path(enhanced_decision).relative_to(self.data_dir))
+        )
 
-        filename = f"{date_str}-{executive_role}-{decision_id}.json"
-
-        main_path = self.decisions_dir / filename
-        role_path = self.decisions_dir / "by-role" / executive_role / filename
-        date_path = self.decisions_dir / "by-date" / date_str / filename
-
-        # Ensure subdirectories exist
-        role_path.parent.mkdir(parents=True, exist_ok=True)
-        date_path.parent.mkdir(parents=True, exist_ok=True)
-
-        # Write decision files
-        decision_json = json.dumps(enhanced_decision, indent=2, ensure_ascii=False)
-
-        main_path.write_text(decision_json)
-        role_path.write_text(decision_json)
-        date_path.write_text(decision_json)
+        async with self._user_lock(user_id):
+            # User context counters are updated incrementally
+            context_updates = {
+                'last_decision': decision_id,
+                'last_decision_path': last_decision_path,
+                'last_activity': timestamp,
+                'decision_count': await self.get_user_decision_count(user_id) + 1
+            }
 
-        # Update user context
-        user_id = decision_data.get('user_id', 'anonymous')
-        await self.update_user_context(user_id, {
-            'last_decision': decision_id,
-            'last_activity': timestamp,
-            'decision_count': await self.get_user_decision_count(user_id) + 1
-        })
+            # Journal the whole persist before touching any file, so a crash
+            # part-way through is replayed on the next startup
+            txn_id = await self.io.run(
+                self.journal.begin, 'decision',
+                decision=enhanced_decision, user_id=user_id, context_updates=context_updates
+            )
+            # Released by this persist after its commit, and by the context
+            # store once the context update is committed (possibly later)
+            with self._journal_holds_lock:
+                self._journal_holds[txn_id] = 2
+
+            # Store the decision and fold it into its day's analytics rollup
+            # under one lock, so a rollup rebuild never counts a decision
+            # whose record is still to come
+            async with self._rollup_lock:
+                written_paths = await self.io.run(self._write_decision, enhanced_decision)
+                written_paths += await self.io.run(self.analytics_rollups.record, enhanced_decision)
+
+            context_path = await self._apply_user_context_updates(user_id, context_updates, token=txn_id)
+
+        # A cached context update is committed by its flush instead
+        if context_path:
+            written_paths.append(context_path)
+        if self.decision_log and await self.io.run(self.decision_log.commits_path.exists):
+            # Carry the commit hashes recorded since the previous commit
+            written_paths.append(self.decision_log.commits_path)
+        if self.fsync:
+            await self.io.run(fsync_paths, written_paths)
 
         # Commit to Git
         commit_hash = await self.commit_to_git(
-            [main_path, role_path, date_path],
-            f"{executive_role.upper()} decision: {decision_data.get('decision_type', 'analysis')} - {decision_data.get('query', '')[:50]}..."
+            written_paths,
+            f"{executive_role.upper()} decision: {decision_data.get('decision_type', 'analysis')} - {decision_data.get('query', '')[:50]}...",
+            durable=durable
         )
 
-        if commit_hash:
+        if commit_hash and self.decision_log:
+            # Log records are immutable; the commits sidecar carries the hash
+            await self.io.run(self.decision_log.set_commit_hash, [decision_id], commit_hash)
+        elif commit_hash:
             enhanced_decision['git_commit_hash'] = commit_hash
             # Update files with commit hash
             decision_json = json.dumps(enhanced_decision, indent=2, ensure_ascii=False)
-            main_path.write_text(decision_json)
+            await self.io.run(atomic_write, self._decision_path(enhanced_decision), decision_json)
 
+        await self.io.run(self._release_journal_entries, [txn_id])
         return decision_id
 
-    async def get_decision_history(self, filters: Optional[Dict[str, Any]] = None) -> List[Dict[str, Any]]:
-        """Retrieve decision history with optional filtering."""
-        if filters is None:
-            filters = {}
+    def _release_journal_entries(self, txn_ids: List[str]) -> None:
+        """Release holds on journal entries, completing the entries nothing holds any more."""
+        completed = []
+        with self._journal_holds_lock:
+            for txn_id in txn_ids:
+                holds = self._journal_holds.pop(txn_id, 1) - 1
+                if holds > 0:
+                    self._journal_holds[txn_id] = holds
+                else:
+                    completed.append(txn_id)
+        self.journal.complete(completed)
+
+    def _write_decision(self, decision: Dict[str, Any]) -> List[Path]:
+        """Store a decision record and its view entries. Returns the files written."""
+        if self.decision_log:
+            # Append to the decision log; the segment is what gets committed
+            return [self.decision_log.append(decision)]
+
+        # Write the single canonical copy into its day partition
+        main_path = self._decision_path(decision)
+        main_path.parent.mkdir(parents=True, exist_ok=True)
+        atomic_write(main_path, json.dumps(decision, indent=2, ensure_ascii=False))
+
+        # Role, date and user views are index entries pointing at that copy
+        view_paths = self.decision_views.add(
+            str(main_path.relative_to(self.decisions_dir)),
+            decision.get('executive_role', 'unknown').lower(),
+            decision['timestamp'].split('T')[0],
+            decision.get('user_id', 'anonymous')
+        )
+        return [main_path, *view_paths]
+
+    def recover_interrupted_writes(self) -> int:
+        """
+        Replay persists left open in the journals of exited processes.
+
+        Runs at startup; journals of processes still running are locked
+        and left alone. Each replay step is idempotent: the decision is
+        stored unless already present, missing view entries are added, the
+        day's rollup is recomputed from that day's decisions and the
+        journaled context counters are re-applied. The recovered files are
+        committed ahead of the next commit. Returns the persists replayed.
+        """
+        pending = []
+        for journal in WriteJournal.claim_orphans(self.journal_dir, sync=self.fsync):
+            entries = [entry for entry in journal.pending() if entry.get('kind') == 'decision']
+            if entries:
+                pending += entries
+                self._recovered_journals.append(journal)
+            else:
+                journal.close()
+
+        recovered_paths: List[Path] = []
+
+        for entry in pending:
+            decision = entry['decision']
+            try:
+                recovered_paths += self._replay_decision(decision)
+
+                day = decision['timestamp'].split('T')[0]
+                with self._rollup_lock:
+                    recovered_paths.append(self.analytics_rollups.rebuild_day(day, self._decisions_on_day(day)))
+
+                with self._user_lock(entry['user_id']):
+                    context_path = self.user_contexts.recover(
+                        entry['user_id'], entry['context_updates'], default=self._default_user_context(entry['user_id'])
+                    )
+                if context_path:
+                    recovered_paths.append(context_path)
+            except Exception as e:
+                print(f"Error recovering interrupted persist of decision {decision.get('id')}: {e}")
+
+        if pending:
+            if self.fsync:
+                fsync_paths(recovered_paths)
+            self._recovered_paths += recovered_paths
+            print(f"Recovered {len(pending)} interrupted persist(s) from the write-ahead journal")
+
+        return len(pending)
+
+    def _replay_decision(self, decision: Dict[str, Any]) -> List[Path]:
+        """Store a journaled decision unless it survived the crash. Returns the files involved."""
+        if self.decision_log:
+            location = self.decision_log.locate(decision['id'])
+            if location is None:
+                return [self.decision_log.append(decision)]
+            return [self.decision_log.log_dir / location[0]]
+
+        main_path = self._decision_path(decision)
+        stored = self._read_decision_files([main_path]) if main_path.exists() else []
+        if not stored or stored[0].get('id') != decision['id']:
+            main_path.parent.mkdir(parents=True, exist_ok=True)
+            atomic_write(main_path, json.dumps(decision, indent=2, ensure_ascii=False))
+
+        view_paths = self.decision_views.ensure(
+            str(main_path.relative_to(self.decisions_dir)),
+            decision.get('executive_role', 'unknown').lower(),
+            decision['timestamp'].split('T')[0],
+            decision.get('user_id', 'anonymous')
+        )
+        return [main_path, *view_paths]
+
+    def _decisions_on_day(self, day: str) -> List[Dict[str, Any]]:
+        """Read every stored decision from one UTC day."""
+        day_range = {'date_range': {'start': f"{day}T00:00:00Z", 'end': f"{day}T23:59:59.999999Z"}}
+        if self.decision_log:
+            return self.decision_log.query(day_range)
+        return [
+            decision
+            for _, decision_paths in self._decision_days(day_range)
+            for decision in self._read_decision_files(decision_paths)
+        ]
 
-        decisions = []
+    async def commit_recovered_writes(self) -> Optional[str]:
+        """Commit the files restored by startup recovery and retire the journals they came from."""
+        journals, self._recovered_journals = self._recovered_journals, []
+        recovered_paths, self._recovered_paths = self._recovered_paths, []
+        if not journals:
+            return None
 
-        # Determine search directories
-        search_dirs = [self.decisions_dir]
+        replayed = [entry['txn'] for journal in journals for entry in await self.io.run(journal.pending)]
+        commit_hash = await self.commit_to_git(
+            list(dict.fromkeys(recovered_paths)), f"Recover {len(replayed)} interrupted persist(s)"
+        )
+        for journal in journals:
+            await self.io.run(journal.complete, replayed)
+            await self.io.run(journal.close)
+        return commit_hash
+
+    def _user_lock(self, user_id: str) -> ProcessLock:
+        """Get the lock serializing read-modify-write updates of a user's context across processes."""
+        if user_id not in self._user_locks:
+            self._user_locks[user_id] = ProcessLock(self.contexts_dir / "locks" / f"{user_id}.lock", self.io)
+        return self._user_locks[user_id]
+
+    def _has_decisions(self) -> bool:
+        """Check whether any decision has been stored yet."""
+        if self.decision_log:
+            return self.decision_log.count() > 0
+        return next(self.decision_layout.all_files(), None) is not None
+
+    def _decision_path(self, decision: Dict[str, Any]) -> Path:
+        """Get the canonical file path of a decision record in its day partition."""
+        return self.decision_layout.path(decision_file_name(decision))
 
-        if filters.get('executive_role'):
-            role_dir = self.decisions_dir / "by-role" / filters['executive_role'].lower()
-            if role_dir.exists():
-                search_dirs.append(role_dir)
+    async def get_decision_history(self, filters: Optional[Dict[str, Any]] = None) -> List[Dict[str, Any]]:
+        """Retrieve decision history with optional filtering, newest first."""
+        if filters is None:
+            filters = {}
 
-        if filters.get('date_range', {}).get('start'):
-            date_str = filters['date_range']['start'].split('T')[0]
-            date_dir = self.decisions_dir / "by-date" / date_str
-            if date_dir.exists():
-                search_dirs.append(date_dir)
+        if self.decision_log:
+            return await self.io.run(self.decision_log.query, filters)
 
-        # Collect decision files
-        for search_dir in search_dirs:
-            if not search_dir.exists():
-                continue
+        page = await self.get_decision_page(filters, page_size=filters.get('limit') or None)
+        return page['decisions']
 
-            json_files = sorted(search_dir.glob("*.json"), reverse=True)
+    async def get_decision_page(self, filters: Optional[Dict[str, Any]] = None, cursor: Optional[str] = None,
+                                page_size: Optional[int] = 20) -> Dict[str, Any]:
+        """
+        Get one page of decision history, newest first.
 
-            for json_file in json_files:
-                if filters.get('limit') and len(decisions) >= filters['limit']:
+        Returns the decisions and a ``next_cursor`` to pass back for the
+        following page (None once a page comes back short). Only the
+        storage needed to fill the page is read.
+        """
+        decisions = []
+        history = self.iter_decision_history(filters, cursor)
+        try:
+            async for decision in history:
+                decisions.append(decision)
+                if page_size and len(decisions) >= page_size:
                     break
+        finally:
+            await history.aclose()
 
-                try:
-                    decision = json.loads(json_file.read_text())
-
-                    # Apply filters
-                    if self._decision_matches_filters(decision, filters):
-                        decisions.append(decision)
+        full_page = bool(page_size) and len(decisions) >= page_size
+        return {
+            'decisions': decisions,
+            'next_cursor': encode_cursor(decisions[-1]) if full_page else None
+        }
 
-                except (json.JSONDecodeError, Exception) as e:
-                    print(f"Error reading decision file {json_file}: {e}")
+    async def iter_decision_history(self, filters: Optional[Dict[str, Any]] = None,
+                                    cursor: Optional[str] = None) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Stream decisions newest first (by timestamp, then id).
+
+        Resumes after ``cursor`` (from get_decision_page or encode_cursor).
+        Role and date filters are pushed down to the view indexes and the
+        date-named decision files, so reading stops at the days the caller
+        actually consumes; the ``limit`` filter is left to the caller.
+        """
+        filters = {key: value for key, value in (filters or {}).items() if key != 'limit'}
+        after = decode_cursor(cursor)
+
+        if self.decision_log:
+            records = self.decision_log.iter_query(filters, after, batch_size=HISTORY_BATCH_SIZE)
+            while True:
+                batch = await self.io.run(list, itertools.islice(records, HISTORY_BATCH_SIZE))
+                for decision in batch:
+                    yield decision
+                if len(batch) < HISTORY_BATCH_SIZE:
+                    return
 
-        # Remove duplicates and apply final limit
-        unique_decisions = []
         seen_ids = set()
+        for day, sources in await self.io.run(self._decision_days, filters, after):
+            decision_paths = await self.io.run(self._list_decision_files, sources)
+            ordered_paths = self._id_ordered(decision_paths, after)
+            if ordered_paths is None:
+                # Some files carry no time-ordered id: read the whole day and sort it
+                chunks = [decision_paths]
+            else:
+                chunks = [ordered_paths[i:i + DAY_READ_CHUNK] for i in range(0, len(ordered_paths), DAY_READ_CHUNK)]
+
+            for chunk in chunks:
+                batch = []
+                for decision in await self.io.run(self._read_decision_files, chunk):
+                    if decision.get('id') in seen_ids or not self._decision_matches_filters(decision, filters):
+                        continue
+                    if after is not None and history_key(decision) >= after:
+                        continue
+                    seen_ids.add(decision.get('id'))
+                    batch.append(decision)
+
+                for decision in sorted(batch, key=history_key, reverse=True):
+                    yield decision
+
+    def _list_decision_files(self, sources: List[Path]) -> List[Path]:
+        """Expand day partitions among decision file sources into their files."""
+        decision_paths = []
+        for path in sources:
+            decision_paths += [path] if path.suffix == '.json' else self.decision_layout.day_files(path)
+        return decision_paths
+
+    @staticmethod
+    def _id_ordered(decision_paths: List[Path],
+                    after: Optional[Tuple[float, str]] = None) -> Optional[List[Path]]:
+        """
+        Order one day's decision files newest first by the ids in their names.
+
+        Files at or after the cursor are dropped unread. Returns None unless
+        every file (and the cursor) carries a time-ordered id.
+        """
+        if after is not None and not is_decision_id(after[1]):
+            return None
+
+        by_id: Dict[str, Path] = {}
+        for path in decision_paths:
+            decision_id = name_decision_id(path.name)
+            if decision_id is None:
+                return None
+            if after is None or decision_id < after[1]:
+                by_id.setdefault(decision_id, path)
+        return [by_id[decision_id] for decision_id in sorted(by_id, reverse=True)]
 
-        for decision in decisions:
-            decision_id = decision.get('id')
-            if decision_id and decision_id not in seen_ids:
-                seen_ids.add(decision_id)
-                unique_decisions.append(decision)
+    def _read_decision_files(self, decision_paths: List[Path]) -> List[Dict[str, Any]]:
+        """Read and parse decision files (or whole day partitions), skipping unreadable ones."""
+        decisions = []
+        for json_file in self._list_decision_files(decision_paths):
+            try:
+                try:
+                    content = json_file.read_text()
+                except FileNotFoundError:
+                    # Listed before the layout migration moved it
+                    content = self.decision_layout.resolve(json_file).read_text()
+                decisions.append(json.loads(content))
+            except (json.JSONDecodeError, Exception) as e:
+                print(f"Error reading decision file {json_file}: {e}")
+        return decisions
+
+    def _decision_days(self, filters: Dict[str, Any],
+                       after: Optional[Tuple[float, str]] = None) -> List[Tuple[str, List[Path]]]:
+        """
+        Group candidate decision files by day, newest day first.
+
+        Candidates come from the role, user or date view indexes when those
+        narrow the search; otherwise each day is its partition directory,
+        listed only when the day is read, and only day directories
+        overlapping the date range are considered. Days outside the date range or after the
+        cursor are dropped from their names alone, without reading any
+        decision.
+        """
+        def utc_day(timestamp: str) -> str:
+            return parse_timestamp(timestamp).astimezone(datetime.timezone.utc).date().isoformat()
+
+        names: Optional[List[str]] = None
+        date_range = filters.get('date_range') or {}
+        first_day = utc_day(date_range['start']) if date_range.get('start') else None
+        last_day = utc_day(date_range['end']) if date_range.get('end') else None
+        if after is not None:
+            cursor_day = datetime.datetime.fromtimestamp(after[0], datetime.timezone.utc).date().isoformat()
+            last_day = min(last_day, cursor_day) if last_day else cursor_day
+
+        if filters.get('executive_role') or filters.get('user_id'):
+            # With both filters, only decisions listed in both views are candidates
+            role_names = (self.decision_views.role_entries(filters['executive_role'], first_day, last_day)
+                          if filters.get('executive_role') else None)
+            user_names = (self.decision_views.user_entries(filters['user_id'], first_day, last_day)
+                          if filters.get('user_id') else None)
+            if role_names is not None and user_names is not None:
+                user_set = set(user_names)
+                names = [name for name in role_names if name in user_set]
+            else:
+                names = role_names if role_names is not None else user_names
+        elif first_day and last_day:
+            day = datetime.date.fromisoformat(first_day)
+            names = []
+            while day.isoformat() <= last_day and names is not None:
+                entries = self.decision_views.date_entries(day.isoformat())
+                names = None if entries is None else names + entries
+                day += datetime.timedelta(days=1)
+
+        days: Dict[str, List[Path]] = {}
+        if names is None:
+            days = {day: [self.decision_layout.day_dir(day)] for day in self.decision_layout.days(first_day, last_day)}
+            # Flat files written before the partitioned layout, until migrated
+            names = [path.name for path in self.decision_layout.flat_files()]
+
+        for name in names:
+            day = Path(name).name[:10]
+            if (first_day and day < first_day) or (last_day and day > last_day):
+                continue
+            days.setdefault(day, []).append(self.decisions_dir / name)
 
-        return unique_decisions[:filters.get('limit', len(unique_decisions))]
+        return sorted(days.items(), reverse=True)
 
     def _decision_matches_filters(self, decision: Dict[str, Any], filters: Dict[str, Any]) -> bool:
         """Check if a decision matches the given filters."""
@@ -189,57 +593,146 @@ Thumbs.db
         if filters.get('user_id') and decision.get('user_id') != filters['user_id']:
             return False
 
+        # Executive role filter
+        if filters.get('executive_role') and \
+                str(decision.get('executive_role', '')).lower() != filters['executive_role'].lower():
+            return False
+
         # Decision type filter
         if filters.get('decision_type') and decision.get('decision_type') != filters['decision_type']:
             return False
 
         # Date range filter
         if filters.get('date_range'):
-            decision_date = datetime.datetime.fromisoformat(decision.get('timestamp', '').replace('Z', '+00:00'))
+            decision_date = parse_timestamp(decision.get('timestamp', ''))
 
             if filters['date_range'].get('start'):
-                start_date = datetime.datetime.fromisoformat(filters['date_range']['start'].replace('Z', '+00:00'))
+                start_date = parse_timestamp(filters['date_range']['start'])
                 if decision_date < start_date:
                     return False
 
             if filters['date_range'].get('end'):
-                end_date = datetime.datetime.fromisoformat(filters['date_range']['end'].replace('Z', '+00:00'))
+                end_date = parse_timestamp(filters['date_range']['end'])
                 if decision_date > end_date:
                     return False
 
         return True
 
-    async def persist_user_context(self, user_id: str, context: Dict[str, Any]) -> None:
-        """Persist user context to file system."""
-        context_path = self.contexts_dir / "users" / f"{user_id}.json"
-        context_path.parent.mkdir(parents=True, exist_ok=True)
+    async def fold_triplicated_decisions(self) -> Dict[str, int]:
+        """
+        Fold a triplicated decision tree into the single-copy layout.
 
-        enhanced_context = {
-            **context,
-            'user_id': user_id,
-            'last_updated': datetime.datetime.utcnow().isoformat() + "Z"
-        }
+        Keeps the canonical copy in decisions/ (restoring it from a view
+        copy when only those survived), deletes the by-role/by-date copies,
+        regenerates the view indexes and commits the result in one commit.
+        """
+        changed_paths, removed, restored, indexed = await self.io.run(self._fold_decision_files)
 
-        context_path.write_text(json.dumps(enhanced_context, indent=2, ensure_ascii=False))
+        if changed_paths:
+            await self.commit_to_git(
+                changed_paths,
+                f"Fold triplicated decisions: {removed} copies removed, {restored} restored"
+            )
 
-        await self.commit_to_git([context_path], f"Update user context: {user_id}")
+        return {'removed': removed, 'restored': restored, 'indexed': indexed}
 
-    async def get_user_context(self, user_id: str) -> Optional[Dict[str, Any]]:
-        """Retrieve user context from file system."""
-        context_path = self.contexts_dir / "users" / f"{user_id}.json"
+    def _fold_decision_files(self) -> Tuple[List[Path], int, int, int]:
+        """Fold legacy copies on disk. Returns (changed paths, removed, restored, indexed)."""
+        changed_paths: List[Path] = []
+        restored = removed = 0
 
-        if not context_path.exists():
-            return None
+        for copy_path in sorted(self.decision_views.legacy_copies()):
+            main_path = self.decision_layout.resolve(self.decisions_dir / copy_path.name)
+            if main_path.exists():
+                copy_path.unlink()
+                removed += 1
+            else:
+                main_path = self.decision_layout.path(copy_path.name)
+                main_path.parent.mkdir(parents=True, exist_ok=True)
+                copy_path.replace(main_path)
+                changed_paths.append(main_path)
+                restored += 1
+            changed_paths.append(copy_path)
+
+        view_entries = []
+        for decision_path in sorted(self.decision_layout.all_files()):
+            try:
+                decision = json.loads(decision_path.read_text())
+            except (json.JSONDecodeError, Exception) as e:
+                print(f"Error reading decision file {decision_path}: {e}")
+                continue
+            view_entries.append((
+                decision_path.relative_to(self.decisions_dir).as_posix(),
+                str(decision.get('executive_role', 'unknown')).lower(),
+                decision.get('timestamp', '').split('T')[0] or decision_path.name[:10],
+                decision.get('user_id', 'anonymous')
+            ))
+
+        changed_paths += self.decision_views.rebuild(view_entries)
+        return changed_paths, removed, restored, len(view_entries)
+
+    async def migrate_decision_layout(self, batch_size: int = 500) -> int:
+        """
+        Move flat decision files into the year/month/day/shard layout.
+
+        Runs online: files move in batches of ``batch_size`` atomic renames,
+        each batch committed on its own, while reads keep finding moved
+        files through their old view entries. The view indexes are then
+        rewritten to the new paths. Returns the number of files moved.
+        """
+        moved_count = 0
+        while True:
+            moved = await self.io.run(self.decision_layout.migrate, batch_size)
+            if not moved:
+                break
+            moved_count += len(moved)
+            await self.commit_to_git(
+                [self.decisions_dir / old for old in moved] + [self.decisions_dir / new for new in moved.values()],
+                f"Migrate {len(moved)} decisions to partitioned layout"
+            )
 
-        try:
-            return json.loads(context_path.read_text())
-        except (json.JSONDecodeError, Exception) as e:
-            print(f"Error reading user context for {user_id}: {e}")
-            return None
+        view_paths = await self.io.run(self.decision_views.relocate, self.decision_layout.current_entry)
+        if view_paths:
+            await self.commit_to_git(view_paths, f"Point {len(view_paths)} decision view(s) at partitioned layout")
+
+        return moved_count
+
+    async def persist_user_context(self, user_id: str, context: Dict[str, Any]) -> None:
+        """Persist user context to file system."""
+        async with self._user_lock(user_id):
+            context_path = await self.user_contexts.update(user_id, context, replace=True)
+
+        if context_path:
+            await self.commit_to_git([context_path], f"Update user context: {user_id}")
+
+    async def get_user_context(self, user_id: str) -> Optional[Dict[str, Any]]:
+        """Retrieve user context, including updates not flushed yet."""
+        return await self.user_contexts.get(user_id)
 
     async def update_user_context(self, user_id: str, updates: Dict[str, Any]) -> None:
         """Update user context with new information."""
-        existing_context = await self.get_user_context(user_id) or {
+        async with self._user_lock(user_id):
+            context_path = await self._apply_user_context_updates(user_id, updates)
+
+        if context_path:
+            await self.commit_to_git([context_path], f"Update user context: {user_id}")
+
+    async def _apply_user_context_updates(self, user_id: str, updates: Dict[str, Any],
+                                          token: Optional[str] = None) -> Optional[Path]:
+        """
+        Merge updates into a user context without committing it.
+
+        ``token`` is the journal entry the update belongs to; it is released
+        once the update is committed. Returns the file written, or None when
+        the update is cached until the next context flush.
+        """
+        return await self.user_contexts.update(
+            user_id, updates, default=self._default_user_context(user_id), token=token
+        )
+
+    def _default_user_context(self, user_id: str) -> Dict[str, Any]:
+        """Get the initial context for a user seen for the first time."""
+        return {
             'user_id': user_id,
             'organization_profile': {},
             'role_preferences': {},
@@ -248,9 +741,6 @@ Thumbs.db
             'custom_extensions': []
         }
 
-        existing_context.update(updates)
-        await self.persist_user_context(user_id, existing_context)
-
     async def generate_analytics(self, time_range: Optional[Dict[str, str]] = None) -> Dict[str, Any]:
         """Generate analytics snapshot for decision patterns."""
         if time_range is None:
@@ -262,12 +752,16 @@ Thumbs.db
                 'end': end_date.isoformat() + "Z"
             }
 
-        decisions = await self.get_decision_history({'date_range': time_range})
+        if self.analytics_rollups.complete:
+            rollup = await self._rollup_time_range(time_range)
+        else:
+            # Rollups not backfilled yet; aggregate the window from scratch
+            rollup = aggregate(await self.get_decision_history({'date_range': time_range}))
 
         analytics = {
             'time_range': time_range,
-            'total_decisions': len(decisions),
-            'decisions_by_role': {},
+            'total_decisions': rollup['total'],
+            'decisions_by_role': rollup['by_role'],
             'confidence_metrics': {
                 'average': 0.0,
                 'distribution': {}
@@ -277,33 +771,17 @@ Thumbs.db
             'generated_at': datetime.datetime.utcnow().isoformat() + "Z"
         }
 
-        if not decisions:
+        if not rollup['total']:
             return analytics
 
-        # Analyze decisions by role
-        for decision in decisions:
-            role = decision.get('executive_role', 'unknown')
-            analytics['decisions_by_role'][role] = analytics['decisions_by_role'].get(role, 0) + 1
-
         # Confidence metrics
-        confidences = [d.get('confidence', 0.0) for d in decisions if 'confidence' in d]
-        if confidences:
-            analytics['confidence_metrics']['average'] = sum(confidences) / len(confidences)
-
-            # Confidence distribution
-            for confidence in confidences:
-                bucket = round(confidence, 1)
-                analytics['confidence_metrics']['distribution'][str(bucket)] = \
-                    analytics['confidence_metrics']['distribution'].get(str(bucket), 0) + 1
+        if rollup['confidence_count']:
+            analytics['confidence_metrics']['average'] = rollup['confidence_sum'] / rollup['confidence_count']
+            analytics['confidence_metrics']['distribution'] = rollup['confidence_distribution']
 
         # Most active decision types
-        decision_types = {}
-        for decision in decisions:
-            decision_type = decision.get('decision_type', 'unknown')
-            decision_types[decision_type] = decision_types.get(decision_type, 0) + 1
-
         analytics['most_active_areas'] = sorted(
-            decision_types.items(),
+            rollup['decision_types'].items(),
             key=lambda x: x[1],
             reverse=True
         )[:10]
@@ -311,57 +789,312 @@ Thumbs.db
         # Persist analytics snapshot
         timestamp = datetime.datetime.utcnow().isoformat().split('T')[0]
         snapshot_path = self.analytics_dir / "snapshots" / f"{timestamp}.json"
-        snapshot_path.write_text(json.dumps(analytics, indent=2, ensure_ascii=False))
+        await self.io.run(snapshot_path.write_text, json.dumps(analytics, indent=2, ensure_ascii=False))
 
         await self.commit_to_git([snapshot_path], f"Analytics snapshot: {time_range['start']} to {time_range['end']}")
 
         return analytics
 
+    async def _rollup_time_range(self, time_range: Dict[str, str]) -> Dict[str, Any]:
+        """
+        Aggregate a time range from daily rollups.
+
+        Days the range covers completely are merged from their rollups;
+        the (at most two) partially covered edge days are aggregated from
+        their own decisions.
+        """
+        start = parse_timestamp(time_range['start']).astimezone(datetime.timezone.utc)
+        end = parse_timestamp(time_range['end']).astimezone(datetime.timezone.utc)
+        if end < start:
+            return aggregate([])
+
+        one_day = datetime.timedelta(days=1)
+        full_days = []
+        partials = []
+
+        day = start.date()
+        while day <= end.date():
+            day_start = datetime.datetime.combine(day, datetime.time(), datetime.timezone.utc)
+            day_end = day_start + one_day - datetime.timedelta(microseconds=1)
+            if start <= day_start and day_end <= end:
+                full_days.append(day.isoformat())
+            else:
+                partials.append(aggregate(await self.get_decision_history({'date_range': {
+                    'start': max(start, day_start).isoformat(),
+                    'end': min(end, day_end).isoformat()
+                }})))
+            day += one_day
+
+        return merge_rollups([await self.io.run(self.analytics_rollups.merge_days, full_days), *partials])
+
+    async def backfill_analytics(self) -> int:
+        """Rebuild every daily analytics rollup from stored decisions. Returns the decisions rolled up."""
+        decisions = [decision async for decision in self.iter_decision_history()]
+        async with self._rollup_lock:
+            rollup_paths = await self.io.run(self.analytics_rollups.backfill, decisions)
+        await self.commit_to_git(rollup_paths, f"Backfill analytics rollups: {len(decisions)} decisions")
+        return len(decisions)
+
+    async def export_columnar(self, months: Optional[List[str]] = None) -> List[Path]:
+        """
+        Compact decision fields into month-partitioned columnar files.
+
+        Without ``months``, only months whose decision count no longer
+        matches their exported partition are rewritten. Returns the
+        partitions written.
+        """
+        if not self.columnar_export.available:
+            print("Columnar export requires numpy (or pyarrow); skipping")
+            return []
+
+        if months is None:
+            months = await self._stale_columnar_months()
+
+        partition_paths = []
+        for month in months:
+            year, month_number = (int(part) for part in month.split('-'))
+            last_day = calendar.monthrange(year, month_number)[1]
+            decisions = await self.get_decision_history({'date_range': {
+                'start': f"{month}-01T00:00:00Z",
+                'end': f"{month}-{last_day:02d}T23:59:59.999999Z"
+            }})
+            partition_paths.append(await self.io.run(self.columnar_export.write_partition, month, decisions))
+
+        if partition_paths:
+            await self.commit_to_git(
+                partition_paths + [self.columnar_export.manifest_path],
+                f"Columnar export: {', '.join(months)}"
+            )
+
+        return partition_paths
+
+    async def _stale_columnar_months(self) -> List[str]:
+        """Get months whose columnar partition is missing or out of date."""
+        if self.analytics_rollups.complete:
+            totals = await self.io.run(self.analytics_rollups.monthly_totals)
+        else:
+            totals: Dict[str, int] = {}
+            async for decision in self.iter_decision_history():
+                month = decision.get('timestamp', '')[:7]
+                totals[month] = totals.get(month, 0) + 1
+
+        exported = await self.io.run(self.columnar_export.load_manifest)
+        return sorted(month for month, total in totals.items() if month and exported.get(month) != total)
+
+    def load_decision_columns(self, start_month: Optional[str] = None,
+                              end_month: Optional[str] = None) -> Dict[str, Any]:
+        """Load exported decision columns as NumPy arrays, scanning only months in range."""
+        months = [
+            month for month in self.columnar_export.load_manifest()
+            if (not start_month or month >= start_month) and (not end_month or month <= end_month)
+        ]
+        return self.columnar_export.read(months)
+
     async def get_user_decision_count(self, user_id: str) -> int:
-        """Get total decision count for a user."""
+        """
+        Get total decision count for a user.
+
+        Reads the counter kept in the user context, so each persisted
+        decision costs O(1) instead of a history scan. Contexts written
+        before counters existed fall back to counting the history once;
+        repair_user_counters() rebuilds every counter from stored decisions.
+        """
+        context = await self.get_user_context(user_id)
+        if context is None:
+            return 0
+
+        if isinstance(context.get('decision_count'), int):
+            return context['decision_count']
+
         decisions = await self.get_decision_history({'user_id': user_id})
         return len(decisions)
 
-    async def commit_to_git(self, file_paths: List[Path], message: str) -> Optional[str]:
-        """Commit files to Git with HeadElf signature."""
+    async def get_last_user_decision(self, user_id: str) -> Optional[Dict[str, Any]]:
+        """Get a user's most recent decision through the context's last-decision pointer."""
+        context = await self.get_user_context(user_id)
+        if not context or not context.get('last_decision'):
+            return None
+
+        if self.decision_log:
+            return await self.io.run(self.decision_log.get, context['last_decision'])
+
+        if context.get('last_decision_path'):
+            decision_path = await self.io.run(
+                self.decision_layout.resolve, self.data_dir / context['last_decision_path']
+            )
+            if await self.io.run(decision_path.exists):
+                return json.loads(await self.io.run(decision_path.read_text))
+
+        decisions = await self.get_decision_history({'user_id': user_id, 'limit': 1})
+        return decisions[0] if decisions else None
+
+    async def repair_user_counters(self) -> Dict[str, int]:
+        """
+        Rebuild per-user decision counters and last-decision pointers.
+
+        Scans the stored decisions once and rewrites every user context
+        (including users whose decisions are gone) in a single commit.
+        Returns the rebuilt count per user.
+        """
+        counts: Dict[str, int] = {}
+        latest: Dict[str, Dict[str, Any]] = {}
+
+        for decision in await self.get_decision_history():
+            user_id = decision.get('user_id', 'anonymous')
+            counts[user_id] = counts.get(user_id, 0) + 1
+
+            epoch = timestamp_epoch(decision.get('timestamp')) or 0.0
+            if user_id not in latest or epoch > (timestamp_epoch(latest[user_id].get('timestamp')) or 0.0):
+                latest[user_id] = decision
+
+        known_users = await self.io.run(
+            lambda: {path.stem for path in (self.contexts_dir / "users").glob("*.json")}
+        ) | self.user_contexts.dirty
+        user_ids = sorted(known_users | set(counts))
+
+        context_paths = []
+        for user_id in user_ids:
+            async with self._user_lock(user_id):
+                context = await self.get_user_context(user_id) or self._default_user_context(user_id)
+                context['decision_count'] = counts.get(user_id, 0)
+
+                decision = latest.get(user_id)
+                if decision:
+                    context['last_decision'] = decision['id']
+                    context['last_activity'] = decision.get('timestamp')
+                    context['last_decision_path'] = (
+                        None if self.decision_log
+                        else str(self._decision_path(decision).relative_to(self.data_dir))
+                    )
+
+                context_paths.append(await self.user_contexts.write(user_id, context))
+
+        if context_paths:
+            await self.commit_to_git(context_paths, f"Repair decision counters for {len(context_paths)} user(s)")
+
+        return {user_id: counts.get(user_id, 0) for user_id in user_ids}
+
+    async def commit_to_git(self, file_paths: List[Path], message: str, durable: bool = False) -> Optional[str]:
+        """
+        Commit files to Git with HeadElf signature.
+
+        With group commits enabled the files join the pending batch and the
+        shared commit hash is returned once the batch is flushed; durable=True
+        flushes the batch right away.
+        """
+        if self._recovered_journals:
+            await self.commit_recovered_writes()
+
+        if self.group_committer is None:
+            return await self._commit_files(file_paths, message)
+
+        future = self.group_committer.submit(file_paths, message)
+        if durable:
+            await self.group_committer.flush()
+
         try:
-            # Check if we're in a Git repository
-            result = await self.run_git_command(['rev-parse', '--git-dir'])
-            if not result[0]:
+            return await future
+        except Exception as e:
+            print(f"Git operation failed (continuing without version control): {e}")
+            return None
+
+    async def flush_commits(self) -> Optional[str]:
+        """Commit cached user context updates and any queued group-commit requests now."""
+        await self.user_contexts.flush()
+        if self.group_committer is None:
+            return None
+        return await self.group_committer.flush()
+
+    async def close(self) -> None:
+        """Flush pending work and stop helper processes before shutdown."""
+        await self.user_contexts.close()
+        if self.group_committer is not None:
+            await self.group_committer.close()
+        await self.object_reader.close()
+        await self.io.run(self.journal.close)
+        self.io.shutdown()
+
+    @property
+    def default_revision(self) -> str:
+        """Revision holding persisted data: the dedicated ref or HEAD."""
+        return self.plumbing_engine.ref if self.plumbing_engine else "HEAD"
+
+    async def read_git_object(self, path: Path, revision: Optional[str] = None) -> Optional[bytes]:
+        """Read a file's content as of a revision through the pooled cat-file helpers."""
+        relative_path = Path(path).relative_to(self.repo_root).as_posix()
+        return await self.object_reader.read(f"{revision or self.default_revision}:{relative_path}")
+
+    async def get_decision_at(self, decision_id: str, revision: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        """Get a decision as it was recorded at a revision, or None if not committed there."""
+        if self.decision_log:
+            location = await self.io.run(self.decision_log.locate, decision_id)
+            if location is None:
+                return None
+            segment, offset, length = location
+            content = await self.read_git_object(self.decision_log.log_dir / segment, revision)
+            if content is None or len(content) < offset + length:
                 return None
+            return json.loads(content[offset:offset + length])
 
-            # Add files to Git
-            for file_path in file_paths:
-                relative_path = file_path.relative_to(self.repo_root)
-                await self.run_git_command(['add', str(relative_path)])
+        decision_path = await self.io.run(self.decision_layout.find, decision_id)
+        if decision_path is None:
+            return None
+        content = await self.read_git_object(decision_path, revision)
+        return json.loads(content) if content is not None else None
+
+    async def _commit_files(self, file_paths: List[Path], message: str) -> Optional[str]:
+        """Commit files through the configured commit engine."""
+        try:
+            # Check once if we're in a Git repository
+            if self._is_git_repo is None:
+                result = await self.run_git_command(['rev-parse', '--git-dir'])
+                self._is_git_repo = result[0]
+            if not self._is_git_repo:
+                return None
 
             # Create commit message
             commit_message = f"[HeadElf] {message}\n\nGenerated by HeudElf Executive Intelligence System\nTimestamp: {datetime.datetime.utcnow().isoformat()}Z\nFiles: {len(file_paths)} file(s)"
 
-            # Commit
-            commit_result = await self.run_git_command(['commit', '-m', commit_message])
-            if not commit_result[0]:
-                return None
+            # Other processes writing to this repository commit through the same index
+            async with self.commit_lock:
+                if self.plumbing_engine:
+                    return await self.plumbing_engine.commit(file_paths, commit_message)
 
-            # Get commit hash
-            hash_result = await self.run_git_command(['rev-parse', 'HEAD'])
-            return hash_result[1].strip() if hash_result[0] else None
+                # Stage files in one process, and deletions in another
+                relative_paths = [str(file_path.relative_to(self.repo_root)) for file_path in file_paths if file_path.exists()]
+                removed_paths = [str(file_path.relative_to(self.repo_root)) for file_path in file_paths if not file_path.exists()]
+                if relative_paths:
+                    await self.run_git_command(['add', '--', *relative_paths])
+                if removed_paths:
+                    await self.run_git_command(['rm', '--cached', '--quiet', '--ignore-unmatch', '--', *removed_paths])
+
+                # Commit
+                commit_result = await self.run_git_command(['commit', '-m', commit_message])
+                if not commit_result[0]:
+                    return None
+
+                # Get commit hash
+                hash_result = await self.run_git_command(['rev-parse', 'HEAD'])
+                return hash_result[1].strip() if hash_result[0] else None
 
         except Exception as e:
             print(f"Git operation failed (continuing without version control): {e}")
             return None
 
-    async def run_git_command(self, args: List[str]) -> Tuple[bool, str]:
+    async def run_git_command(self, args: List[str], input_data: Optional[bytes] = None,
+                              env: Optional[Dict[str, str]] = None) -> Tuple[bool, str]:
         """Run a Git command and return success status and output."""
         try:
             process = await asyncio.create_subprocess_exec(
                 'git', *args,
                 cwd=self.repo_root,
+                stdin=asyncio.subprocess.PIPE if input_data is not None else None,
                 stdout=asyncio.subprocess.PIPE,
-                stderr=asyncio.subprocess.PIPE
+                stderr=asyncio.subprocess.PIPE,
+                env={**os.environ, **env} if env else None
             )
 
-            stdout, stderr = await process.communicate()
+            stdout, stderr = await process.communicate(input_data)
 
             if process.returncode == 0:
                 return True, stdout.decode('utf-8')
@@ -372,8 +1105,8 @@ Thumbs.db
             return False, str(e)
 
     def generate_decision_id(self) -> str:
-        """Generate a unique decision ID."""
-        return f"{int(datetime.datetime.utcnow().timestamp() * 1000)}-{uuid.uuid4().hex[:8]}"
+        """Generate a unique, time-ordered decision ID."""
+        return new_decision_id()
 
     async def register_extension(self, extension_repo: str, version: Optional[str] = None) -> bool:
         """Register an extension from a Git repository."""
@@ -411,7 +1144,7 @@ Thumbs.db
             manifest = {}
 
             if manifest_path.exists():
-                manifest = json.loads(manifest_path.read_text())
+                manifest = json.loads(await self.io.run(manifest_path.read_text))
 
             manifest[extension_name] = {
                 'repository': extension_repo,
@@ -420,7 +1153,7 @@ Thumbs.db
                 'path': str(extension_path)
             }
 
-            manifest_path.write_text(json.dumps(manifest, indent=2))
+            await self.io.run(manifest_path.write_text, json.dumps(manifest, indent=2))
 
             await self.commit_to_git([manifest_path], f"Register extension: {extension_name}")
 
@@ -430,15 +1163,19 @@ Thumbs.db
             print(f"Extension registration failed: {e}")
             return False
 
-    async def get_installed_extensions(self) -> Dict[str, Any]:
-        """Get list of installed extensions."""
+    async def get_installed_extensions(self, revision: Optional[str] = None) -> Dict[str, Any]:
+        """Get list of installed extensions, optionally as of a Git revision."""
         manifest_path = self.extensions_dir / "manifest.json"
 
+        if revision:
+            content = await self.read_git_object(manifest_path, revision)
+            return json.loads(content) if content is not None else {}
+
         if not manifest_path.exists():
             return {}
 
         try:
-            return json.loads(manifest_path.read_text())
+            return json.loads(await self.io.run(manifest_path.read_text))
         except (json.JSONDecodeError, Exception) as e:
             print(f"Error reading extensions manifest: {e}")
             return {}
@@ -487,4 +1224,52 @@ class ExecutorPersistenceIntegration:
             'user_context': user_context,
             'recent_similar_decisions': recent_decisions,
             'learning_patterns': user_context.get('learning_patterns', {}) if user_context else {}
-        }
\ No newline at end of file
+        }
+
+
+def main():
+    """Persistence maintenance entry point."""
+    import argparse
+
+    parser = argparse.ArgumentParser(description="HeadElf Git Persistence Maintenance")
+    parser.add_argument("--repo-root", default=None, help="Repository holding the data/ tree (default: cwd)")
+    parser.add_argument("--storage-backend", choices=["files", "log"], default="files",
+                        help="Decision storage backend in use")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    subparsers.add_parser("repair-counters", help="Rebuild per-user decision counters from stored decisions")
+    subparsers.add_parser("fold-decisions", help="Fold triplicated decision copies into single-copy storage")
+    subparsers.add_parser("backfill-analytics", help="Rebuild daily analytics rollups from stored decisions")
+    export_parser = subparsers.add_parser("export-columnar", help="Export decisions to monthly columnar partitions")
+    export_parser.add_argument("--months", nargs="*", help="Months (YYYY-MM) to export (default: stale months)")
+    migrate_parser = subparsers.add_parser("migrate-layout",
+                                           help="Move flat decision files into year/month/day/shard partitions")
+    migrate_parser.add_argument("--batch-size", type=int, default=500, help="Files moved per commit")
+    subparsers.add_parser("recover", help="Replay persists interrupted by a crash and commit the result")
+
+    args = parser.parse_args()
+    manager = GitPersistenceManager(args.repo_root, storage_backend=args.storage_backend)
+
+    if args.command == "repair-counters":
+        counts = asyncio.run(manager.repair_user_counters())
+        print(f"Rebuilt decision counters for {len(counts)} user(s)")
+    elif args.command == "fold-decisions":
+        stats = asyncio.run(manager.fold_triplicated_decisions())
+        print(f"Folded decisions: {stats['removed']} copies removed, {stats['restored']} restored, "
+              f"{stats['indexed']} indexed")
+    elif args.command == "backfill-analytics":
+        count = asyncio.run(manager.backfill_analytics())
+        print(f"Rolled up {count} decision(s) into daily analytics")
+    elif args.command == "export-columnar":
+        partitions = asyncio.run(manager.export_columnar(args.months or None))
+        print(f"Wrote {len(partitions)} columnar partition(s)")
+    elif args.command == "migrate-layout":
+        moved = asyncio.run(manager.migrate_decision_layout(args.batch_size))
+        print(f"Moved {moved} decision file(s) into the partitioned layout")
+    elif args.command == "recover":
+        # Replay already ran when the manager opened the journal
+        commit_hash = asyncio.run(manager.commit_recovered_writes())
+        print(f"Committed recovered writes: {commit_hash}" if commit_hash else "No interrupted persists to recover")
+
+
+if __name__ == "__main__":
+    main()
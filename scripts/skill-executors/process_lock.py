@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+"""
+Cross-Process Locks for HeadElf Persistence
+
+Several executor processes may share one ``data/`` repository. Advisory
+``flock`` locks on small lock files serialize the steps that must not
+interleave between them (staging and committing through the shared Git
+index, read-modify-write of shared aggregates) while reads proceed
+without any locking. Within a process an asyncio lock queues coroutines,
+so only one of them at a time waits on the file lock.
+
+Where ``fcntl`` is unavailable the locks only coordinate a single process.
+"""
+
+import asyncio
+import contextlib
+import os
+import time
+from pathlib import Path
+from typing import IO, Iterator, Optional
+
+try:
+    import fcntl
+    FCNTL_AVAILABLE = True
+except ImportError:
+    fcntl = None
+    FCNTL_AVAILABLE = False
+
+from blocking_io import BlockingIOExecutor
+
+
+@contextlib.contextmanager
+def exclusive_file_lock(f: IO) -> Iterator[None]:
+    """Hold an exclusive advisory lock on an open file for the duration of the block."""
+    if FCNTL_AVAILABLE:
+        fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+    try:
+        yield
+    finally:
+        if FCNTL_AVAILABLE:
+            fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+
+
+class ProcessLock:
+    """Exclusive lock shared by the coroutines and processes using one lock file."""
+
+    def __init__(self, lock_path: Path, io: Optional[BlockingIOExecutor] = None):
+        """
+        Args:
+            lock_path: Lock file (created on first use, never committed)
+            io: Executor to wait for the file lock on; async acquisition
+                blocks one of its workers instead of the event loop
+        """
+        self.lock_path = Path(lock_path)
+        self.io = io or BlockingIOExecutor(max_workers=1)
+        self._async_lock: Optional[asyncio.Lock] = None
+        self._fd: Optional[int] = None
+
+        self.acquisitions = 0
+        self.wait_time = 0.0
+
+    @property
+    def held(self) -> bool:
+        return self._fd is not None
+
+    def _open(self) -> int:
+        self.lock_path.parent.mkdir(parents=True, exist_ok=True)
+        return os.open(self.lock_path, os.O_RDWR | os.O_CREAT, 0o644)
+
+    def acquire(self) -> None:
+        """Block until the lock is held by this process."""
+        fd = self._open()
+        started = time.perf_counter()
+        try:
+            if FCNTL_AVAILABLE:
+                fcntl.flock(fd, fcntl.LOCK_EX)
+        except BaseException:
+            os.close(fd)
+            raise
+        self.wait_time += time.perf_counter() - started
+        self.acquisitions += 1
+        self._fd = fd
+
+    def try_acquire(self) -> bool:
+        """Take the lock if no other holder has it. Returns whether it was taken."""
+        fd = self._open()
+        if FCNTL_AVAILABLE:
+            try:
+                fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                os.close(fd)
+                return False
+        self.acquisitions += 1
+        self._fd = fd
+        return True
+
+    def release(self) -> None:
+        """Release the lock."""
+        fd, self._fd = self._fd, None
+        if fd is None:
+            return
+        if FCNTL_AVAILABLE:
+            fcntl.flock(fd, fcntl.LOCK_UN)
+        os.close(fd)
+
+    def __enter__(self) -> "ProcessLock":
+        self.acquire()
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.release()
+
+    async def __aenter__(self) -> "ProcessLock":
+        if self._async_lock is None:
+            self._async_lock = asyncio.Lock()
+        await self._async_lock.acquire()
+        acquiring = asyncio.ensure_future(self.io.run(self.acquire))
+        try:
+            await asyncio.shield(acquiring)
+        except asyncio.CancelledError:
+            # The worker may still get the file lock; hand it back once it does
+            def release_late(future: asyncio.Future) -> None:
+                if not future.cancelled() and future.exception() is None:
+                    self.release()
+                self._async_lock.release()
+
+            acquiring.add_done_callback(release_late)
+            raise
+        except BaseException:
+            self._async_lock.release()
+            raise
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        try:
+            self.release()
+        finally:
+            self._async_lock.release()
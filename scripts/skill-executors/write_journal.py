@@ -0,0 +1,167 @@
+#!/usr/bin/env python3
+"""
+Crash-Safe Writes and Write-Ahead Journal for HeadElf Persistence
+
+Data files are replaced atomically (temp file in the same directory, then
+rename), so readers never see a partially written record. Before a persist
+touches any file its full intent is appended to a small write-ahead journal
+and fsynced; the entry is completed once the files are synced and the
+commit attempted. Entries still open at startup belong to persists that
+were interrupted and are replayed from the journal.
+
+Each process writes its own journal and holds a lock on it while running,
+so a process only ever claims the journals of processes that have exited.
+"""
+
+import json
+import os
+import threading
+import uuid
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Union
+
+from process_lock import ProcessLock
+
+JOURNAL_PATTERN = "write-ahead-*.log"
+
+
+def atomic_write(path: Path, content: Union[str, bytes], sync: bool = False) -> Path:
+    """Replace a file's content atomically; with ``sync`` the data is fsynced before the rename."""
+    path = Path(path)
+    data = content.encode('utf-8') if isinstance(content, str) else content
+    temp_path = path.with_name(f".{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+
+    with open(temp_path, "wb") as f:
+        f.write(data)
+        if sync:
+            f.flush()
+            os.fsync(f.fileno())
+
+    os.replace(temp_path, path)
+    return path
+
+
+def fsync_paths(paths: Iterable[Path]) -> None:
+    """
+    Flush files and their directory entries to stable storage.
+
+    Each file is synced once and each parent directory once, however many
+    of the files it holds, so a persist touching several files in the same
+    directories pays for one directory sync per directory.
+    """
+    directories = {}
+    for path in dict.fromkeys(Path(path) for path in paths):
+        if not path.exists():
+            # Deleted files only need their directory entry synced
+            directories.setdefault(path.parent, None)
+            continue
+        fd = os.open(path, os.O_RDONLY)
+        try:
+            os.fsync(fd)
+        finally:
+            os.close(fd)
+        directories.setdefault(path.parent, None)
+
+    for directory in directories:
+        if not directory.exists():
+            continue
+        fd = os.open(directory, os.O_RDONLY)
+        try:
+            os.fsync(fd)
+        finally:
+            os.close(fd)
+
+
+class WriteJournal:
+    """One process's append-only journal of in-flight persists, truncated once none are open."""
+
+    def __init__(self, journal_path: Path, sync: bool = True, owner_lock: Optional[ProcessLock] = None):
+        """
+        Args:
+            journal_path: Journal file (local state, never committed)
+            sync: Fsync each opened entry before the persist proceeds
+            owner_lock: Already-held lock on the journal file; taken here if not given
+        """
+        self.journal_path = Path(journal_path)
+        self.sync = sync
+        if owner_lock is None:
+            owner_lock = ProcessLock(self.journal_path)
+            owner_lock.acquire()
+        self.owner_lock = owner_lock
+        self._lock = threading.Lock()
+        self._open_ids = {entry['txn'] for entry in self.pending()}
+
+    @classmethod
+    def create(cls, journal_dir: Path, sync: bool = True) -> "WriteJournal":
+        """Start a new journal for this process."""
+        return cls(Path(journal_dir) / f"write-ahead-{os.getpid()}-{uuid.uuid4().hex[:8]}.log", sync)
+
+    @classmethod
+    def claim_orphans(cls, journal_dir: Path, sync: bool = True) -> List["WriteJournal"]:
+        """Take over the journals of processes that are no longer running."""
+        orphans = []
+        for journal_path in sorted(Path(journal_dir).glob(JOURNAL_PATTERN)):
+            lock = ProcessLock(journal_path)
+            if lock.try_acquire():
+                orphans.append(cls(journal_path, sync, owner_lock=lock))
+        return orphans
+
+    def pending(self) -> List[Dict[str, Any]]:
+        """Get entries opened but never completed, in journal order."""
+        if not self.journal_path.exists():
+            return []
+
+        opened: Dict[str, Dict[str, Any]] = {}
+        with open(self.journal_path, "rb") as f:
+            for line in f:
+                if not line.endswith(b"\n"):
+                    # Torn append from a crash; its persist never started
+                    break
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    continue
+                if record.get('op') == 'begin':
+                    opened[record['txn']] = record
+                elif record.get('op') == 'done':
+                    opened.pop(record['txn'], None)
+
+        return list(opened.values())
+
+    def _append(self, records: List[Dict[str, Any]], sync: bool) -> None:
+        self.journal_path.parent.mkdir(parents=True, exist_ok=True)
+        data = "".join(json.dumps(record, ensure_ascii=False, separators=(',', ':')) + "\n" for record in records)
+        with open(self.journal_path, "ab") as f:
+            f.write(data.encode('utf-8'))
+            if sync:
+                f.flush()
+                os.fsync(f.fileno())
+
+    def begin(self, kind: str, **payload: Any) -> str:
+        """Durably record the intent of a persist before any of its files are written. Returns its id."""
+        txn_id = uuid.uuid4().hex
+        with self._lock:
+            self._append([{'op': 'begin', 'txn': txn_id, 'kind': kind, **payload}], sync=self.sync)
+            self._open_ids.add(txn_id)
+        return txn_id
+
+    def complete(self, txn_ids: Iterable[str]) -> None:
+        """Mark persists finished; the journal is emptied once nothing is open."""
+        txn_ids = [txn_id for txn_id in txn_ids if txn_id in self._open_ids]
+        if not txn_ids:
+            return
+
+        with self._lock:
+            self._open_ids.difference_update(txn_ids)
+            if self._open_ids:
+                # Losing these records only means an idempotent replay
+                self._append([{'op': 'done', 'txn': txn_id} for txn_id in txn_ids], sync=False)
+            else:
+                self.journal_path.write_bytes(b"")
+
+    def close(self) -> None:
+        """Remove the journal if nothing is open in it and release it to later processes."""
+        with self._lock:
+            if not self._open_ids and self.journal_path.exists():
+                self.journal_path.unlink()
+            self.owner_lock.release()
@@ -97,6 +97,7 @@ setup(
         "analytics": [
             "pandas>=2.0.0",
             "numpy>=1.24.0",
+            "pyarrow>=12.0.0",
             "matplotlib>=3.7.0",
             "plotly>=5.13.0"
         ],
@@ -6,237 +6,509 @@ Provides comprehensive C-suite executive intelligence and industry vertical exte
 """
 
 import os
-import importlib
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import Dict, List, Any, Optional
+from typing import Dict, List, Any, Iterator, Mapping, Optional, Tuple
+
+from .skill_info import (
+    SKILL_DESCRIPTOR_KEYS,
+    SkillInfo,
+    SkillStore,
+    declared_module_names,
+    describe_skill,
+    import_skill_module,
+    make_skill_id,
+    read_skill_content,
+    skill_snapshot
+)
+from .skill_manifest import SkillManifest, parse_skill_metadata
+from .query_cache import QueryResultCache
+from .skill_corpus import SkillCorpus
+from .skill_search import SkillSearchIndex
+from .skill_triggers import TriggerAutomaton
 
 class HeadElfSkillRegistry:
-    """Registry for all HeadElf skills and capabilities."""
-
-    def __init__(self):
-        self.skills = {}
-        self.executive_skills = {}
-        self.industry_skills = {}
-        self.security_skills = {}
-        self.architecture_skills = {}
-        self.advanced_skills = {}
-        self.reasoning_skills = {}
+    """
+    Registry for all HeadElf skills and capabilities.
+
+    Skills are stored as slotted SkillInfo records, and the category maps
+    are dict-compatible views over integer positions into one record list.
+    With ``lazy=True`` the registry holds lightweight descriptors only and
+    reads skill.md content or imports skill modules on first access. With
+    ``load_workers`` above 1, eager loads read skill files on a bounded
+    thread pool and import modules serially in discovery order. With
+    ``corpus_path`` set, skill content is packed into one memory-mapped
+    corpus file and served as slices of it rather than held per process.
+    """
+
+    # C-suite executive skill directories, in registration order
+    EXECUTIVE_SKILL_DIRS = [
+        "cto-intelligence",
+        "cio-intelligence",
+        "ciso-intelligence",
+        "cfo-intelligence",
+        "coo-intelligence",
+        "clo-intelligence",
+        "chro-intelligence",
+        "cmso-intelligence",
+        "cpo-intelligence"
+    ]
+
+    # Security subdirectories and the skill category each one registers as
+    SECURITY_CATEGORIES = [
+        ("executive", "security-executive"),  # CSO, CRO, CPO-Privacy
+        ("operational", "security-operational"),  # SOC, IAM, etc.
+        ("compliance", "security-compliance"),  # Compliance, Audit, etc.
+        ("specialized", "security-specialized")  # Forensics, Incident Response, etc.
+    ]
+
+    # Advanced reasoning skill directories, in registration order
+    ADVANCED_SKILL_NAMES = [
+        "adversarial-intelligence",
+        "formal-proof-construction",
+        "system-builder-experience",
+        "intellectual-honesty-enforcement",
+        "risk-managed-analysis",
+        "executive-diagnostic-depth",
+        "conviction-based-decision-making",
+        "financial-fluency-and-modeling",
+        "political-dynamics-analysis",
+        "regulatory-and-compliance-fluency",
+        "premise-challenging-analysis"
+    ]
+
+    ARCHITECTURE_CATEGORIES = [
+        "application",
+        "cloud-mastery",
+        "architecture-mastery",
+        "advanced"
+    ]
+
+    # Highest score full-text relevance alone can give a skill
+    SEARCH_SCORE_CEILING = 0.9
+
+    # Skill module functions find_skill_by_query scores queries with
+    ROUTING_FUNCTIONS = ("get_weighted_triggers", "skill_matches")
+
+    def __init__(self, lazy: bool = False, skills_dir: Optional[Path] = None,
+                 manifest_path: Optional[Path] = None, query_cache_size: int = 256,
+                 query_cache_ttl: Optional[float] = None, load_workers: int = 0,
+                 corpus_path: Optional[Path] = None):
+        self.lazy = lazy
+        self.corpus_path = Path(corpus_path) if corpus_path else None
+        self.corpus = None
+        self.load_workers = load_workers
+        self.query_cache = QueryResultCache(maxsize=query_cache_size, ttl=query_cache_ttl)
+        self.skills_dir = Path(skills_dir) if skills_dir else Path(__file__).parent
+        self.manifest = SkillManifest.load(manifest_path, self.skills_dir) if manifest_path else None
+        self._store = SkillStore()
+        self.skills = self._store.all
+        (self.executive_skills, self.industry_skills, self.security_skills,
+         self.reasoning_skills, self.architecture_skills, self.advanced_skills) = self._store.collections
+        self._skill_metadata = {}
+        self._snapshots = {}
+        self._search_index = None
+        self._trigger_automaton = None
+        self._skill_matchers = {}
         self._initialize_skills()
+        if self.corpus_path is not None:
+            self._attach_corpus()
 
     def _initialize_skills(self):
         """Initialize all HeadElf skills."""
-        skills_dir = Path(__file__).parent
+        # Reuse the precompiled manifest when nothing on disk has changed
+        if self.manifest is not None:
+            if self.manifest.is_current():
+                for entry in self.manifest.entries:
+                    self._load_manifest_entry(entry)
+                return
+            self.manifest.begin_rebuild(self._watched_directories())
+
+        if self.load_workers > 1 and not self.lazy and self.corpus_path is None:
+            self._load_skills_parallel(list(self._discover_skills()))
+        else:
+            for skill_dir, category in self._discover_skills():
+                self._load_skill(skill_dir, category)
 
-        # Load executive skills
-        self._load_executive_skills(skills_dir / "executive")
+        if self.manifest is not None:
+            self.manifest.finish_rebuild()
 
-        # Load industry skills
-        self._load_industry_skills(skills_dir / "industry")
+    def _load_skills_parallel(self, discovered: List[Tuple[Path, str]]):
+        """Read skill files on a thread pool, then import and register in walk order."""
+        with ThreadPoolExecutor(max_workers=self.load_workers) as executor:
+            prepared = executor.map(self._read_skill_files, discovered)
 
-        # Load security skills
-        self._load_security_skills(skills_dir / "security")
+            # Imports are not thread-safe to interleave, so they stay on this thread
+            for (skill_dir, category), result in zip(discovered, prepared):
+                try:
+                    if isinstance(result, Exception):
+                        raise result
+                    descriptor, content, snapshot = result
 
-        # Load advanced reasoning skills
-        self._load_advanced_skills(skills_dir / "advanced")
+                    if self.manifest is not None:
+                        entry = self.manifest.describe(skill_dir, category)
+                        self._skill_metadata[entry["id"]] = entry["metadata"]
+                        descriptor = {key: entry[key] for key in SKILL_DESCRIPTOR_KEYS}
 
-        # Load architecture skills
-        self._load_architecture_skills(skills_dir)
+                    self._load_skill_descriptor(descriptor, content=content, snapshot=snapshot)
 
-    def _load_executive_skills(self, executive_dir: Path):
-        """Load all C-suite executive skills."""
-        if not executive_dir.exists():
-            return
+                except Exception as e:
+                    print(f"Error loading skill from {skill_dir}: {e}")
 
-        executive_skill_dirs = [
-            "cto-intelligence",
-            "cio-intelligence",
-            "ciso-intelligence",
-            "cfo-intelligence",
-            "coo-intelligence",
-            "clo-intelligence",
-            "chro-intelligence",
-            "cmso-intelligence",
-            "cpo-intelligence"
+    @staticmethod
+    def _read_skill_files(item: Tuple[Path, str]):
+        """Stat and read one skill's files; runs on a loader thread."""
+        skill_dir, category = item
+        try:
+            return describe_skill(skill_dir, category), read_skill_content(skill_dir), skill_snapshot(skill_dir)
+        except Exception as e:
+            return e
+
+    def _discover_skills(self) -> Iterator[Tuple[Path, str]]:
+        """Walk the skills tree, yielding (skill directory, category) in load order."""
+        skills_dir = self.skills_dir
+
+        # Executive skills
+        yield from self._discover_executive_skills(skills_dir / "executive")
+
+        # Industry skills
+        yield from self._discover_industry_skills(skills_dir / "industry")
+
+        # Security skills
+        yield from self._discover_security_skills(skills_dir / "security")
+
+        # Advanced reasoning skills
+        yield from self._discover_advanced_skills(skills_dir / "advanced")
+
+        # Architecture skills
+        yield from self._discover_architecture_skills(skills_dir)
+
+    def _watched_directories(self) -> List[Path]:
+        """Get the directories whose listings determine which skills load."""
+        directories = [
+            self.skills_dir,
+            self.skills_dir / "executive",
+            self.skills_dir / "industry",
+            self.skills_dir / "security",
+            self.skills_dir / "advanced"
         ]
+        directories.extend(self.skills_dir / "security" / name for name, _ in self.SECURITY_CATEGORIES)
+        directories.extend(self.skills_dir / category for category in self.ARCHITECTURE_CATEGORIES)
+        return list(dict.fromkeys(directories))
+
+    def _discover_executive_skills(self, executive_dir: Path) -> Iterator[Tuple[Path, str]]:
+        """Find all C-suite executive skills."""
+        if not executive_dir.exists():
+            return
 
-        for skill_dir_name in executive_skill_dirs:
+        for skill_dir_name in self.EXECUTIVE_SKILL_DIRS:
             skill_dir = executive_dir / skill_dir_name
             if skill_dir.exists():
-                self._load_skill(skill_dir, "executive")
+                yield skill_dir, "executive"
 
-    def _load_industry_skills(self, industry_dir: Path):
-        """Load all industry vertical skills."""
+    def _discover_industry_skills(self, industry_dir: Path) -> Iterator[Tuple[Path, str]]:
+        """Find all industry vertical skills."""
         if not industry_dir.exists():
             return
 
         # Scan for industry skill directories
-        for skill_dir in industry_dir.iterdir():
-            if skill_dir.is_dir() and (skill_dir / "skill.md").exists():
-                self._load_skill(skill_dir, "industry")
+        yield from self._discover_skills_in_category(industry_dir, "industry")
 
-    def _load_security_skills(self, security_dir: Path):
-        """Load all security framework skills."""
+    def _discover_security_skills(self, security_dir: Path) -> Iterator[Tuple[Path, str]]:
+        """Find all security framework skills."""
         if not security_dir.exists():
             return
 
-        # Load security skills from all categories
-        security_categories = [
-            ("executive", "security-executive"),  # CSO, CRO, CPO-Privacy
-            ("operational", "security-operational"),  # SOC, IAM, etc.
-            ("compliance", "security-compliance"),  # Compliance, Audit, etc.
-            ("specialized", "security-specialized")  # Forensics, Incident Response, etc.
-        ]
-
-        for category_name, skill_category in security_categories:
+        # Security skills from all categories
+        for category_name, skill_category in self.SECURITY_CATEGORIES:
             category_dir = security_dir / category_name
             if category_dir.exists():
-                self._load_skills_from_category(category_dir, skill_category)
+                yield from self._discover_skills_in_category(category_dir, skill_category)
 
-    def _load_advanced_skills(self, advanced_dir: Path):
-        """Load all advanced reasoning skills."""
+    def _discover_advanced_skills(self, advanced_dir: Path) -> Iterator[Tuple[Path, str]]:
+        """Find all advanced reasoning skills."""
         if not advanced_dir.exists():
             return
 
-        # Load advanced reasoning skills
-        advanced_skill_names = [
-            "adversarial-intelligence",
-            "formal-proof-construction",
-            "system-builder-experience",
-            "intellectual-honesty-enforcement",
-            "risk-managed-analysis",
-            "executive-diagnostic-depth",
-            "conviction-based-decision-making",
-            "financial-fluency-and-modeling",
-            "political-dynamics-analysis",
-            "regulatory-and-compliance-fluency",
-            "premise-challenging-analysis"
-        ]
-
-        for skill_name in advanced_skill_names:
+        for skill_name in self.ADVANCED_SKILL_NAMES:
             skill_dir = advanced_dir / skill_name
             if skill_dir.exists():
-                self._load_skill(skill_dir, "advanced-reasoning")
-
-    def _load_architecture_skills(self, skills_dir: Path):
-        """Load architecture and advanced skills."""
-        architecture_categories = [
-            "application",
-            "cloud-mastery",
-            "architecture-mastery",
-            "advanced"
-        ]
+                yield skill_dir, "advanced-reasoning"
 
-        for category in architecture_categories:
+    def _discover_architecture_skills(self, skills_dir: Path) -> Iterator[Tuple[Path, str]]:
+        """Find architecture and advanced skills."""
+        for category in self.ARCHITECTURE_CATEGORIES:
             category_dir = skills_dir / category
             if category_dir.exists():
-                self._load_skills_from_category(category_dir, category)
+                yield from self._discover_skills_in_category(category_dir, category)
 
-    def _load_skills_from_category(self, category_dir: Path, category: str):
-        """Load all skills from a category directory."""
+    def _discover_skills_in_category(self, category_dir: Path, category: str) -> Iterator[Tuple[Path, str]]:
+        """Find all skills in a category directory."""
         for skill_dir in category_dir.iterdir():
             if skill_dir.is_dir() and (skill_dir / "skill.md").exists():
-                self._load_skill(skill_dir, category)
+                yield skill_dir, category
 
     def _load_skill(self, skill_dir: Path, category: str):
         """Load a single skill from its directory."""
         try:
-            skill_name = skill_dir.name
-            skill_id = f"headelf-{category}-{skill_name}"
+            if self.manifest is not None:
+                entry = self.manifest.describe(skill_dir, category)
+                self._load_manifest_entry(entry)
+            else:
+                self._load_skill_descriptor(describe_skill(skill_dir, category))
 
-            # Try to load Python __init__.py if it exists
-            init_file = skill_dir / "__init__.py"
-            skill_module = None
+        except Exception as e:
+            print(f"Error loading skill from {skill_dir}: {e}")
 
-            if init_file.exists():
-                try:
-                    # Import the skill module
-                    module_name = f"skills.{category}.{skill_name.replace('-', '_')}"
-                    skill_module = importlib.import_module(module_name)
-                except ImportError:
-                    skill_module = None
-
-            # Load skill.md content
-            skill_md_file = skill_dir / "skill.md"
-            skill_content = ""
-            if skill_md_file.exists():
-                with open(skill_md_file, 'r', encoding='utf-8') as f:
-                    skill_content = f.read()
-
-            # Create skill registration
-            skill_info = {
-                "id": skill_id,
-                "name": skill_name.replace('-', ' ').title(),
-                "category": category,
-                "directory": str(skill_dir),
-                "has_module": skill_module is not None,
-                "has_content": bool(skill_content),
-                "content": skill_content,
-                "module": skill_module
-            }
+    def _load_manifest_entry(self, entry: Dict[str, Any]):
+        """Load a skill from its precompiled manifest entry."""
+        self._skill_metadata[entry["id"]] = entry["metadata"]
+        self._load_skill_descriptor({key: entry[key] for key in SKILL_DESCRIPTOR_KEYS})
+
+    def _load_skill_descriptor(self, descriptor: Dict[str, Any], content: Optional[str] = None,
+                               snapshot: Optional[Tuple] = None):
+        """Create and register the skill record for a descriptor."""
+        skill_dir = Path(descriptor["directory"])
+        category = descriptor["category"]
+
+        if self.lazy:
+            # Defer skill.md reads and module imports until first access
+            skill_info = SkillInfo(descriptor)
+        elif self.corpus_path is not None:
+            # Content comes from the shared corpus mapping once attached
+            skill_info = SkillInfo(descriptor)
+            skill_info["module"] = import_skill_module(skill_dir, category)
+        else:
+            skill_module = import_skill_module(skill_dir, category)
+            skill_content = read_skill_content(skill_dir) if content is None else content
+            skill_info = SkillInfo.loaded(descriptor, skill_content, skill_module)
+
+        self._snapshots[descriptor["id"]] = snapshot or skill_snapshot(skill_dir)
+
+        # Add to the registry and the skill's category collection
+        self._store.put(skill_info)
+
+    def reload_skill(self, skill_id: str) -> bool:
+        """Reload a registered skill from its directory and invalidate cached results."""
+        skill_info = self.skills.get(skill_id)
+        if skill_info is None:
+            return False
+
+        self._skill_metadata.pop(skill_id, None)
+        self._load_skill_descriptor(describe_skill(Path(skill_info["directory"]), skill_info["category"]))
+        if self.corpus is not None:
+            self._attach_corpus()
+        self._update_query_state(stale=[skill_id], fresh=[skill_id])
+        return True
+
+    def refresh(self) -> Dict[str, List[str]]:
+        """
+        Reload only the skills added, removed or modified since they were loaded.
+
+        Changes are detected from mtime/size/inode snapshots of each skill's
+        files. Category maps, the search index and the query cache are
+        updated in place, keeping the same ordering a full reload would give.
+        """
+        discovered = {
+            make_skill_id(category, skill_dir.name): (skill_dir, category)
+            for skill_dir, category in self._discover_skills()
+        }
+
+        removed = [skill_id for skill_id in self.skills if skill_id not in discovered]
+        added = [skill_id for skill_id in discovered if skill_id not in self.skills]
+        modified = [
+            skill_id for skill_id, (skill_dir, _) in discovered.items()
+            if skill_id in self.skills and skill_snapshot(skill_dir) != self._snapshots.get(skill_id)
+        ]
+        changes = {"added": added, "removed": removed, "modified": modified}
+        if not (added or removed or modified):
+            return changes
 
-            # Add to appropriate skill collection
-            self.skills[skill_id] = skill_info
-
-            if category == "executive":
-                self.executive_skills[skill_id] = skill_info
-            elif category == "industry":
-                self.industry_skills[skill_id] = skill_info
-            elif category.startswith("security-"):
-                self.security_skills[skill_id] = skill_info
-            elif category == "advanced-reasoning":
-                self.reasoning_skills[skill_id] = skill_info
-            elif category in ["application", "cloud-mastery", "architecture-mastery"]:
-                self.architecture_skills[skill_id] = skill_info
-            elif category == "advanced":
-                self.advanced_skills[skill_id] = skill_info
+        for skill_id in removed:
+            self._unregister_skill(skill_id)
 
-        except Exception as e:
-            print(f"Error loading skill from {skill_dir}: {e}")
+        if self.manifest is not None:
+            self.manifest.begin_rebuild(self._watched_directories())
+
+        changed = set(added) | set(modified)
+        for skill_id, (skill_dir, category) in discovered.items():
+            if skill_id in changed:
+                self._skill_metadata.pop(skill_id, None)
+                self._load_skill(skill_dir, category)
+            elif self.manifest is not None:
+                # Unchanged entries are carried over by stat alone
+                self.manifest.describe(skill_dir, category)
+
+        if self.manifest is not None:
+            self.manifest.finish_rebuild()
+
+        self._store.reorder(list(discovered))
+        if self.corpus is not None:
+            self._attach_corpus()
+        self._update_query_state(stale=removed + modified, fresh=added + modified)
+        return changes
+
+    def _unregister_skill(self, skill_id: str):
+        """Remove a skill record from the registry and its category collection."""
+        self._store.remove(skill_id)
+        self._snapshots.pop(skill_id, None)
+        self._skill_metadata.pop(skill_id, None)
+
+    def _attach_corpus(self):
+        """Open the corpus file, repacking it if skills changed, and attach records."""
+        descriptors = [
+            {key: skill_info[key] for key in SKILL_DESCRIPTOR_KEYS}
+            for skill_info in self.skills.values()
+        ]
 
-    def get_all_skills(self) -> Dict[str, Any]:
+        corpus = SkillCorpus.open(self.corpus_path)
+        if corpus is None or not corpus.matches(descriptors):
+            if corpus is not None:
+                corpus.close()
+            corpus = SkillCorpus.build(self.corpus_path, descriptors)
+
+        previous, self.corpus = self.corpus, corpus
+        for skill_info in self.skills.values():
+            skill_info.attach_corpus(corpus)
+        if previous is not None:
+            previous.close()
+
+    def _skill_collections(self) -> List[Mapping]:
+        """Get the main skill map followed by every category map."""
+        return [
+            self.skills,
+            self.executive_skills,
+            self.industry_skills,
+            self.security_skills,
+            self.reasoning_skills,
+            self.architecture_skills,
+            self.advanced_skills
+        ]
+
+    def _update_query_state(self, stale: List[str], fresh: List[str]):
+        """Update the search index in place and drop results derived from old records."""
+        if self._search_index is not None:
+            for skill_id in stale:
+                self._search_index.remove(skill_id)
+            for skill_id in fresh:
+                skill_info = self.skills.get(skill_id)
+                if skill_info is not None:
+                    self._search_index.add(skill_id, skill_info["name"], self._skill_text(skill_info))
+
+        # Trigger tables come from skill modules and recompile cheaply on next use
+        self._trigger_automaton = None
+        self.query_cache.clear()
+
+    def get_query_cache_stats(self) -> Dict[str, Any]:
+        """Get hit/miss counters for the query result cache."""
+        return self.query_cache.get_stats()
+
+    def get_skill_metadata(self, skill_id: str) -> Dict[str, Any]:
+        """Get the parsed metadata.yml fields for a skill."""
+        if skill_id not in self._skill_metadata:
+            skill_info = self.skills.get(skill_id)
+            if skill_info is None:
+                return {}
+            self._skill_metadata[skill_id] = parse_skill_metadata(Path(skill_info["directory"]))
+        return self._skill_metadata[skill_id]
+
+    def get_all_skills(self) -> Mapping[str, SkillInfo]:
         """Get all registered skills."""
         return self.skills
 
-    def get_executive_skills(self) -> Dict[str, Any]:
+    def get_executive_skills(self) -> Mapping[str, SkillInfo]:
         """Get all C-suite executive skills."""
         return self.executive_skills
 
-    def get_industry_skills(self) -> Dict[str, Any]:
+    def get_industry_skills(self) -> Mapping[str, SkillInfo]:
         """Get all industry vertical skills."""
         return self.industry_skills
 
-    def get_security_skills(self) -> Dict[str, Any]:
+    def get_security_skills(self) -> Mapping[str, SkillInfo]:
         """Get all security framework skills."""
         return self.security_skills
 
-    def get_reasoning_skills(self) -> Dict[str, Any]:
+    def get_reasoning_skills(self) -> Mapping[str, SkillInfo]:
         """Get all advanced reasoning skills."""
         return self.reasoning_skills
 
-    def get_architecture_skills(self) -> Dict[str, Any]:
+    def get_architecture_skills(self) -> Mapping[str, SkillInfo]:
         """Get all software architecture skills."""
         return self.architecture_skills
 
+    def get_search_index(self) -> SkillSearchIndex:
+        """Get the full-text search index, building it on first use."""
+        if self._search_index is None:
+            self._search_index = SkillSearchIndex.build(
+                (skill_id, skill_info["name"], self._skill_text(skill_info))
+                for skill_id, skill_info in self.skills.items()
+            )
+        return self._search_index
+
+    def _skill_text(self, skill_info: SkillInfo) -> str:
+        """Get skill content for indexing without pinning lazy records in memory."""
+        if not (skill_info.content_loaded or skill_info.content_mapped):
+            return read_skill_content(Path(skill_info["directory"]))
+        return skill_info["content"]
+
+    def get_trigger_automaton(self) -> TriggerAutomaton:
+        """Get the compiled trigger automaton, building it on first use."""
+        if self._trigger_automaton is None:
+            triggers, self._skill_matchers = [], {}
+            for skill_id, module in self._routing_modules():
+                if hasattr(module, 'get_weighted_triggers'):
+                    triggers += [(skill_id, trigger, weight) for trigger, weight in module.get_weighted_triggers()]
+                elif hasattr(module, 'skill_matches'):
+                    self._skill_matchers[skill_id] = module.skill_matches
+            self._trigger_automaton = TriggerAutomaton.build(triggers)
+        return self._trigger_automaton
+
+    def _routing_modules(self):
+        """
+        Yield (skill_id, module) for skill modules that can score queries.
+
+        Modules not imported yet are parsed first and imported only if they
+        define a routing function, so lazy registries route without
+        importing every skill.
+        """
+        for skill_id, skill_info in self.skills.items():
+            if not (skill_info.module_loaded or
+                    declared_module_names(Path(skill_info["directory"]), self.ROUTING_FUNCTIONS)):
+                continue
+            module = skill_info["module"]
+            if module is not None:
+                yield skill_id, module
+
     def find_skill_by_query(self, query: str) -> List[Dict[str, Any]]:
-        """Find skills matching a query string."""
-        query_lower = query.lower()
+        """
+        Find skills matching a query string.
+
+        Skills are ranked with BM25 over their names and content, scored by
+        how much of the query they cover, and combined with the skill module's
+        trigger confidence from one pass of the trigger automaton. Text
+        relevance is capped below the strongest trigger confidences so an
+        explicit trigger hit outranks incidental content matches.
+
+        Ranked results are cached per normalized query until a skill is
+        reloaded.
+        """
+        cached = self.query_cache.get(query)
+        if cached is not None:
+            return [dict(match) for match in cached]
+
+        index_scores = self.get_search_index().rank(query)
+        automaton = self.get_trigger_automaton()
+        trigger_scores = automaton.match(query)
         matches = []
 
         for skill_id, skill_info in self.skills.items():
-            score = 0.0
-
-            # Check skill name
-            if query_lower in skill_info["name"].lower():
-                score += 0.8
-
-            # Check skill content
-            if skill_info["content"] and query_lower in skill_info["content"].lower():
-                score += 0.6
+            score = index_scores.get(skill_id, 0.0) * self.SEARCH_SCORE_CEILING
 
-            # Check if it's a module with matching capability
-            if skill_info["module"] and hasattr(skill_info["module"], 'skill_matches'):
-                module_score = skill_info["module"].skill_matches(query)
-                score = max(score, module_score)
+            if skill_id in automaton.skill_ids:
+                score = max(score, trigger_scores.get(skill_id, 0.0))
+            elif skill_id in self._skill_matchers:
+                # Modules without weighted triggers still score themselves
+                score = max(score, self._skill_matchers[skill_id](query))
 
             if score > 0.5:
                 matches.append({
@@ -246,7 +518,8 @@ class HeadElfSkillRegistry:
 
         # Sort by score
         matches.sort(key=lambda x: x["score"], reverse=True)
-        return matches
+        self.query_cache.put(query, matches)
+        return [dict(match) for match in matches]
 
     def get_skill_summary(self) -> Dict[str, Any]:
         """Get a summary of all registered skills."""
@@ -272,10 +545,24 @@ class HeadElfSkillRegistry:
 _skill_registry = None
 
 def get_skill_registry() -> HeadElfSkillRegistry:
-    """Get the global HeadElf skill registry."""
+    """
+    Get the global HeadElf skill registry.
+
+    Set HEADELF_LAZY_SKILLS=1 to build the registry in lazy mode,
+    HEADELF_SKILL_MANIFEST to a file path to cache the skill manifest there,
+    HEADELF_SKILL_LOAD_WORKERS to read skill files on that many threads, and
+    HEADELF_SKILL_CORPUS to a file path to serve content from a mapped corpus.
+    """
     global _skill_registry
     if _skill_registry is None:
-        _skill_registry = HeadElfSkillRegistry()
+        lazy = os.environ.get("HEADELF_LAZY_SKILLS", "").lower() in ("1", "true", "yes")
+        manifest_path = os.environ.get("HEADELF_SKILL_MANIFEST") or None
+        load_workers = int(os.environ.get("HEADELF_SKILL_LOAD_WORKERS") or 0)
+        corpus_path = os.environ.get("HEADELF_SKILL_CORPUS") or None
+        _skill_registry = HeadElfSkillRegistry(
+            lazy=lazy, manifest_path=manifest_path, load_workers=load_workers,
+            corpus_path=corpus_path
+        )
     return _skill_registry
 
 def register_all_skills() -> Dict[str, Any]:
@@ -345,6 +632,7 @@ def get_security_capabilities() -> List[str]:
 # Export main functions
 __all__ = [
     'HeadElfSkillRegistry',
+    'SkillInfo',
     'get_skill_registry',
     'register_all_skills',
     'find_skills',
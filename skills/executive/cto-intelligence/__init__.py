@@ -7,7 +7,7 @@ Claude Code skill registration and integration for CTO Executive Intelligence ca
 import json
 import asyncio
 from pathlib import Path
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Tuple
 
 # Skill metadata
 SKILL_METADATA = {
@@ -87,44 +87,58 @@ async def execute_skill(query: str, context: Dict[str, Any] = None) -> Dict[str,
             "skill_id": SKILL_METADATA["id"]
         }
 
-# Claude Code integration functions
-def skill_matches(query: str) -> float:
-    """
-    Determine if this skill matches the user query.
-
-    Returns a confidence score between 0.0 and 1.0.
-    """
-    query_lower = query.lower()
-
+# Trigger phrases and the match confidence each one carries
+SKILL_TRIGGER_WEIGHTS = [
     # Direct matches
-    if any(keyword in query_lower for keyword in ["cto", "chief technology officer"]):
-        return 0.95
+    ("cto", 0.95),
+    ("chief technology officer", 0.95),
 
     # Technology strategy matches
-    if any(term in query_lower for term in ["technology strategy", "tech strategy"]):
-        return 0.90
+    ("technology strategy", 0.90),
+    ("tech strategy", 0.90),
 
     # Venture capital matches
-    if any(term in query_lower for term in ["venture capital", "vc", "startup investment"]):
-        return 0.85
+    ("venture capital", 0.85),
+    ("vc", 0.85),
+    ("startup investment", 0.85),
 
     # M&A matches
-    if any(term in query_lower for term in ["m&a", "merger", "acquisition", "technology integration"]):
-        return 0.85
+    ("m&a", 0.85),
+    ("merger", 0.85),
+    ("acquisition", 0.85),
+    ("technology integration", 0.85),
 
     # Platform architecture matches
-    if any(term in query_lower for term in ["platform architecture", "technology platform"]):
-        return 0.80
+    ("platform architecture", 0.80),
+    ("technology platform", 0.80),
 
     # Innovation matches
-    if any(term in query_lower for term in ["innovation strategy", "r&d", "research and development"]):
-        return 0.75
+    ("innovation strategy", 0.75),
+    ("r&d", 0.75),
+    ("research and development", 0.75),
 
     # General technology leadership
-    if any(term in query_lower for term in ["technology leadership", "tech leadership"]):
-        return 0.70
+    ("technology leadership", 0.70),
+    ("tech leadership", 0.70)
+]
+
+# Claude Code integration functions
+def skill_matches(query: str) -> float:
+    """
+    Determine if this skill matches the user query.
+
+    Returns a confidence score between 0.0 and 1.0.
+    """
+    query_lower = query.lower()
+
+    return max(
+        (weight for term, weight in SKILL_TRIGGER_WEIGHTS if term in query_lower),
+        default=0.0
+    )
 
-    return 0.0
+def get_weighted_triggers() -> List[Tuple[str, float]]:
+    """Get (trigger phrase, confidence) pairs used by skill_matches."""
+    return list(SKILL_TRIGGER_WEIGHTS)
 
 def get_skill_triggers() -> List[str]:
     """Get list of trigger phrases for this skill."""
@@ -158,6 +172,7 @@ __all__ = [
     'get_skill_info',
     'execute_skill',
     'skill_matches',
+    'get_weighted_triggers',
     'get_skill_triggers',
     'get_usage_examples'
 ]
\ No newline at end of file
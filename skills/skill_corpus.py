@@ -0,0 +1,122 @@
+"""
+HeadElf Skill Corpus Store
+
+Packs every skill.md into one memory-mapped corpus file with an offset
+table. Skill content is served as slices of the shared mapping, so worker
+processes on one host share the page cache instead of each holding its own
+copy of the corpus as Python strings.
+
+File layout: an 8-byte magic, an 8-byte little-endian table length, the
+JSON offset table, then the concatenated skill.md bytes.
+"""
+
+import json
+import mmap
+import os
+import struct
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional
+
+CORPUS_MAGIC = b"HECORP1\n"
+_HEADER = struct.Struct("<8sQ")
+
+
+class SkillCorpus:
+    """Read-only, memory-mapped view of a packed skill corpus file."""
+
+    def __init__(self, path: Path, table: Dict[str, List[Any]], data_offset: int,
+                 mapping: Optional[mmap.mmap]):
+        self.path = Path(path)
+        self.table = table
+        self._data_offset = data_offset
+        self._mapping = mapping
+
+    @classmethod
+    def build(cls, path: Path, descriptors: Iterable[Dict[str, Any]]) -> "SkillCorpus":
+        """
+        Pack the skill.md files of the given skill descriptors into a corpus.
+
+        The file is written beside the target and renamed into place, so
+        processes that already mapped the previous corpus keep a valid view.
+        """
+        path = Path(path)
+        table: Dict[str, List[Any]] = {}
+        chunks: List[bytes] = []
+        offset = 0
+
+        for descriptor in descriptors:
+            skill_md_file = Path(descriptor["directory"]) / "skill.md"
+            data = skill_md_file.read_bytes() if skill_md_file.exists() else b""
+            table[descriptor["id"]] = [offset, len(data), descriptor["mtime"], descriptor["size"]]
+            chunks.append(data)
+            offset += len(data)
+
+        table_bytes = json.dumps(table, ensure_ascii=False).encode("utf-8")
+
+        path.parent.mkdir(parents=True, exist_ok=True)
+        temp_path = path.with_suffix(path.suffix + f".{os.getpid()}.tmp")
+        with open(temp_path, "wb") as f:
+            f.write(_HEADER.pack(CORPUS_MAGIC, len(table_bytes)))
+            f.write(table_bytes)
+            for chunk in chunks:
+                f.write(chunk)
+        os.replace(temp_path, path)
+
+        return cls.open(path)
+
+    @classmethod
+    def open(cls, path: Path) -> Optional["SkillCorpus"]:
+        """Map an existing corpus file, returning None if missing or invalid."""
+        try:
+            with open(path, "rb") as f:
+                header = f.read(_HEADER.size)
+                if len(header) != _HEADER.size:
+                    return None
+                magic, table_length = _HEADER.unpack(header)
+                if magic != CORPUS_MAGIC:
+                    return None
+                table = json.loads(f.read(table_length).decode("utf-8"))
+                data_offset = _HEADER.size + table_length
+
+                size = os.fstat(f.fileno()).st_size
+                mapping = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) if size > data_offset else None
+        except (FileNotFoundError, ValueError, UnicodeDecodeError, struct.error):
+            return None
+
+        return cls(path, table, data_offset, mapping)
+
+    def matches(self, descriptors: Iterable[Dict[str, Any]]) -> bool:
+        """Check that the corpus holds exactly these skills at their current stats."""
+        expected = {
+            descriptor["id"]: [descriptor["mtime"], descriptor["size"]]
+            for descriptor in descriptors
+        }
+        return expected.keys() == self.table.keys() and all(
+            self.table[skill_id][2:] == stats for skill_id, stats in expected.items()
+        )
+
+    def __contains__(self, skill_id: str) -> bool:
+        return skill_id in self.table
+
+    def get_bytes(self, skill_id: str) -> memoryview:
+        """Get a zero-copy view of a skill's skill.md bytes."""
+        offset, length = self.table[skill_id][:2]
+        if length == 0:
+            return memoryview(b"")
+        start = self._data_offset + offset
+        return memoryview(self._mapping)[start:start + length]
+
+    def get_text(self, skill_id: str) -> str:
+        """Decode a skill's skill.md content from the mapping."""
+        with self.get_bytes(skill_id) as view:
+            return str(view, "utf-8")
+
+    def close(self) -> None:
+        """Release the memory mapping once no exported views remain."""
+        if self._mapping is not None:
+            try:
+                self._mapping.close()
+            except BufferError:
+                # Callers still hold get_bytes() views; the mapping closes when collected
+                pass
+            self._mapping = None
@@ -0,0 +1,341 @@
+"""
+HeadElf Skill Records
+
+Skill descriptors and on-demand loading helpers used by the skill registry.
+A descriptor carries only what a directory stat can tell us; skill content
+and the optional Python module are loaded the first time they are accessed.
+"""
+
+import ast
+import importlib
+import os
+from array import array
+from collections.abc import Mapping, MutableMapping
+from pathlib import Path
+from types import ModuleType
+from typing import Any, Dict, FrozenSet, Iterable, Iterator, List, Optional, Tuple
+
+# Keys every skill descriptor carries before content or module are loaded
+SKILL_DESCRIPTOR_KEYS = ("id", "name", "category", "directory", "size", "mtime")
+
+
+# Files whose stats make up a skill's change-detection snapshot
+SNAPSHOT_FILES = ("skill.md", "metadata.yml", "__init__.py")
+
+
+def make_skill_id(category: str, skill_name: str) -> str:
+    """Get the registry id for a skill directory name in a category."""
+    return f"headelf-{category}-{skill_name}"
+
+
+def skill_snapshot(skill_dir: Path) -> Tuple[Optional[Tuple[int, int, int]], ...]:
+    """Get (mtime_ns, size, inode) for each tracked file in a skill directory."""
+    snapshot = []
+    for name in SNAPSHOT_FILES:
+        try:
+            stat = os.stat(skill_dir / name)
+        except FileNotFoundError:
+            snapshot.append(None)
+        else:
+            snapshot.append((stat.st_mtime_ns, stat.st_size, stat.st_ino))
+    return tuple(snapshot)
+
+
+def skill_module_name(skill_dir: Path, category: str) -> str:
+    """Get the import name used for a skill's Python module."""
+    return f"skills.{category}.{skill_dir.name.replace('-', '_')}"
+
+
+def import_skill_module(skill_dir: Path, category: str) -> Optional[ModuleType]:
+    """Import a skill's __init__.py module, returning None if unavailable."""
+    init_file = skill_dir / "__init__.py"
+    if not init_file.exists():
+        return None
+
+    try:
+        return importlib.import_module(skill_module_name(skill_dir, category))
+    except ImportError:
+        return None
+
+
+def declared_module_names(skill_dir: Path, names: Iterable[str]) -> FrozenSet[str]:
+    """Find which of some top-level names a skill's __init__.py binds, by parsing rather than importing it."""
+    try:
+        tree = ast.parse((skill_dir / "__init__.py").read_bytes())
+    except (FileNotFoundError, SyntaxError, ValueError):
+        return frozenset()
+
+    bound = set()
+    for node in tree.body:
+        if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)):
+            bound.add(node.name)
+        elif isinstance(node, (ast.Assign, ast.AnnAssign)):
+            targets = node.targets if isinstance(node, ast.Assign) else [node.target]
+            bound.update(target.id for target in targets if isinstance(target, ast.Name))
+        elif isinstance(node, (ast.Import, ast.ImportFrom)):
+            bound.update((alias.asname or alias.name).split('.')[0] for alias in node.names)
+    return frozenset(bound.intersection(names))
+
+
+def read_skill_content(skill_dir: Path) -> str:
+    """Read a skill's skill.md content, returning an empty string if missing."""
+    skill_md_file = skill_dir / "skill.md"
+    if not skill_md_file.exists():
+        return ""
+
+    with open(skill_md_file, 'r', encoding='utf-8') as f:
+        return f.read()
+
+
+def describe_skill(skill_dir: Path, category: str) -> Dict[str, Any]:
+    """Build the lightweight descriptor for a skill directory."""
+    skill_name = skill_dir.name
+    skill_md_file = skill_dir / "skill.md"
+
+    try:
+        stat = skill_md_file.stat()
+        size, mtime = stat.st_size, stat.st_mtime
+    except FileNotFoundError:
+        size, mtime = 0, 0.0
+
+    return {
+        "id": make_skill_id(category, skill_name),
+        "name": skill_name.replace('-', ' ').title(),
+        "category": category,
+        "directory": str(skill_dir),
+        "size": size,
+        "mtime": mtime
+    }
+
+
+class SkillInfo(MutableMapping):
+    """
+    Compact skill record with a dict-compatible interface.
+
+    Fields live in ``__slots__`` rather than a per-skill dict. Records built
+    eagerly carry their content and module; lazy records resolve the
+    ``content`` and ``module`` keys on first access and cache them on the
+    record. ``has_content`` and ``has_module`` are answered from file stats
+    without reading or importing anything. Records attached to a SkillCorpus
+    serve content from the shared mapping and never cache it.
+    """
+
+    __slots__ = (
+        "id", "name", "category", "directory", "size", "mtime",
+        "_content", "_module", "_module_loaded", "_corpus"
+    )
+
+    _KEYS = SKILL_DESCRIPTOR_KEYS + ("has_module", "has_content", "content", "module")
+
+    def __init__(self, descriptor: Dict[str, Any]):
+        for key in SKILL_DESCRIPTOR_KEYS:
+            setattr(self, key, descriptor[key])
+        self._content = None
+        self._module = None
+        self._module_loaded = False
+        self._corpus = None
+
+    @classmethod
+    def loaded(cls, descriptor: Dict[str, Any], content: str,
+               module: Optional[ModuleType]) -> "SkillInfo":
+        """Create a record with its content and module already loaded."""
+        record = cls(descriptor)
+        record._content = content
+        record._module = module
+        record._module_loaded = True
+        return record
+
+    @property
+    def content_loaded(self) -> bool:
+        """Whether skill.md has been read for this record."""
+        return self._content is not None
+
+    @property
+    def module_loaded(self) -> bool:
+        """Whether the skill module import has been attempted."""
+        return self._module_loaded
+
+    @property
+    def content_mapped(self) -> bool:
+        """Whether content is served from a memory-mapped corpus."""
+        return self._corpus is not None
+
+    def attach_corpus(self, corpus: Any) -> None:
+        """Serve content from a corpus mapping, dropping any cached copy."""
+        self._corpus = corpus
+        self._content = None
+
+    @property
+    def content(self) -> str:
+        """The skill.md content, read on first access."""
+        if self._corpus is not None and self._content is None:
+            return self._corpus.get_text(self.id)
+        if self._content is None:
+            self._content = read_skill_content(Path(self.directory))
+        return self._content
+
+    @property
+    def module(self) -> Optional[ModuleType]:
+        """The skill's Python module, imported on first access."""
+        if not self._module_loaded:
+            self._module = import_skill_module(Path(self.directory), self.category)
+            self._module_loaded = True
+        return self._module
+
+    def __getitem__(self, key: str) -> Any:
+        if key == "has_content":
+            if self._content is not None:
+                return bool(self._content)
+            # An empty skill.md has size 0, so the stat answers this without a read
+            return self.size > 0
+        if key == "has_module":
+            # Whether the skill ships a module, answered without importing it
+            return (Path(self.directory) / "__init__.py").exists()
+        if key in self._KEYS:
+            return getattr(self, key)
+        raise KeyError(key)
+
+    def __setitem__(self, key: str, value: Any) -> None:
+        if key == "content":
+            self._content = value
+        elif key == "module":
+            self._module = value
+            self._module_loaded = True
+        elif key in SKILL_DESCRIPTOR_KEYS:
+            setattr(self, key, value)
+        else:
+            raise KeyError(f"Skill records have no settable key {key!r}")
+
+    def __delitem__(self, key: str) -> None:
+        raise TypeError("Skill records have a fixed set of keys")
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._KEYS)
+
+    def __len__(self) -> int:
+        return len(self._KEYS)
+
+    def __repr__(self) -> str:
+        return f"SkillInfo({self.id!r})"
+
+
+# Category groups a registry indexes skills under
+SKILL_GROUPS = ("executive", "industry", "security", "reasoning", "architecture", "advanced")
+
+
+def skill_group(category: str) -> int:
+    """Get the SKILL_GROUPS index for a skill category, or -1 if ungrouped."""
+    if category == "executive":
+        return 0
+    if category == "industry":
+        return 1
+    if category.startswith("security-"):
+        return 2
+    if category == "advanced-reasoning":
+        return 3
+    if category in ["application", "cloud-mastery", "architecture-mastery"]:
+        return 4
+    if category == "advanced":
+        return 5
+    return -1
+
+
+class SkillStore:
+    """
+    Registry storage addressing skill records by integer position.
+
+    Category collections hold compact arrays of positions into one record
+    list instead of their own references to every record.
+    """
+
+    def __init__(self):
+        self.records: List[Optional[SkillInfo]] = []
+        self.positions: Dict[str, int] = {}
+        self.groups = array('b')
+        self.all = SkillCollection(self)
+        self.collections = [SkillCollection(self, group) for group in range(len(SKILL_GROUPS))]
+
+    def put(self, record: SkillInfo) -> None:
+        """Add a record, or replace the record registered under its id."""
+        position = self.positions.get(record.id)
+        group = skill_group(record.category)
+
+        if position is not None and self.groups[position] == group:
+            self.records[position] = record
+            return
+        if position is not None:
+            self.remove(record.id)
+
+        position = len(self.records)
+        self.records.append(record)
+        self.groups.append(group)
+        self.positions[record.id] = position
+        self.all._positions.append(position)
+        if group >= 0:
+            self.collections[group]._positions.append(position)
+
+    def remove(self, skill_id: str) -> None:
+        """Drop the record registered under a skill id."""
+        position = self.positions.pop(skill_id, None)
+        if position is None:
+            return
+
+        self.records[position] = None
+        self.all._positions.remove(position)
+        group = self.groups[position]
+        if group >= 0:
+            self.collections[group]._positions.remove(position)
+
+    def compact(self) -> None:
+        """Drop the slots freed by removed records, renumbering the remaining positions."""
+        if len(self.positions) == len(self.records):
+            return
+
+        live = sorted(self.positions.values())
+        renumbered = {old: new for new, old in enumerate(live)}
+        self.records = [self.records[position] for position in live]
+        self.groups = array('b', (self.groups[position] for position in live))
+        self.positions = {skill_id: renumbered[position] for skill_id, position in self.positions.items()}
+        for collection in (self.all, *self.collections):
+            collection._positions = array('i', (renumbered[position] for position in collection._positions))
+
+    def reorder(self, order: List[str]) -> None:
+        """Reorder every collection to follow the given skill id order, compacting freed slots first."""
+        self.compact()
+        ordered = [self.positions[skill_id] for skill_id in order if skill_id in self.positions]
+        self.all._positions = array('i', ordered)
+        for group, collection in enumerate(self.collections):
+            collection._positions = array('i', (p for p in ordered if self.groups[p] == group))
+
+
+class SkillCollection(Mapping):
+    """Ordered, read-only, dict-compatible view of skills in a SkillStore."""
+
+    __slots__ = ("_store", "_group", "_positions")
+
+    def __init__(self, store: SkillStore, group: Optional[int] = None):
+        self._store = store
+        self._group = group
+        self._positions = array('i')
+
+    def __getitem__(self, skill_id: str) -> SkillInfo:
+        position = self._store.positions[skill_id]
+        if self._group is not None and self._store.groups[position] != self._group:
+            raise KeyError(skill_id)
+        return self._store.records[position]
+
+    def __contains__(self, skill_id: object) -> bool:
+        position = self._store.positions.get(skill_id)
+        if position is None:
+            return False
+        return self._group is None or self._store.groups[position] == self._group
+
+    def __iter__(self) -> Iterator[str]:
+        records = self._store.records
+        return (records[position].id for position in self._positions)
+
+    def __len__(self) -> int:
+        return len(self._positions)
+
+    def __repr__(self) -> str:
+        return f"SkillCollection({list(self)!r})"
@@ -0,0 +1,220 @@
+"""
+HeadElf Skill Manifest
+
+Persistent, precompiled manifest of skill descriptors and parsed metadata.yml
+fields. The manifest is keyed on directory mtimes and per-file stats and
+hashes, so a registry can skip the directory walk entirely when nothing has
+changed and rebuild only the skill directories that did.
+"""
+
+import hashlib
+import json
+import os
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from .skill_info import describe_skill
+
+try:
+    import yaml
+except ImportError:  # PyYAML is optional; metadata is skipped without it
+    yaml = None
+
+MANIFEST_VERSION = 1
+
+# Files inside a skill directory that contribute to its manifest entry
+TRACKED_FILES = ("skill.md", "metadata.yml")
+
+
+def _stat_key(path: Path) -> Optional[List[float]]:
+    """Get the (mtime, size) pair used to detect file changes."""
+    try:
+        stat = path.stat()
+    except FileNotFoundError:
+        return None
+    return [stat.st_mtime, stat.st_size]
+
+
+def _recorded_stat(recorded: Optional[List[Any]]) -> Optional[List[float]]:
+    """Get the (mtime, size) pair from a recorded [mtime, size, hash] entry."""
+    return recorded[:2] if recorded else None
+
+
+def _file_hash(path: Path) -> str:
+    """Get the SHA-256 hash of a file's contents."""
+    return hashlib.sha256(path.read_bytes()).hexdigest()
+
+
+def parse_skill_metadata(skill_dir: Path) -> Dict[str, Any]:
+    """Parse a skill's metadata.yml, returning an empty dict if unavailable."""
+    metadata_file = skill_dir / "metadata.yml"
+    if yaml is None or not metadata_file.exists():
+        return {}
+
+    try:
+        metadata = yaml.safe_load(metadata_file.read_text(encoding='utf-8'))
+    except (yaml.YAMLError, UnicodeDecodeError):
+        return {}
+
+    if not isinstance(metadata, dict):
+        return {}
+
+    # Round-trip through JSON so dates and other YAML types serialize cleanly
+    return json.loads(json.dumps(metadata, default=str))
+
+
+class SkillManifest:
+    """On-disk cache of skill descriptors for fast registry startup."""
+
+    def __init__(self, path: Path, skills_dir: Path):
+        self.path = Path(path)
+        self.skills_dir = Path(skills_dir)
+        self.directories: Dict[str, float] = {}
+        self.entries: List[Dict[str, Any]] = []
+        self.reused = 0
+        self.rebuilt = 0
+        self._previous: Dict[str, Dict[str, Any]] = {}
+        self._dirty = False
+
+    @classmethod
+    def load(cls, path: Path, skills_dir: Path) -> "SkillManifest":
+        """Load a manifest from disk, starting empty if missing or stale."""
+        manifest = cls(path, skills_dir)
+
+        try:
+            data = json.loads(manifest.path.read_text(encoding='utf-8'))
+        except (FileNotFoundError, json.JSONDecodeError, UnicodeDecodeError):
+            return manifest
+
+        if data.get("version") != MANIFEST_VERSION or data.get("skills_dir") != str(manifest.skills_dir):
+            return manifest
+
+        manifest.directories = data.get("directories", {})
+        manifest.entries = data.get("entries", [])
+        manifest._previous = {entry["directory"]: entry for entry in manifest.entries}
+        return manifest
+
+    def is_current(self) -> bool:
+        """Check with stat calls only whether the manifest still matches disk."""
+        if not self.entries:
+            return False
+
+        for directory, mtime in self.directories.items():
+            try:
+                if os.stat(directory).st_mtime != mtime:
+                    return False
+            except FileNotFoundError:
+                return False
+
+        for entry in self.entries:
+            skill_dir = Path(entry["directory"])
+            for name in TRACKED_FILES:
+                if _recorded_stat(entry["files"].get(name)) != _stat_key(skill_dir / name):
+                    return False
+
+        self.reused = len(self.entries)
+        return True
+
+    def begin_rebuild(self, watched_directories: List[Path]) -> None:
+        """Start an incremental rebuild over the given category directories."""
+        self.entries = []
+        self.reused = 0
+        self.rebuilt = 0
+
+        directories = {}
+        for category_dir in watched_directories:
+            if not category_dir.is_dir():
+                continue
+            directories[str(category_dir)] = category_dir.stat().st_mtime
+            # Skill directories gain an mtime bump when skill.md is added
+            for child in category_dir.iterdir():
+                if child.is_dir() and not child.name.startswith(("_", ".")):
+                    directories[str(child)] = child.stat().st_mtime
+
+        if directories != self.directories:
+            self._dirty = True
+        self.directories = directories
+
+    def describe(self, skill_dir: Path, category: str) -> Dict[str, Any]:
+        """Get the manifest entry for a skill, rebuilding it only if changed."""
+        previous = self._previous.get(str(skill_dir))
+        files = {name: _stat_key(skill_dir / name) for name in TRACKED_FILES}
+
+        if (previous is not None and previous["category"] == category and
+                self._files_match(previous["files"], skill_dir, files)):
+            if any(_recorded_stat(previous["files"].get(name)) != files[name] for name in TRACKED_FILES):
+                # Touched but byte-identical files only need their stats refreshed
+                previous = self._refresh_stats(previous, skill_dir, files)
+            self.entries.append(previous)
+            self.reused += 1
+            return previous
+
+        entry = self.build_entry(skill_dir, category, files)
+        self.entries.append(entry)
+        self.rebuilt += 1
+        self._dirty = True
+        return entry
+
+    @staticmethod
+    def _files_match(recorded: Dict[str, Any], skill_dir: Path,
+                     files: Dict[str, Optional[List[float]]]) -> bool:
+        """Check tracked files against their recorded stats, then hashes."""
+        for name in TRACKED_FILES:
+            previous, current = recorded.get(name), files[name]
+            if previous is None or current is None:
+                if previous is not current:
+                    return False
+            elif previous[:2] != current and previous[2] != _file_hash(skill_dir / name):
+                return False
+        return True
+
+    def _refresh_stats(self, entry: Dict[str, Any], skill_dir: Path,
+                       files: Dict[str, Optional[List[float]]]) -> Dict[str, Any]:
+        """Update recorded stats for files that were touched but not modified."""
+        refreshed = {**entry, **describe_skill(skill_dir, entry["category"])}
+        refreshed["files"] = {
+            name: files[name] + [entry["files"][name][2]] if files[name] else None
+            for name in TRACKED_FILES
+        }
+        self._dirty = True
+        return refreshed
+
+    def build_entry(self, skill_dir: Path, category: str,
+                    files: Optional[Dict[str, Optional[List[float]]]] = None) -> Dict[str, Any]:
+        """Build a fresh manifest entry from a skill directory."""
+        if files is None:
+            files = {name: _stat_key(skill_dir / name) for name in TRACKED_FILES}
+
+        return {
+            **describe_skill(skill_dir, category),
+            "files": {
+                name: files[name] + [_file_hash(skill_dir / name)] if files[name] else None
+                for name in TRACKED_FILES
+            },
+            "metadata": parse_skill_metadata(skill_dir)
+        }
+
+    def finish_rebuild(self) -> None:
+        """Persist the manifest if any entry or directory changed."""
+        removed = set(self._previous) - {entry["directory"] for entry in self.entries}
+        if removed:
+            self._dirty = True
+
+        if self._dirty:
+            self.save()
+        self._previous = {entry["directory"]: entry for entry in self.entries}
+        self._dirty = False
+
+    def save(self) -> None:
+        """Atomically write the manifest to disk."""
+        data = {
+            "version": MANIFEST_VERSION,
+            "skills_dir": str(self.skills_dir),
+            "directories": self.directories,
+            "entries": self.entries
+        }
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        temp_path = self.path.with_suffix(self.path.suffix + ".tmp")
+        temp_path.write_text(json.dumps(data, ensure_ascii=False), encoding='utf-8')
+        os.replace(temp_path, self.path)
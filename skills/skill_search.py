@@ -0,0 +1,154 @@
+"""
+HeadElf Skill Search Index
+
+Tokenized inverted index over skill names and skill.md content with
+BM25 ranking. The index is built once per registry; queries only touch
+the posting lists of their own terms.
+"""
+
+import math
+import re
+from collections import Counter
+from typing import Dict, Iterable, List, Tuple
+
+# Keeps joined abbreviations such as "m&a" and "r&d" as single tokens
+TOKEN_PATTERN = re.compile(r"[a-z0-9]+(?:&[a-z0-9]+)*")
+
+STOP_WORDS = frozenset({
+    "a", "an", "and", "are", "as", "at", "be", "by", "for", "from", "how",
+    "in", "is", "it", "of", "on", "or", "our", "that", "the", "this", "to",
+    "we", "what", "with"
+})
+
+
+def tokenize(text: str) -> List[str]:
+    """Split text into lowercase search terms, dropping stop words."""
+    return [token for token in TOKEN_PATTERN.findall(text.lower()) if token not in STOP_WORDS]
+
+
+class SkillSearchIndex:
+    """
+    Inverted index with BM25F-style ranking over skill name and content.
+
+    Name terms count ``name_weight`` times toward a skill's term frequency,
+    so a query term in the skill name outranks scattered content mentions.
+    """
+
+    def __init__(self, k1: float = 1.2, b: float = 0.75, name_weight: float = 5.0,
+                 coverage_floor: float = 0.2):
+        self.k1 = k1
+        self.b = b
+        self.name_weight = name_weight
+        self.coverage_floor = coverage_floor
+        self.postings: Dict[str, Dict[str, float]] = {}
+        self.doc_lengths: Dict[str, int] = {}
+        self._doc_terms: Dict[str, List[str]] = {}
+        self._total_length = 0
+
+    def __len__(self) -> int:
+        return len(self.doc_lengths)
+
+    def __contains__(self, skill_id: str) -> bool:
+        return skill_id in self.doc_lengths
+
+    @classmethod
+    def build(cls, documents: Iterable[Tuple[str, str, str]], **kwargs) -> "SkillSearchIndex":
+        """Build an index from (skill_id, name, content) triples."""
+        index = cls(**kwargs)
+        for skill_id, name, content in documents:
+            index.add(skill_id, name, content)
+        return index
+
+    def add(self, skill_id: str, name: str, content: str) -> None:
+        """Index a skill's name and content, replacing any previous entry."""
+        if skill_id in self.doc_lengths:
+            self.remove(skill_id)
+
+        content_terms = tokenize(content)
+        frequencies: Dict[str, float] = Counter(content_terms)
+        for term in tokenize(name):
+            frequencies[term] = frequencies.get(term, 0) + self.name_weight
+
+        for term, frequency in frequencies.items():
+            self.postings.setdefault(term, {})[skill_id] = frequency
+
+        self.doc_lengths[skill_id] = len(content_terms)
+        self._doc_terms[skill_id] = list(frequencies)
+        self._total_length += len(content_terms)
+
+    def remove(self, skill_id: str) -> None:
+        """Remove a skill from the index."""
+        if skill_id not in self.doc_lengths:
+            return
+
+        for term in self._doc_terms.pop(skill_id):
+            postings = self.postings[term]
+            del postings[skill_id]
+            if not postings:
+                del self.postings[term]
+
+        self._total_length -= self.doc_lengths.pop(skill_id)
+
+    def idf(self, term: str) -> float:
+        """Get the BM25 inverse document frequency of a term."""
+        document_frequency = len(self.postings.get(term, ()))
+        total = len(self.doc_lengths)
+        return math.log(1 + (total - document_frequency + 0.5) / (document_frequency + 0.5))
+
+    def _term_scores(self, term: str) -> Dict[str, float]:
+        """Get each skill's BM25 contribution for one query term."""
+        postings = self.postings.get(term)
+        if not postings:
+            return {}
+
+        average_length = self._total_length / len(self.doc_lengths) or 1.0
+        idf = self.idf(term)
+        return {
+            skill_id: idf * frequency * (self.k1 + 1) / (
+                frequency + self.k1 * (1 - self.b + self.b * self.doc_lengths[skill_id] / average_length)
+            )
+            for skill_id, frequency in postings.items()
+        }
+
+    def search(self, query: str) -> Dict[str, float]:
+        """
+        Score skills against a query.
+
+        Returns raw BM25 scores for every skill containing at least one
+        query term; skills with no matching term are omitted.
+        """
+        scores: Dict[str, float] = {}
+        if not self.doc_lengths:
+            return scores
+
+        for term in set(tokenize(query)):
+            for skill_id, score in self._term_scores(term).items():
+                scores[skill_id] = scores.get(skill_id, 0.0) + score
+        return scores
+
+    def rank(self, query: str) -> Dict[str, float]:
+        """
+        Score skills against a query on an absolute 0..1 scale.
+
+        A skill's score is the share of the query it covers, each term
+        weighted by its IDF, including terms no skill contains. A covered
+        term earns ``coverage_floor`` of its weight for appearing at all
+        and the rest in proportion to its BM25 term-frequency saturation,
+        so name hits and frequent mentions rank first. Scores do not depend
+        on how other skills match, so a fixed threshold keeps meaning
+        "relevant": a skill missing most of the query never reaches it.
+        """
+        terms = set(tokenize(query))
+        if not terms or not self.doc_lengths:
+            return {}
+
+        covered: Dict[str, float] = {}
+        for term in terms:
+            max_score = self.idf(term) * (self.k1 + 1)
+            for skill_id, score in self._term_scores(term).items():
+                covered[skill_id] = covered.get(skill_id, 0.0) + self.idf(term) * (
+                    self.coverage_floor + (1 - self.coverage_floor) * score / max_score
+                )
+
+        query_weight = sum(self.idf(term) for term in terms)
+        return {skill_id: weight / query_weight for skill_id, weight in covered.items()}
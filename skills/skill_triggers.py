@@ -0,0 +1,97 @@
+"""
+HeadElf Skill Trigger Automaton
+
+Aho-Corasick automaton over every skill's trigger phrases. Matching a
+query is a single pass over its characters regardless of how many skills
+or triggers are installed, and each skill scores the highest weight among
+its triggers found in the query, mirroring ``skill_matches`` substring
+semantics. Only modules publishing ``get_weighted_triggers()`` (the pairs
+their ``skill_matches`` scores with) are compiled; a bare
+``get_skill_triggers()`` list carries no weights to agree with.
+"""
+
+from collections import deque
+from typing import Dict, Iterable, List, Set, Tuple
+
+
+class TriggerAutomaton:
+    """Multi-pattern matcher mapping trigger phrases to weighted skills."""
+
+    def __init__(self):
+        self._transitions: List[Dict[str, int]] = [{}]
+        self._failure: List[int] = [0]
+        self._triggers: List[List[Tuple[str, float]]] = [[]]
+        self._outputs: List[List[Tuple[str, float]]] = [[]]
+        self._built = True
+        self.skill_ids: Set[str] = set()
+
+    @classmethod
+    def build(cls, triggers: Iterable[Tuple[str, str, float]]) -> "TriggerAutomaton":
+        """Compile an automaton from (skill_id, trigger, weight) triples."""
+        automaton = cls()
+        for skill_id, trigger, weight in triggers:
+            automaton.add(skill_id, trigger, weight)
+        automaton.compile()
+        return automaton
+
+    def add(self, skill_id: str, trigger: str, weight: float) -> None:
+        """Add a trigger phrase for a skill."""
+        self.skill_ids.add(skill_id)
+        trigger = trigger.lower()
+        if not trigger:
+            return
+
+        state = 0
+        for char in trigger:
+            next_state = self._transitions[state].get(char)
+            if next_state is None:
+                next_state = len(self._transitions)
+                self._transitions.append({})
+                self._failure.append(0)
+                self._triggers.append([])
+                self._transitions[state][char] = next_state
+            state = next_state
+
+        self._triggers[state].append((skill_id, weight))
+        self._built = False
+
+    def compile(self) -> None:
+        """Compute failure links breadth-first and merge suffix outputs."""
+        self._outputs = [list(triggers) for triggers in self._triggers]
+        queue = deque(self._transitions[0].values())
+        for state in queue:
+            self._failure[state] = 0
+
+        while queue:
+            state = queue.popleft()
+            for char, next_state in self._transitions[state].items():
+                queue.append(next_state)
+
+                fallback = self._failure[state]
+                while fallback and char not in self._transitions[fallback]:
+                    fallback = self._failure[fallback]
+                self._failure[next_state] = self._transitions[fallback].get(char, 0)
+                self._outputs[next_state] = (
+                    self._triggers[next_state] + self._outputs[self._failure[next_state]]
+                )
+
+        self._built = True
+
+    def match(self, query: str) -> Dict[str, float]:
+        """Get each matching skill's highest trigger weight for a query."""
+        if not self._built:
+            self.compile()
+
+        scores: Dict[str, float] = {}
+        state = 0
+
+        for char in query.lower():
+            while state and char not in self._transitions[state]:
+                state = self._failure[state]
+            state = self._transitions[state].get(char, 0)
+
+            for skill_id, weight in self._outputs[state]:
+                if weight > scores.get(skill_id, 0.0):
+                    scores[skill_id] = weight
+
+        return scores
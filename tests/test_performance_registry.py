@@ -0,0 +1,259 @@
+#!/usr/bin/env python3
+"""
+Skill Registry Benchmark Suite
+
+Benchmarks registry construction, skill discovery queries, summaries and
+industry vertical listing against synthetic skill trees built at multiples
+of today's skills tree. Absolute timings depend on the machine, so the
+default regression check compares ratios: lazy against eager construction
+at each scale, and each larger scale against 1x. On the machine that
+recorded tests/registry_benchmark_baseline.json, the absolute check also
+compares every timing and peak memory figure against the recorded values,
+catching uniform slowdowns that leave the ratios unchanged.
+
+The suite is slow and opt-in.
+
+Environment:
+    HEADELF_BENCHMARK            Set to 1 to run the benchmarks
+    HEADELF_BENCHMARK_ABSOLUTE   Set to 1 to also check timings and peak memory
+                                 against the recorded measurements
+    HEADELF_BENCHMARK_SCALES     Comma-separated tree multiples (default "1,10,100")
+    HEADELF_BENCHMARK_REPEAT     Runs per timing; the best run counts (default 5)
+    HEADELF_BENCHMARK_THRESHOLD  Allowed fractional growth of a ratio or
+                                 measurement over baseline
+    HEADELF_BENCHMARK_RECORD     Set to 1 to rewrite the baseline with this run
+"""
+
+import json
+import os
+import shutil
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Any, Callable, Dict, List
+
+import pytest
+
+import skills
+from skills import HeadElfSkillRegistry, get_industry_verticals
+
+BASELINE_PATH = Path(__file__).parent / "registry_benchmark_baseline.json"
+
+RECORD_BASELINE = os.environ.get("HEADELF_BENCHMARK_RECORD") == "1"
+CHECK_ABSOLUTE = os.environ.get("HEADELF_BENCHMARK_ABSOLUTE") == "1"
+RUN_BENCHMARKS = RECORD_BASELINE or CHECK_ABSOLUTE or os.environ.get("HEADELF_BENCHMARK") == "1"
+
+pytestmark = [
+    pytest.mark.slow,
+    pytest.mark.skipif(not RUN_BENCHMARKS, reason="Registry benchmarks are opt-in; set HEADELF_BENCHMARK=1"),
+]
+
+BENCHMARK_SCALES = [
+    int(scale) for scale in os.environ.get("HEADELF_BENCHMARK_SCALES", "1,10,100").split(",") if scale.strip()
+]
+BENCHMARK_REPEAT = max(1, int(os.environ.get("HEADELF_BENCHMARK_REPEAT", "5")))
+
+# Metrics compared across scales; sub-millisecond lookups are too noisy for ratios
+SCALING_METRICS = [
+    "construct_eager_ms",
+    "construct_lazy_ms",
+    "construct_eager_peak_kb",
+    "search_index_build_ms",
+    "find_skill_by_query_ms"
+]
+
+# Measurements the absolute check compares: every timing and peak memory figure
+ABSOLUTE_METRIC_SUFFIXES = ("_ms", "_kb")
+
+BENCHMARK_QUERIES = [
+    "cto technology strategy",
+    "healthcare regulatory compliance",
+    "kubernetes platform migration",
+    "m&a integration due diligence",
+    "incident response forensics"
+]
+
+# Categories discovered by directory scan; these grow with the synthetic scale
+SCANNED_CATEGORIES = [
+    "industry",
+    "security/executive",
+    "security/operational",
+    "security/compliance",
+    "security/specialized",
+    "application",
+    "cloud-mastery",
+    "architecture-mastery",
+    "advanced"
+]
+
+
+def build_synthetic_tree(source_dir: Path, target_dir: Path, scale: int) -> Path:
+    """Copy the skills tree, repeating every scanned skill ``scale`` times."""
+    for category in ["executive"] + SCANNED_CATEGORIES:
+        source_category = source_dir / category
+        if not source_category.is_dir():
+            continue
+
+        for skill_dir in sorted(source_category.iterdir()):
+            skill_md = skill_dir / "skill.md"
+            if not skill_md.exists():
+                continue
+
+            copies = scale if category in SCANNED_CATEGORIES else 1
+            for copy in range(copies):
+                name = skill_dir.name if copy == 0 else f"{skill_dir.name}-{copy}"
+                copy_dir = target_dir / category / name
+                if copy_dir.exists():
+                    continue
+                copy_dir.mkdir(parents=True)
+                shutil.copyfile(skill_md, copy_dir / "skill.md")
+                if (skill_dir / "metadata.yml").exists():
+                    shutil.copyfile(skill_dir / "metadata.yml", copy_dir / "metadata.yml")
+
+    return target_dir
+
+
+def best_ms(operation: Callable[[], Any], repeat: int = BENCHMARK_REPEAT) -> float:
+    """Run an operation repeatedly and return its best wall time in ms."""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        operation()
+        timings.append((time.perf_counter() - start) * 1000)
+    return min(timings)
+
+
+def benchmark_ratios(results: Dict[str, Dict[str, float]]) -> Dict[str, float]:
+    """Derive machine-independent ratios from per-scale results."""
+    ratios = {}
+    for key, measured in results.items():
+        ratios[f"{key}.lazy_vs_eager"] = measured["construct_lazy_ms"] / measured["construct_eager_ms"]
+
+    base = results.get("1x")
+    if base is not None:
+        for key, measured in results.items():
+            if key != "1x":
+                for name in SCALING_METRICS:
+                    ratios[f"{key}.{name}_vs_1x"] = measured[name] / base[name]
+    return ratios
+
+
+def exceeded(name: str, value: float, baseline: float, threshold: float) -> List[str]:
+    """Describe a value that grew beyond the threshold over its baseline, if it did."""
+    if value <= baseline * (1 + threshold):
+        return []
+    return [f"{name}: {value:.3f} > {baseline * (1 + threshold):.3f} (baseline {baseline:.3f})"]
+
+
+def benchmark_threshold(baseline: Dict[str, Any]) -> float:
+    """Get the allowed fractional growth over baseline."""
+    return float(os.environ.get("HEADELF_BENCHMARK_THRESHOLD", baseline["threshold"]))
+
+
+def load_baseline() -> Dict[str, Any]:
+    """Load the checked-in benchmark baseline."""
+    if not BASELINE_PATH.exists():
+        return {"threshold": 0.5, "ratios": {}, "measured": {}}
+    return json.loads(BASELINE_PATH.read_text())
+
+
+def run_benchmarks(skills_dir: Path) -> Dict[str, float]:
+    """Measure every registry path on one skills tree."""
+    results = {}
+
+    results["construct_eager_ms"] = best_ms(lambda: HeadElfSkillRegistry(skills_dir=skills_dir))
+    results["construct_lazy_ms"] = best_ms(lambda: HeadElfSkillRegistry(lazy=True, skills_dir=skills_dir))
+
+    tracemalloc.start()
+    registry = HeadElfSkillRegistry(skills_dir=skills_dir, query_cache_size=0)
+    results["construct_eager_peak_kb"] = tracemalloc.get_traced_memory()[1] / 1024
+    tracemalloc.stop()
+
+    def build_search_index():
+        registry._search_index = None
+        registry.get_search_index()
+
+    results["search_index_build_ms"] = best_ms(build_search_index)
+    results["find_skill_by_query_ms"] = best_ms(
+        lambda: [registry.find_skill_by_query(query) for query in BENCHMARK_QUERIES]
+    ) / len(BENCHMARK_QUERIES)
+    results["get_skill_summary_ms"] = best_ms(registry.get_skill_summary)
+
+    previous_registry = skills._skill_registry
+    skills._skill_registry = registry
+    try:
+        results["get_industry_verticals_ms"] = best_ms(get_industry_verticals)
+    finally:
+        skills._skill_registry = previous_registry
+
+    results["skill_count"] = len(registry.get_all_skills())
+    return results
+
+
+@pytest.fixture(scope="module")
+def benchmark_results(tmp_path_factory):
+    """Benchmark synthetic skills trees at every requested scale."""
+    source_dir = Path(__file__).parent.parent / "skills"
+    results = {}
+    for scale in BENCHMARK_SCALES:
+        skills_dir = build_synthetic_tree(source_dir, tmp_path_factory.mktemp(f"skills-{scale}x"), scale)
+        results[f"{scale}x"] = run_benchmarks(skills_dir)
+    return results
+
+
+class TestRegistryBenchmarks:
+    """Registry and discovery benchmarks with ratio and measurement regression baselines."""
+
+    def test_registry_benchmark_ratios(self, benchmark_results):
+        """Lazy/eager and scale-over-1x ratios stay within the threshold of the baseline."""
+        ratios = benchmark_ratios(benchmark_results)
+        print(f"\nRegistry benchmarks: {json.dumps(benchmark_results, indent=2)}")
+        print(f"Registry benchmark ratios: {json.dumps(ratios, indent=2)}")
+
+        baseline = load_baseline()
+        if RECORD_BASELINE:
+            baseline["ratios"] = {name: round(value, 3) for name, value in ratios.items()}
+            baseline["measured"] = {
+                key: {name: round(value, 3) for name, value in measured.items()}
+                for key, measured in benchmark_results.items()
+            }
+            BASELINE_PATH.write_text(json.dumps(baseline, indent=2, sort_keys=True) + "\n")
+            return
+
+        threshold = benchmark_threshold(baseline)
+        compared = [name for name in ratios if name in baseline["ratios"]]
+        if not compared:
+            pytest.skip("No baseline ratios recorded for these scales; run with HEADELF_BENCHMARK_RECORD=1")
+
+        regressions = [
+            regression
+            for name in compared
+            for regression in exceeded(name, ratios[name], baseline["ratios"][name], threshold)
+        ]
+        assert not regressions, "Registry benchmark ratios regressed:\n" + "\n".join(regressions)
+
+    @pytest.mark.skipif(not CHECK_ABSOLUTE, reason="Absolute checks are machine-specific; set HEADELF_BENCHMARK_ABSOLUTE=1")
+    def test_registry_benchmark_measurements(self, benchmark_results):
+        """Timings and peak memory at every scale stay within the threshold of the recorded values."""
+        baseline = load_baseline()
+        if RECORD_BASELINE:
+            pytest.skip("Recording the baseline")
+
+        threshold = benchmark_threshold(baseline)
+        compared = [
+            (key, name)
+            for key, measured in benchmark_results.items()
+            for name in measured
+            if name.endswith(ABSOLUTE_METRIC_SUFFIXES) and name in baseline["measured"].get(key, {})
+        ]
+        if not compared:
+            pytest.skip("No baseline measurements recorded for these scales; run with HEADELF_BENCHMARK_RECORD=1")
+
+        regressions = [
+            regression
+            for key, name in compared
+            for regression in exceeded(
+                f"{key}.{name}", benchmark_results[key][name], baseline["measured"][key][name], threshold
+            )
+        ]
+        assert not regressions, "Registry benchmark measurements regressed:\n" + "\n".join(regressions)
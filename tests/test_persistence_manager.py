@@ -0,0 +1,1007 @@
+#!/usr/bin/env python3
+"""
+Git Persistence Manager Test Suite
+
+Tests for decision persistence, history queries and the storage backends
+of the Git-based persistence layer, each run against a scratch repository.
+"""
+
+import asyncio
+import datetime
+import json
+import os
+import subprocess
+import sys
+import threading
+import time
+from pathlib import Path
+
+import pytest
+
+from persistence_manager import GitPersistenceManager
+from decision_log import DecisionLog, encode_cursor
+from decision_ids import MonotonicIdGenerator, decision_id_ms, decision_id_time
+from git_commit_engine import DEFAULT_COMMIT_REF
+from columnar_export import ColumnarDecisionExport
+from context_store import UserContextStore
+from blocking_io import BlockingIOExecutor
+
+SKILL_EXECUTORS_DIR = Path(__file__).parent.parent / "scripts" / "skill-executors"
+
+# Writer process for the contention benchmark: waits for the go file, then
+# persists decisions and reports its active window and failed commits
+WRITER_SCRIPT = '''
+import asyncio, json, sys, time
+from pathlib import Path
+from persistence_manager import GitPersistenceManager
+
+async def write(repo, worker, count, go_file, user_id):
+    manager = GitPersistenceManager(repo, fsync=False)
+    Path(go_file + f".ready-{worker}").touch()
+    while not Path(go_file).exists():
+        await asyncio.sleep(0.001)
+
+    started, failed = time.time(), 0
+    for n in range(count):
+        await manager.persist_decision({
+            'id': f"w{worker}-{n:03d}", 'executive_role': 'cto', 'decision_type': 'strategy',
+            'query': 'contention benchmark', 'user_id': user_id or f"writer-{worker}", 'confidence': 0.5
+        })
+        decision = await manager.get_decision_at(f"w{worker}-{n:03d}")
+        failed += decision is None
+    finished = time.time()
+    await manager.close()
+    print(json.dumps({'started': started, 'finished': finished, 'failed': failed}))
+
+asyncio.run(write(sys.argv[1], int(sys.argv[2]), int(sys.argv[3]), sys.argv[4], sys.argv[5]))
+'''
+
+
+def _init_repo(path):
+    """Create an empty Git repository with a committer identity."""
+    subprocess.run(['git', 'init', '-q', str(path)], check=True)
+    subprocess.run(['git', '-C', str(path), 'config', 'user.email', 'headelf@example.com'], check=True)
+    subprocess.run(['git', '-C', str(path), 'config', 'user.name', 'HeadElf Tests'], check=True)
+    return path
+
+
+def _git_log(path):
+    """Get commit subjects on HEAD, newest first."""
+    result = subprocess.run(['git', '-C', str(path), 'log', '--format=%s'], capture_output=True, text=True)
+    return result.stdout.splitlines()
+
+
+def _git(path, *args):
+    """Run a git command in a repository and return its stdout."""
+    return subprocess.run(['git', '-C', str(path), *args], capture_output=True, text=True).stdout
+
+
+def _decision(role='cto', user='exec-1', decision_type='technology_strategy', **extra):
+    """Build a decision record as ExecutorPersistenceIntegration would."""
+    return {
+        'executive_role': role,
+        'decision_type': decision_type,
+        'query': f'{role} {decision_type} review',
+        'confidence': 0.85,
+        'user_id': user,
+        'session_id': 'session-1',
+        **extra
+    }
+
+
+@pytest.fixture
+def repo(tmp_path):
+    """Provide a scratch Git repository."""
+    return _init_repo(tmp_path / "repo")
+
+
+class TestDecisionLogBackend:
+    """Test the segmented JSONL decision log with SQLite index."""
+
+    @pytest.mark.asyncio
+    async def test_log_backend_persists_and_queries(self, repo):
+        """Decisions append to committed log segments and are queried through the index."""
+        manager = GitPersistenceManager(str(repo), storage_backend="log")
+
+        first = await manager.persist_decision(_decision('cto', 'exec-1'))
+        second = await manager.persist_decision(_decision('cfo', 'exec-2', 'budget'))
+        third = await manager.persist_decision(_decision('cto', 'exec-2'))
+
+        segments = manager.decision_log.segment_paths()
+        assert len(segments) == 1
+        assert len(segments[0].read_text().splitlines()) == 3
+        assert not list(manager.decision_layout.all_files())
+
+        tracked = subprocess.run(['git', '-C', str(repo), 'ls-files', 'data/decisions'],
+                                 capture_output=True, text=True).stdout.split()
+        assert tracked == ['data/decisions/log/commits.jsonl', 'data/decisions/log/segment-000001.jsonl']
+
+        history = await manager.get_decision_history()
+        assert [decision['id'] for decision in history] == [third, second, first]
+        assert all(decision.get('git_commit_hash') for decision in history)
+
+        # Commit hashes survive a rebuilt index
+        hashes = {decision['id']: decision['git_commit_hash'] for decision in history}
+        manager.decision_log.rebuild_index()
+        assert {decision['id']: decision['git_commit_hash'] for decision in await manager.get_decision_history()} == hashes
+
+        cto = await manager.get_decision_history({'executive_role': 'CTO'})
+        assert [decision['id'] for decision in cto] == [third, first]
+
+        exec_2 = await manager.get_decision_history({'user_id': 'exec-2', 'limit': 1})
+        assert [decision['id'] for decision in exec_2] == [third]
+
+        budget = await manager.get_decision_history({'decision_type': 'budget'})
+        assert [decision['id'] for decision in budget] == [second]
+
+        page = await manager.get_decision_page(page_size=2)
+        rest = await manager.get_decision_page(cursor=page['next_cursor'], page_size=2)
+        assert [d['id'] for d in page['decisions'] + rest['decisions']] == [third, second, first]
+        assert rest['next_cursor'] is None
+
+    def test_index_rebuilds_from_segments(self, tmp_path):
+        """A missing or stale index is rebuilt from the log, skipping partial lines."""
+        log = DecisionLog(tmp_path / "log", segment_max_bytes=100)
+        for number in range(5):
+            log.append({'id': f'd{number}', 'user_id': 'u', 'executive_role': 'CTO',
+                        'timestamp': f'2026-03-0{number + 1}T12:00:00Z', 'padding': 'x' * 100})
+        assert len(log.segment_paths()) == 5
+        log.close()
+
+        with open(log.segment_paths()[-1], "ab") as f:
+            f.write(b'{"id": "partial"')
+        (tmp_path / "log" / "index.sqlite").unlink()
+
+        rebuilt = DecisionLog(tmp_path / "log")
+        assert rebuilt.count() == 5
+        assert rebuilt.get('partial') is None
+        assert [d['id'] for d in rebuilt.query({'executive_role': 'cto', 'limit': 2})] == ['d4', 'd3']
+
+        window = rebuilt.query({'date_range': {'start': '2026-03-02T00:00:00Z', 'end': '2026-03-03T23:59:59Z'}})
+        assert [d['id'] for d in window] == ['d2', 'd1']
+
+        rebuilt.set_commit_hash(['d1'], 'abc123')
+        assert rebuilt.catch_up() == 0 and rebuilt.get('d1')['git_commit_hash'] == 'abc123'
+        # Records indexed again keep their hash, and a new index restores it from the sidecar
+        assert rebuilt.rebuild_index() == 5 and rebuilt.get('d1')['git_commit_hash'] == 'abc123'
+        rebuilt.close()
+        (tmp_path / "log" / "index.sqlite").unlink()
+        assert DecisionLog(tmp_path / "log").get('d1')['git_commit_hash'] == 'abc123'
+
+
+class TestUserDecisionCounters:
+    """Test incremental per-user decision counters."""
+
+    @pytest.mark.asyncio
+    async def test_counters_do_not_scan_history(self, repo, monkeypatch):
+        """Persisting a decision updates the counter without reading the history."""
+        manager = GitPersistenceManager(str(repo))
+
+        async def no_scan(filters=None):
+            raise AssertionError("persist_decision scanned the decision history")
+
+        monkeypatch.setattr(manager, "get_decision_history", no_scan)
+
+        for _ in range(3):
+            last_id = await manager.persist_decision(_decision(user='exec-1'))
+        await manager.persist_decision(_decision(user='exec-2'))
+
+        assert await manager.get_user_decision_count('exec-1') == 3
+        assert await manager.get_user_decision_count('exec-2') == 1
+        assert (await manager.get_last_user_decision('exec-1'))['id'] == last_id
+
+    @pytest.mark.asyncio
+    async def test_repair_rebuilds_counters(self, repo):
+        """repair_user_counters restores counters and pointers from decision files."""
+        manager = GitPersistenceManager(str(repo))
+        first = await manager.persist_decision(_decision(user='exec-1'))
+        second = await manager.persist_decision(_decision(user='exec-1'))
+
+        await manager.update_user_context('exec-1', {'decision_count': 7, 'last_decision': first})
+        await manager.update_user_context('exec-3', {'decision_count': 2})
+
+        counts = await manager.repair_user_counters()
+
+        assert counts == {'exec-1': 2, 'exec-3': 0}
+        context = await manager.get_user_context('exec-1')
+        assert context['decision_count'] == 2
+        assert context['last_decision'] == second
+        assert (await manager.get_last_user_decision('exec-1'))['id'] == second
+        assert _git_log(repo)[0].startswith("[HeadElf] Repair decision counters")
+
+
+class TestGroupCommit:
+    """Test group-commit batching of persistence writes."""
+
+    @pytest.mark.asyncio
+    async def test_concurrent_decisions_share_one_commit(self, repo):
+        """A burst of decisions is flushed as a single commit with a shared hash."""
+        manager = GitPersistenceManager(str(repo), group_commit=True, commit_batch_size=8, commit_window=5.0)
+
+        decision_ids = await asyncio.gather(*[
+            manager.persist_decision(_decision(user=f'exec-{number % 2}')) for number in range(8)
+        ])
+
+        assert len(set(decision_ids)) == 8
+        assert _git_log(repo) == ["[HeadElf] Group commit of 8 updates"]
+        assert manager.group_committer.commits == 1
+
+        commit_hashes = {
+            json.loads(path.read_text())['git_commit_hash'] for path in manager.decision_layout.all_files()
+        }
+        assert len(commit_hashes) == 1
+        assert await manager.get_user_decision_count('exec-0') == 4
+
+    @pytest.mark.asyncio
+    async def test_durable_write_flushes_immediately(self, repo):
+        """durable=True commits without waiting for the batch window."""
+        manager = GitPersistenceManager(str(repo), group_commit=True, commit_window=30.0)
+
+        start = time.perf_counter()
+        await manager.persist_decision(_decision(), durable=True)
+
+        assert time.perf_counter() - start < 10.0
+        assert len(_git_log(repo)) == 1
+
+        pending = asyncio.ensure_future(manager.update_user_context('exec-1', {'theme': 'dark'}))
+        await asyncio.sleep(0.05)
+        assert not pending.done()
+
+        await manager.close()
+        await pending
+        assert len(_git_log(repo)) == 2
+
+
+class TestPlumbingCommitEngine:
+    """Test the plumbing commit path that bypasses the working-tree index."""
+
+    @pytest.mark.asyncio
+    async def test_commits_to_dedicated_ref_while_index_locked(self, repo):
+        """Decisions land on the dedicated ref even while .git/index.lock is held."""
+        (repo / ".git" / "index.lock").write_text("")
+        manager = GitPersistenceManager(str(repo), commit_engine="plumbing")
+
+        first = await manager.persist_decision(_decision(user='exec-1'))
+        second = await manager.persist_decision(_decision(role='cfo', user='exec-1'))
+
+        log = _git(repo, 'log', '--format=%s', DEFAULT_COMMIT_REF).splitlines()
+        assert len(log) == 2 and all(subject.startswith("[HeadElf]") for subject in log)
+        assert _git(repo, 'ls-files') == ""
+
+        tree = _git(repo, 'ls-tree', '-r', '--name-only', DEFAULT_COMMIT_REF).split()
+        assert "data/decisions/by-role/cfo/" in " ".join(tree)
+        assert any(first in path for path in tree) and any(second in path for path in tree)
+        assert "data/contexts/users/exec-1.json" in tree
+
+        stored = json.loads(_git(repo, 'show', f"{DEFAULT_COMMIT_REF}:data/contexts/users/exec-1.json"))
+        assert stored['decision_count'] == 2
+
+    @pytest.mark.asyncio
+    async def test_concurrent_writers_do_not_lose_files(self, repo):
+        """A writer whose ref moved underneath it reloads the tree and keeps both changes."""
+        first_manager = GitPersistenceManager(str(repo), commit_engine="plumbing")
+        second_manager = GitPersistenceManager(str(repo), commit_engine="plumbing")
+
+        await first_manager.persist_decision(_decision(user='exec-1'))
+        await second_manager.persist_decision(_decision(user='exec-2'))
+        await first_manager.persist_decision(_decision(user='exec-3'))
+
+        tree = _git(repo, 'ls-tree', '-r', '--name-only', DEFAULT_COMMIT_REF).split()
+        assert {f"data/contexts/users/exec-{n}.json" for n in (1, 2, 3)} <= set(tree)
+        assert len([path for path in tree if path.startswith('data/decisions/2') and path.endswith('.json')]) == 3
+
+
+class TestGitObjectReader:
+    """Test historical reads through pooled cat-file helpers."""
+
+    @pytest.mark.asyncio
+    async def test_reads_decisions_and_contexts_as_of_commit(self, repo):
+        """Historical reads resolve against the requested revision."""
+        manager = GitPersistenceManager(str(repo))
+        first = await manager.persist_decision(_decision(user='exec-1'))
+        first_commit = _git(repo, 'rev-parse', 'HEAD').strip()
+        await manager.persist_decision(_decision(user='exec-1'))
+
+        decision = await manager.get_decision_at(first)
+        assert decision['id'] == first
+
+        context_path = manager.contexts_dir / "users" / "exec-1.json"
+        old_context = json.loads(await manager.read_git_object(context_path, first_commit))
+        current_context = json.loads(await manager.read_git_object(context_path))
+        assert (old_context['decision_count'], current_context['decision_count']) == (1, 2)
+
+        assert await manager.read_git_object(context_path, "HEAD~5") is None
+        assert await manager.get_decision_at("no-such-decision") is None
+        assert (await manager.object_reader.info(f"{first_commit}:data"))['type'] == 'tree'
+
+        await manager.close()
+
+    @pytest.mark.asyncio
+    async def test_concurrent_reads_match_their_requests(self, repo):
+        """Interleaved reads over the shared pipes each get their own object."""
+        manager = GitPersistenceManager(str(repo), storage_backend="log")
+        decision_ids = [await manager.persist_decision(_decision(user=f'exec-{n}')) for n in range(5)]
+
+        specs = [f"HEAD:data/contexts/users/exec-{n % 5}.json" for n in range(40)]
+        contexts = await asyncio.gather(*[manager.object_reader.read_json(spec) for spec in specs])
+        assert [context['user_id'] for context in contexts] == [f'exec-{n % 5}' for n in range(40)]
+        assert len(manager.object_reader._content_pool) <= manager.object_reader.pool_size
+
+        decisions = await asyncio.gather(*[manager.get_decision_at(decision_id) for decision_id in decision_ids])
+        assert [decision['id'] for decision in decisions] == decision_ids
+
+        await manager.close()
+
+
+class TestSingleCopyStorage:
+    """Test single-copy decisions with generated role/date views."""
+
+    @pytest.mark.asyncio
+    async def test_decisions_written_once_with_view_indexes(self, repo):
+        """Each decision is one file; role and date views index it."""
+        manager = GitPersistenceManager(str(repo))
+        cto_id = await manager.persist_decision(_decision('cto'))
+        cfo_id = await manager.persist_decision(_decision('cfo'))
+
+        assert len(list(manager.decisions_dir.rglob("*.json"))) == 2
+        role_entries = manager.decision_views.role_entries('CTO')
+        assert len(role_entries) == 1 and cto_id in role_entries[0]
+
+        cfo = await manager.get_decision_history({'executive_role': 'cfo'})
+        assert [decision['id'] for decision in cfo] == [cfo_id]
+        assert cfo[0]['git_commit_hash']
+
+        today = cfo[0]['timestamp'].split('T')[0]
+        window = await manager.get_decision_history({
+            'date_range': {'start': f"{today}T00:00:00Z", 'end': f"{today}T23:59:59.999999Z"}
+        })
+        assert {decision['id'] for decision in window} == {cto_id, cfo_id}
+
+    @pytest.mark.asyncio
+    async def test_role_views_are_sharded_by_month(self, repo, monkeypatch):
+        """Role indexes are bounded per month, and range queries read only overlapping months."""
+        manager = GitPersistenceManager(str(repo))
+        for month in (3, 4, 5):
+            manager._write_decision({'id': f"m{month}", 'executive_role': 'CTO', 'user_id': 'exec-1',
+                                     'timestamp': f"2026-{month:02d}-10T09:00:00Z"})
+
+        role_dir = manager.decisions_dir / "by-role" / "cto"
+        assert sorted(path.name for path in role_dir.iterdir()) == ["2026-03.txt", "2026-04.txt", "2026-05.txt"]
+
+        read = []
+        original_entries = manager.decision_views.entries
+
+        def counting_entries(index_path):
+            read.append(index_path.name)
+            return original_entries(index_path)
+
+        monkeypatch.setattr(manager.decision_views, "entries", counting_entries)
+        april = await manager.get_decision_history({
+            'executive_role': 'cto', 'date_range': {'start': '2026-04-01T00:00:00Z', 'end': '2026-04-30T23:59:59Z'}
+        })
+        assert [decision['id'] for decision in april] == ['m4']
+        assert read == ["2026-04.txt"]
+
+    @pytest.mark.asyncio
+    async def test_fold_triplicated_tree(self, repo):
+        """The migration removes view copies, restores orphans and regenerates indexes."""
+        decisions_dir = repo / "data" / "decisions"
+        legacy = [
+            ('2026-02-26', 'cto', 'a1', True),
+            ('2026-02-27', 'cfo', 'b2', True),
+            ('2026-02-27', 'cto', 'c3', False)
+        ]
+        for date_str, role, decision_id, has_main in legacy:
+            name = f"{date_str}-{role}-{decision_id}.json"
+            record = json.dumps({'id': decision_id, 'executive_role': role.upper(),
+                                 'timestamp': f"{date_str}T10:00:00Z", 'user_id': 'exec-1'})
+            paths = [decisions_dir / "by-role" / role / name, decisions_dir / "by-date" / date_str / name]
+            if has_main:
+                paths.append(decisions_dir / name)
+            for path in paths:
+                path.parent.mkdir(parents=True, exist_ok=True)
+                path.write_text(record)
+        subprocess.run(['git', '-C', str(repo), 'add', '.'], check=True)
+        subprocess.run(['git', '-C', str(repo), 'commit', '-q', '-m', 'legacy'], check=True)
+
+        manager = GitPersistenceManager(str(repo))
+        assert not manager.decision_views.authoritative
+
+        stats = await manager.fold_triplicated_decisions()
+
+        assert stats == {'removed': 5, 'restored': 1, 'indexed': 3}
+        assert manager.decision_views.authoritative
+        assert sorted(path.name for path in decisions_dir.rglob("*.json")) == [
+            "2026-02-26-cto-a1.json", "2026-02-27-cfo-b2.json", "2026-02-27-cto-c3.json"
+        ]
+        assert _git(repo, 'status', '--porcelain', 'data/decisions') == ""
+
+        cto = await manager.get_decision_history({'executive_role': 'cto'})
+        assert [decision['id'] for decision in cto] == ['c3', 'a1']
+
+
+def _write_decisions(manager, days=5, per_day=3):
+    """Write single-copy decision files spread over several days, with their views."""
+    decisions = []
+    for day in range(1, days + 1):
+        for number in range(per_day):
+            role = ('cto', 'cfo', 'ciso')[number % 3]
+            decision = {
+                'id': f"d{day:02d}{number}", 'executive_role': role.upper(), 'user_id': f"exec-{number % 2}",
+                'decision_type': 'strategy', 'timestamp': f"2026-03-{day:02d}T{10 + number}:00:00Z"
+            }
+            manager._write_decision(decision)
+            decisions.append(decision)
+    return sorted(decisions, key=lambda decision: decision['timestamp'], reverse=True)
+
+
+class TestDecisionHistoryPagination:
+    """Test the streaming, cursor-paginated decision history API."""
+
+    @pytest.mark.asyncio
+    async def test_pages_resume_from_cursor(self, repo):
+        """Paging with cursors walks the whole history newest first, exactly once."""
+        manager = GitPersistenceManager(str(repo))
+        expected = _write_decisions(manager)
+
+        collected, cursor = [], None
+        while True:
+            page = await manager.get_decision_page(cursor=cursor, page_size=4)
+            collected += page['decisions']
+            cursor = page['next_cursor']
+            if cursor is None:
+                break
+
+        assert [decision['id'] for decision in collected] == [decision['id'] for decision in expected]
+
+        cto_page = await manager.get_decision_page({'executive_role': 'cto', 'user_id': 'exec-0'}, page_size=2)
+        assert [decision['id'] for decision in cto_page['decisions']] == ['d050', 'd040']
+        next_page = await manager.get_decision_page({'executive_role': 'cto'}, cursor=cto_page['next_cursor'])
+        assert [decision['id'] for decision in next_page['decisions']] == ['d030', 'd020', 'd010']
+
+    @pytest.mark.asyncio
+    async def test_latest_page_reads_only_newest_days(self, repo, monkeypatch):
+        """Filling a short page stops reading once the newest days cover it."""
+        manager = GitPersistenceManager(str(repo))
+        _write_decisions(manager, days=10)
+
+        reads = []
+        original_read_text = type(manager.decisions_dir).read_text
+
+        def counting_read_text(path, *args, **kwargs):
+            if path.suffix == '.json':
+                reads.append(path.name)
+            return original_read_text(path, *args, **kwargs)
+
+        monkeypatch.setattr(type(manager.decisions_dir), "read_text", counting_read_text)
+
+        latest = await manager.get_decision_history({'limit': 3})
+        assert [decision['id'] for decision in latest] == ['d102', 'd101', 'd100']
+        assert len(reads) == 3
+
+        reads.clear()
+        window = await manager.get_decision_history({
+            'date_range': {'start': '2026-03-04T00:00:00Z', 'end': '2026-03-05T10:30:00Z'}
+        })
+        assert [decision['id'] for decision in window] == ['d050', 'd042', 'd041', 'd040']
+        assert len(reads) == 6
+
+    @pytest.mark.asyncio
+    async def test_user_filter_reads_only_user_views(self, repo, monkeypatch):
+        """User filters are pushed down to the by-user views, alone or intersected with a role."""
+        manager = GitPersistenceManager(str(repo))
+        _write_decisions(manager)
+
+        reads = []
+        original_read_text = type(manager.decisions_dir).read_text
+
+        def counting_read_text(path, *args, **kwargs):
+            if path.suffix == '.json':
+                reads.append(path.name)
+            return original_read_text(path, *args, **kwargs)
+
+        monkeypatch.setattr(type(manager.decisions_dir), "read_text", counting_read_text)
+
+        mine = await manager.get_decision_history({'user_id': 'exec-1'})
+        assert [decision['id'] for decision in mine] == ['d051', 'd041', 'd031', 'd021', 'd011']
+        assert len(reads) == 5
+
+        reads.clear()
+        assert await manager.get_decision_history({'user_id': 'exec-1', 'executive_role': 'cto'}) == []
+        assert reads == []
+
+
+class TestAnalyticsRollups:
+    """Test incremental daily analytics rollups."""
+
+    @pytest.mark.asyncio
+    async def test_persisted_decisions_update_rollups(self, repo):
+        """Analytics come from daily rollups maintained at persist time."""
+        manager = GitPersistenceManager(str(repo))
+        assert manager.analytics_rollups.complete
+
+        await manager.persist_decision(_decision('cto', confidence=0.82))
+        await manager.persist_decision(_decision('cto', decision_type='budget', confidence=0.9))
+        await manager.persist_decision(_decision('cfo', decision_type='budget', confidence=0.71))
+
+        tracked = _git(repo, 'ls-files', 'data/analytics/rollups').split()
+        assert "data/analytics/rollups/.complete" in tracked and len(tracked) == 2
+
+        analytics = await manager.generate_analytics()
+        assert analytics['total_decisions'] == 3
+        assert analytics['decisions_by_role'] == {'cto': 2, 'cfo': 1}
+        assert analytics['confidence_metrics']['average'] == pytest.approx((0.82 + 0.9 + 0.71) / 3)
+        assert analytics['confidence_metrics']['distribution'] == {'0.8': 1, '0.9': 1, '0.7': 1}
+        assert analytics['most_active_areas'][0] == ('budget', 2)
+
+    @pytest.mark.asyncio
+    async def test_range_reads_only_edge_days(self, repo, monkeypatch):
+        """Fully covered days come from rollups; only partial edge days read decisions."""
+        decisions = _write_decisions(GitPersistenceManager(str(repo)), days=10)
+        (repo / "data" / "analytics" / "rollups" / ".complete").unlink()
+
+        # A tree with decisions but no rollups scans until backfilled
+        manager = GitPersistenceManager(str(repo))
+        assert not manager.analytics_rollups.complete
+
+        time_range = {'start': '2026-03-02T11:00:00Z', 'end': '2026-03-09T23:59:59.999999Z'}
+        scanned = await manager.generate_analytics(time_range)
+
+        assert await manager.backfill_analytics() == len(decisions)
+        assert manager.analytics_rollups.complete
+
+        history_calls = []
+        original = manager.get_decision_history
+
+        async def tracked_history(filters=None):
+            history_calls.append(filters)
+            return await original(filters)
+
+        monkeypatch.setattr(manager, "get_decision_history", tracked_history)
+        rolled_up = await manager.generate_analytics(time_range)
+
+        assert rolled_up['total_decisions'] == scanned['total_decisions'] == 23
+        assert rolled_up['decisions_by_role'] == scanned['decisions_by_role']
+        assert len(history_calls) == 1
+
+
+class TestColumnarExport:
+    """Test the month-partitioned columnar decision export."""
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("export_format", ["npz", "parquet"])
+    async def test_export_and_vectorized_read(self, repo, export_format):
+        """Decisions export to monthly partitions that read back as NumPy columns."""
+        np = pytest.importorskip("numpy")
+        if export_format == "parquet":
+            pytest.importorskip("pyarrow")
+
+        manager = GitPersistenceManager(str(repo))
+        manager.columnar_export = ColumnarDecisionExport(manager.analytics_dir / "columnar", export_format)
+        _write_decisions(manager, days=4)
+        february = {'id': 'f01', 'executive_role': 'CFO', 'decision_type': 'budget', 'user_id': 'exec-9',
+                    'timestamp': '2026-02-28T09:00:00Z', 'confidence': 0.5}
+        manager._write_decision(february)
+        await manager.backfill_analytics()
+
+        partitions = await manager.export_columnar()
+        assert [path.name for path in partitions] == [f"2026-02.{export_format}", f"2026-03.{export_format}"]
+        assert await manager.export_columnar() == []
+
+        columns = manager.load_decision_columns(start_month="2026-03")
+        assert len(columns['id']) == 12
+        assert np.all(np.diff(columns['timestamp'].astype('int64')) > 0)
+        assert int(np.sum(columns['executive_role'] == 'CTO')) == 4
+        assert np.isnan(columns['confidence']).all()
+
+        everything = manager.load_decision_columns()
+        assert everything['id'][0] == 'f01' and everything['confidence'][0] == 0.5
+
+        await manager.persist_decision(_decision())
+        assert [path.name for path in await manager.export_columnar()] == [
+            f"{datetime.datetime.utcnow():%Y-%m}.{export_format}"
+        ]
+
+
+class TestNonBlockingIO:
+    """Test that blocking file I/O stays off the event loop."""
+
+    @pytest.mark.asyncio
+    async def test_event_loop_stays_responsive_during_large_scan(self, repo):
+        """A full history scan over thousands of files does not stall other coroutines."""
+        manager = GitPersistenceManager(str(repo), io_workers=2)
+        for day in range(1, 31):
+            for number in range(100):
+                decision = {
+                    'id': f"s{day:02d}{number:03d}", 'executive_role': 'CTO', 'user_id': 'exec-1',
+                    'decision_type': 'strategy', 'analysis': {'notes': ['x' * 64] * 20},
+                    'timestamp': f"2026-04-{day:02d}T10:{number % 60:02d}:00Z"
+                }
+                manager._write_decision(decision)
+
+        lags = []
+        scanning = True
+
+        async def ticker():
+            while scanning:
+                started = time.perf_counter()
+                await asyncio.sleep(0.005)
+                lags.append(time.perf_counter() - started - 0.005)
+
+        ticker_task = asyncio.ensure_future(ticker())
+        await asyncio.sleep(0)
+        started = time.perf_counter()
+        history = await manager.get_decision_history()
+        scan_time = time.perf_counter() - started
+        scanning = False
+        await ticker_task
+        await manager.close()
+
+        assert len(history) == 3000
+        assert len(lags) > 5
+        assert max(lags) < 0.05, f"event loop stalled {max(lags):.3f}s during a {scan_time:.3f}s scan"
+
+
+class TestUserContextStore:
+    """Test the write-coalescing user context cache."""
+
+    @pytest.mark.asyncio
+    async def test_burst_costs_one_context_write_per_flush(self, repo):
+        """A burst of decisions merges into the cached context and is written once on flush."""
+        manager = GitPersistenceManager(str(repo), context_flush_interval=60)
+        context_path = manager.contexts_dir / "users" / "exec-1.json"
+
+        for _ in range(20):
+            last = await manager.persist_decision(_decision())
+
+        assert not context_path.exists()
+        assert manager.user_contexts.writes == 0
+        context = await manager.get_user_context('exec-1')
+        assert (context['decision_count'], context['last_decision']) == (20, last)
+
+        await manager.flush_commits()
+        assert manager.user_contexts.writes == 1
+        assert json.loads(context_path.read_text())['decision_count'] == 20
+        assert _git_log(repo)[0].startswith("[HeadElf] Update user context: exec-1")
+        assert len(_git_log(repo)) == 21
+        await manager.close()
+
+    @pytest.mark.asyncio
+    async def test_flushes_on_window_size_and_close(self, repo):
+        """Dirty contexts flush when the window closes, when enough users are dirty, and on close."""
+        manager = GitPersistenceManager(str(repo), context_flush_interval=0.05, context_flush_size=3)
+        store = manager.user_contexts
+
+        await manager.update_user_context('exec-1', {'theme': 'dark'})
+        await asyncio.sleep(0.2)
+        assert store.flushes == 1 and store.dirty == set()
+
+        for n in range(2, 5):
+            await manager.update_user_context(f'exec-{n}', {'theme': 'light'})
+        await asyncio.sleep(0)
+        await store.flush()
+        assert store.flushes == 2 and store.writes == 4
+
+        await manager.update_user_context('exec-1', {'theme': 'light'})
+        await manager.update_user_context('exec-1', {'locale': 'en'})
+        await manager.close()
+        stored = json.loads((manager.contexts_dir / "users" / "exec-1.json").read_text())
+        assert (stored['theme'], stored['locale']) == ('light', 'en')
+        assert store.writes == 5
+
+    @pytest.mark.asyncio
+    async def test_update_tokens_released_after_flush_commit(self, tmp_path):
+        """Tokens of cached updates come back only once a flush has written and committed them."""
+        released, committed = [], []
+        failing = [True]
+
+        async def commit(paths, message):
+            assert released == []
+            if failing[0]:
+                return None
+            committed.append(message)
+            return "abc123"
+
+        store = UserContextStore(tmp_path, BlockingIOExecutor(1), commit, flush_interval=60,
+                                 on_written=released.extend)
+        await store.update('exec-1', {'decision_count': 1}, token='t1')
+        await store.update('exec-1', {'decision_count': 2}, token='t2')
+
+        # The exit-time write is not committed, so its updates stay held
+        store.flush_to_disk()
+        assert released == [] and json.loads(store.path('exec-1').read_text())['decision_count'] == 2
+
+        # Neither is a flush whose commit fails
+        await store.update('exec-1', {'decision_count': 3}, token='t3')
+        await store.flush()
+        assert released == [] and store.dirty == {'exec-1'}
+
+        failing[0] = False
+        await store.close()
+        assert committed == ["Update user context: exec-1"]
+        assert released == ['t1', 't2', 't3']
+
+
+class TestCrashRecovery:
+    """Test atomic writes and write-ahead journal recovery."""
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("storage_backend", ["files", "log"])
+    async def test_interrupted_persist_is_replayed_on_startup(self, repo, monkeypatch, storage_backend):
+        """A persist that dies after writing the decision is completed and committed by the next manager."""
+        manager = GitPersistenceManager(str(repo), storage_backend=storage_backend)
+        first = await manager.persist_decision(_decision())
+
+        def crash(decision):
+            raise RuntimeError("simulated crash")
+
+        monkeypatch.setattr(manager.analytics_rollups, "record", crash)
+        with pytest.raises(RuntimeError):
+            await manager.persist_decision(_decision(decision_type='budget', id='crashed-1'))
+        assert len(manager.journal.pending()) == 1
+        await manager.close()
+
+        recovered = GitPersistenceManager(str(repo), storage_backend=storage_backend)
+        history = await recovered.get_decision_history()
+        assert [decision['id'] for decision in history] == ['crashed-1', first]
+        assert (await recovered.get_user_context('exec-1'))['decision_count'] == 2
+        today = history[0]['timestamp'][:10]
+        assert recovered.analytics_rollups.load(today)['decision_types'] == {'technology_strategy': 1, 'budget': 1}
+
+        await recovered.commit_recovered_writes()
+        assert _git_log(repo)[0].startswith("[HeadElf] Recover 1 interrupted persist(s)")
+        assert _git(repo, 'status', '--porcelain', 'data/analytics', 'data/contexts') == ""
+        assert 'crashed-1' not in _git(repo, 'status', '--porcelain', '--untracked-files=all', 'data/decisions')
+        assert list(recovered.journal_dir.glob("*.log")) == [recovered.journal.journal_path]
+
+    @pytest.mark.asyncio
+    async def test_cached_context_updates_survive_killed_writer(self, repo):
+        """A writer killed before its context flush leaves journal entries that restore the counters."""
+        script = """
+import asyncio, os, sys
+from persistence_manager import GitPersistenceManager
+
+async def write(repo):
+    manager = GitPersistenceManager(repo, context_flush_interval=60)
+    for _ in range(3):
+        await manager.persist_decision({'executive_role': 'cto', 'user_id': 'exec-1', 'query': 'q'})
+    os._exit(0)
+
+asyncio.run(write(sys.argv[1]))
+"""
+        env = {**os.environ, 'PYTHONPATH': os.pathsep.join([str(SKILL_EXECUTORS_DIR), os.environ.get('PYTHONPATH', '')])}
+        subprocess.run([sys.executable, '-c', script, str(repo)], check=True, env=env, timeout=60)
+        assert not (repo / "data" / "contexts" / "users" / "exec-1.json").exists()
+
+        recovered = GitPersistenceManager(str(repo), context_flush_interval=60)
+        assert len(await recovered.get_decision_history({'user_id': 'exec-1'})) == 3
+        assert await recovered.get_user_decision_count('exec-1') == 3
+
+        await recovered.persist_decision(_decision())
+        assert await recovered.get_user_decision_count('exec-1') == 4
+        await recovered.close()
+        assert json.loads((recovered.contexts_dir / "users" / "exec-1.json").read_text())['decision_count'] == 4
+        assert not list(recovered.journal_dir.glob("*.log"))
+
+    @pytest.mark.asyncio
+    async def test_torn_appends_are_dropped(self, repo):
+        """Half-written view lines and log records never surface and do not corrupt later appends."""
+        manager = GitPersistenceManager(str(repo), storage_backend="log")
+        await manager.persist_decision(_decision())
+        segment = manager.decision_log.segment_paths()[-1]
+        with open(segment, "ab") as f:
+            f.write(b'{"id": "torn", "timest')
+        index_path = manager.decision_views.date_index_path("2026-03-01")
+        index_path.parent.mkdir(parents=True)
+        index_path.write_text("2026-03-01-cto-a.json\n2026-03-01-ct")
+        manager.decision_log.close()
+
+        reopened = GitPersistenceManager(str(repo), storage_backend="log")
+        assert segment.read_bytes().endswith(b"\n")
+        await reopened.persist_decision(_decision(id='after'))
+        assert [decision['id'] for decision in await reopened.get_decision_history()][0] == 'after'
+        assert reopened.decision_log.count() == 2
+
+        assert reopened.decision_views.date_entries("2026-03-01") == ["2026-03-01-cto-a.json"]
+        reopened.decision_views.add("2026-03-01-cfo-b.json", "cfo", "2026-03-01")
+        assert reopened.decision_views.date_entries("2026-03-01") == ["2026-03-01-cto-a.json", "2026-03-01-cfo-b.json"]
+
+
+def _run_writers(repo, processes, per_process, user_id=""):
+    """Run concurrent writer processes against one repository; returns their reports."""
+    go_file = repo / "go"
+    env = {**os.environ, 'PYTHONPATH': os.pathsep.join([str(SKILL_EXECUTORS_DIR), os.environ.get('PYTHONPATH', '')])}
+    writers = [
+        subprocess.Popen([sys.executable, '-c', WRITER_SCRIPT, str(repo), str(worker), str(per_process), str(go_file), user_id],
+                         stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True, env=env)
+        for worker in range(processes)
+    ]
+    while len(list(repo.glob("go.ready-*"))) < processes:
+        assert all(writer.poll() is None for writer in writers), writers[0].communicate()
+        time.sleep(0.01)
+    go_file.touch()
+
+    reports = []
+    for writer in writers:
+        stdout, stderr = writer.communicate(timeout=120)
+        assert writer.returncode == 0, stderr
+        reports.append(json.loads(stdout.strip().splitlines()[-1]))
+    return reports
+
+
+class TestMultiProcessWriters:
+    """Test commits from several processes sharing one data/ repository."""
+
+    def test_concurrent_writer_processes(self, tmp_path):
+        """Every decision from every writer process lands in its own commit, and throughput holds up."""
+        per_process = 8
+        throughput = {}
+        for processes in (1, 2, 4):
+            repo = _init_repo(tmp_path / f"repo-{processes}")
+            reports = _run_writers(repo, processes, per_process)
+
+            assert sum(report['failed'] for report in reports) == 0
+            subjects = _git_log(repo)
+            assert len(subjects) == processes * per_process
+            assert all(" decision: strategy" in subject for subject in subjects)
+            assert _git(repo, 'status', '--porcelain', 'data/analytics', 'data/contexts') == ""
+            rollup = json.loads(next((repo / "data" / "analytics" / "rollups").glob("*.json")).read_text())
+            assert rollup['total'] == processes * per_process
+
+            elapsed = max(report['finished'] for report in reports) - min(report['started'] for report in reports)
+            throughput[processes] = processes * per_process / elapsed
+
+        print(f"writer throughput (decisions/s by process count): "
+              + ", ".join(f"{processes}: {rate:.1f}" for processes, rate in throughput.items()))
+        # Commits serialize, but the rest of each persist overlaps across processes
+        assert throughput[4] >= 0.5 * throughput[1]
+
+    def test_writer_processes_sharing_a_user(self, tmp_path):
+        """Writer processes persisting for one user never lose a decision count update."""
+        repo = _init_repo(tmp_path / "repo")
+        reports = _run_writers(repo, 4, 10, user_id="shared")
+
+        assert sum(report['failed'] for report in reports) == 0
+        decision_files = list(GitPersistenceManager(str(repo)).decision_layout.all_files())
+        context = json.loads((repo / "data" / "contexts" / "users" / "shared.json").read_text())
+        assert len(decision_files) == 40
+        assert context['decision_count'] == len(decision_files)
+
+
+class TestPartitionedLayout:
+    """Test the year/month/day/shard decision layout and its migrator."""
+
+    @pytest.mark.asyncio
+    async def test_history_lists_only_needed_partitions(self, repo, monkeypatch):
+        """Decisions land in day partitions, and the newest page lists only the newest day."""
+        manager = GitPersistenceManager(str(repo))
+        _write_decisions(manager, days=10)
+        decision_id = await manager.persist_decision(_decision())
+
+        relative = manager.decision_layout.find(decision_id).relative_to(manager.decisions_dir).parts
+        assert len(relative) == 5 and relative[-1].endswith(f"-{decision_id}.json")
+
+        listed = []
+        original_day_files = manager.decision_layout.day_files
+
+        def counting_day_files(day_dir):
+            listed.append(day_dir)
+            return original_day_files(day_dir)
+
+        monkeypatch.setattr(manager.decision_layout, "day_files", counting_day_files)
+        latest = await manager.get_decision_history({'limit': 4})
+        assert [decision['id'] for decision in latest] == [decision_id, 'd102', 'd101', 'd100']
+        assert len(listed) == 2
+
+        listed.clear()
+        assert manager.decision_layout.days('2026-03-04', '2026-03-05') == ['2026-03-05', '2026-03-04']
+        page = await manager.get_decision_page(cursor=encode_cursor({'timestamp': '2026-03-03T00:00:00Z', 'id': ''}))
+        assert [decision['id'] for decision in page['decisions']] == ['d022', 'd021', 'd020', 'd012', 'd011', 'd010']
+        assert [day_dir.name for day_dir in listed] == ['03', '02', '01']
+
+    @pytest.mark.asyncio
+    async def test_online_migration_from_flat_layout(self, repo):
+        """Flat files move into partitions in committed batches while reads keep working."""
+        manager = GitPersistenceManager(str(repo))
+        for day in range(1, 6):
+            decision = {'id': f"m{day}", 'executive_role': 'CTO', 'user_id': 'exec-1',
+                        'timestamp': f"2026-01-{day:02d}T09:00:00Z"}
+            name = f"2026-01-{day:02d}-cto-m{day}.json"
+            (manager.decisions_dir / name).write_text(json.dumps(decision))
+            manager.decision_views.add(name, 'cto', decision['timestamp'][:10])
+        subprocess.run(['git', '-C', str(repo), 'add', '.'], check=True)
+        subprocess.run(['git', '-C', str(repo), 'commit', '-q', '-m', 'flat layout'], check=True)
+        expected = ['m5', 'm4', 'm3', 'm2', 'm1']
+
+        # A partly migrated tree still answers through the old view entries
+        assert len(manager.decision_layout.migrate(limit=2)) == 2
+        cto = await manager.get_decision_history({'executive_role': 'cto'})
+        assert [decision['id'] for decision in cto] == expected
+        subprocess.run(['git', '-C', str(repo), 'add', '-A', 'data/decisions'], check=True)
+        subprocess.run(['git', '-C', str(repo), 'commit', '-q', '-m', 'first batch'], check=True)
+
+        assert await manager.migrate_decision_layout(batch_size=2) == 3
+        assert _git_log(repo)[:3] == [
+            "[HeadElf] Point 6 decision view(s) at partitioned layout",
+            "[HeadElf] Migrate 1 decisions to partitioned layout",
+            "[HeadElf] Migrate 2 decisions to partitioned layout"
+        ]
+        assert not list(manager.decision_layout.flat_files())
+        assert all("/" in entry for entry in manager.decision_views.role_entries('cto'))
+        assert [decision['id'] for decision in await manager.get_decision_history()] == expected
+        assert [decision['id'] for decision in await manager.get_decision_history({'executive_role': 'cto'})] == expected
+        assert (await manager.get_decision_at('m3'))['id'] == 'm3'
+        assert _git(repo, 'status', '--porcelain', '--', 'data/decisions/2026') == ""
+
+
+class TestDecisionIds:
+    """Test time-ordered decision ids and the id-ordered history walk."""
+
+    def test_ids_sort_in_issue_order_across_threads(self):
+        """Ids from concurrent threads are unique and increase, even when the clock stalls or steps back."""
+        now = [1_780_000_000_000]
+        generator = MonotonicIdGenerator(clock=lambda: now[0])
+        issued = {worker: [] for worker in range(4)}
+
+        def issue(worker):
+            for _ in range(250):
+                issued[worker].append(generator.new_id())
+
+        threads = [threading.Thread(target=issue, args=(worker,)) for worker in issued]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        all_ids = [decision_id for ids in issued.values() for decision_id in ids]
+        assert len(set(all_ids)) == 1000
+        assert all(ids == sorted(ids) for ids in issued.values())
+
+        last = max(all_ids)
+        now[0] -= 5000
+        stepped_back = generator.new_id()
+        now[0] += 10000
+        assert last < stepped_back < generator.new_id()
+        assert decision_id_ms(stepped_back) == 1_780_000_000_000
+
+    @pytest.mark.asyncio
+    async def test_latest_page_reads_newest_ids_only(self, repo, monkeypatch):
+        """A day of time-ordered ids is paged by file name, reading one chunk per page."""
+        manager = GitPersistenceManager(str(repo))
+        generator = MonotonicIdGenerator(clock=iter(range(1_780_000_000_000, 1_780_000_000_060)).__next__)
+        written = []
+        for number in range(60):
+            decision_id = generator.new_id()
+            decision = {'id': decision_id, 'executive_role': ('CTO', 'CFO', 'CISO')[number % 3],
+                        'user_id': 'exec-1', 'timestamp': decision_id_time(decision_id).isoformat() + "Z"}
+            manager._write_decision(decision)
+            written.append(decision_id)
+        newest_first = written[::-1]
+
+        reads = []
+        original_read_text = type(manager.decisions_dir).read_text
+
+        def counting_read_text(path, *args, **kwargs):
+            if path.suffix == '.json':
+                reads.append(path.name)
+            return original_read_text(path, *args, **kwargs)
+
+        monkeypatch.setattr(type(manager.decisions_dir), "read_text", counting_read_text)
+
+        page = await manager.get_decision_page(page_size=3)
+        assert [decision['id'] for decision in page['decisions']] == newest_first[:3]
+        assert len(reads) == 20
+
+        reads.clear()
+        next_page = await manager.get_decision_page(cursor=page['next_cursor'], page_size=3)
+        assert [decision['id'] for decision in next_page['decisions']] == newest_first[3:6]
+        assert reads[0].endswith(f"-{newest_first[3]}.json") and len(reads) == 20
+
+        cto = await manager.get_decision_history({'executive_role': 'cto'})
+        assert [decision['id'] for decision in cto] == newest_first[2::3]
+        assert [decision['id'] for decision in await manager.get_decision_history()] == newest_first
+
+        decision_id = await manager.persist_decision(_decision())
+        assert manager.decision_layout.find(decision_id).name.endswith(f"-{decision_id}.json")
+        stored = await manager.get_decision_at(decision_id)
+        assert stored['timestamp'].startswith(decision_id_time(decision_id).isoformat()[:23])
@@ -0,0 +1,371 @@
+#!/usr/bin/env python3
+"""
+Skill Registry Testing Framework
+
+Unit tests for HeadElf skill registration, discovery and loading modes.
+"""
+
+import pytest
+from pathlib import Path
+
+from skills import HeadElfSkillRegistry, SkillInfo
+from skills.query_cache import QueryResultCache
+from skills.skill_search import SkillSearchIndex
+from skills.skill_triggers import TriggerAutomaton
+
+
+class TestSkillRegistry:
+    """Test suite for the HeadElf skill registry."""
+
+    def setup_method(self):
+        """Setup for each test method."""
+        self.headelf_root = Path(__file__).parent.parent
+
+    def test_lazy_registry_defers_content_loading(self):
+        """Lazy registries hold descriptors until content is requested."""
+        registry = HeadElfSkillRegistry(lazy=True)
+
+        assert len(registry.get_all_skills()) >= 40
+        for skill_info in registry.get_all_skills().values():
+            assert isinstance(skill_info, SkillInfo)
+            assert not skill_info.content_loaded
+            assert not skill_info.module_loaded
+
+        skill_info = registry.get_all_skills()["headelf-executive-cto-intelligence"]
+        assert skill_info["size"] > 0
+        assert skill_info["has_content"] is True
+        assert not skill_info.content_loaded
+
+        assert "CTO" in skill_info["content"]
+        assert skill_info.content_loaded
+
+    def test_lazy_registry_matches_eager_registry(self):
+        """Lazy and eager registries expose the same skills and records."""
+        eager = HeadElfSkillRegistry()
+        lazy = HeadElfSkillRegistry(lazy=True)
+
+        assert list(eager.get_all_skills()) == list(lazy.get_all_skills())
+        assert eager.get_skill_summary() == lazy.get_skill_summary()
+
+        for skill_id, eager_info in eager.get_all_skills().items():
+            assert dict(lazy.get_all_skills()[skill_id]) == eager_info
+
+    def test_lazy_routing_imports_only_routing_modules(self):
+        """Routing a query in a lazy registry imports only modules defining routing functions."""
+        registry = HeadElfSkillRegistry(lazy=True)
+        skills = registry.get_all_skills()
+
+        assert skills["headelf-executive-cto-intelligence"]["has_module"] is True
+        assert not any(skill_info.module_loaded for skill_info in skills.values())
+
+        registry.find_skill_by_query("technology strategy")
+        loaded = {skill_id for skill_id, skill_info in skills.items() if skill_info.module_loaded}
+        assert loaded == {"headelf-executive-cto-intelligence"}
+
+    def _make_skill_tree(self, root: Path) -> Path:
+        """Create a small synthetic skills directory."""
+        for category, names in {
+            "executive": ["cto-intelligence", "cfo-intelligence"],
+            "industry": ["construction", "government", "retail-trade"],
+        }.items():
+            for name in names:
+                skill_dir = root / category / name
+                skill_dir.mkdir(parents=True)
+                (skill_dir / "skill.md").write_text(f"# {name}\n\nSkill guidance for {name}.\n")
+        (root / "industry" / "government" / "metadata.yml").write_text(
+            "name: Government Intelligence\ntriggers:\n  keywords:\n    - public sector\n"
+        )
+        return root
+
+    def test_manifest_reused_on_unchanged_tree(self, tmp_path):
+        """A current manifest replaces the directory walk on later starts."""
+        skills_dir = self._make_skill_tree(tmp_path / "skills")
+        manifest_path = tmp_path / "cache" / "manifest.json"
+
+        first = HeadElfSkillRegistry(lazy=True, skills_dir=skills_dir, manifest_path=manifest_path)
+        assert manifest_path.exists()
+        assert first.manifest.rebuilt == 5
+
+        second = HeadElfSkillRegistry(lazy=True, skills_dir=skills_dir, manifest_path=manifest_path)
+        assert second.manifest.rebuilt == 0
+        assert second.manifest.reused == 5
+        assert list(second.get_all_skills()) == list(first.get_all_skills())
+        assert second.get_skill_summary() == first.get_skill_summary()
+
+        metadata = second.get_skill_metadata("headelf-industry-government")
+        assert metadata["triggers"]["keywords"] == ["public sector"]
+
+    def test_manifest_rebuilds_only_changed_skills(self, tmp_path):
+        """Edited, added and removed skill directories are picked up incrementally."""
+        skills_dir = self._make_skill_tree(tmp_path / "skills")
+        manifest_path = tmp_path / "manifest.json"
+        HeadElfSkillRegistry(skills_dir=skills_dir, manifest_path=manifest_path)
+
+        (skills_dir / "industry" / "construction" / "skill.md").write_text("# construction\n\nRevised.\n")
+        new_skill = skills_dir / "industry" / "manufacturing"
+        new_skill.mkdir()
+        (new_skill / "skill.md").write_text("# manufacturing\n")
+        (skills_dir / "industry" / "retail-trade" / "skill.md").unlink()
+
+        registry = HeadElfSkillRegistry(skills_dir=skills_dir, manifest_path=manifest_path)
+        assert registry.manifest.rebuilt == 2
+        assert registry.manifest.reused == 3
+        assert "headelf-industry-manufacturing" in registry.get_industry_skills()
+        assert "headelf-industry-retail-trade" not in registry.get_industry_skills()
+        assert "Revised" in registry.get_all_skills()["headelf-industry-construction"]["content"]
+
+    def test_search_index_ranks_multi_term_queries(self):
+        """BM25 ranking favors skills matching more, and rarer, query terms."""
+        index = SkillSearchIndex.build([
+            ("cloud", "Cloud Platform", "Cloud migration strategy for platform teams."),
+            ("finance", "Finance", "Budget planning and capital allocation strategy."),
+            ("security", "Security", "Threat modeling and incident response."),
+        ])
+
+        scores = index.rank("cloud migration strategy")
+        assert max(scores, key=scores.get) == "cloud"
+        assert 0.5 < scores["cloud"] < 1.0
+        assert 0.0 < scores["finance"] < 0.5
+        assert "security" not in scores
+        assert index.rank("unrelated quantum query") == {}
+
+    def test_find_skill_by_query_uses_search_index(self, skill_registry):
+        """Registry queries are served from one index built per registry."""
+        matches = skill_registry.find_skill_by_query("cto technology strategy")
+
+        assert matches[0]["skill"]["id"] == "headelf-executive-cto-intelligence"
+        assert all(match["score"] > 0.5 for match in matches)
+        assert skill_registry.get_search_index() is skill_registry.get_search_index()
+        assert skill_registry.find_skill_by_query("zzyzx") == []
+
+    def test_unrelated_query_matches_no_skill(self, skill_registry):
+        """Sharing a stray term with some skill does not make a query relevant to it."""
+        assert skill_registry.get_search_index().rank("banana smoothie recipe")
+        assert skill_registry.find_skill_by_query("banana smoothie recipe") == []
+
+    def _load_cto_module(self):
+        """Load the CTO skill module directly from its directory."""
+        import importlib.util
+        module_path = self.headelf_root / "skills/executive/cto-intelligence/__init__.py"
+        spec = importlib.util.spec_from_file_location("cto_intelligence_skill", module_path)
+        module = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(module)
+        return module
+
+    def test_trigger_automaton_agrees_with_skill_matches(self):
+        """One automaton pass reproduces each module's skill_matches score."""
+        cto_module = self._load_cto_module()
+        automaton = TriggerAutomaton.build(
+            ("cto", trigger, weight) for trigger, weight in cto_module.get_weighted_triggers()
+        )
+
+        queries = [
+            "Develop a technology strategy for our AI platform",
+            "Should our CTO weigh in?",
+            "Plan the M&A technology integration",
+            "Evaluate this startup investment",
+            "R&D budget review",
+            "Quarterly payroll run",
+            ""
+        ]
+        for query in queries:
+            assert automaton.match(query).get("cto", 0.0) == cto_module.skill_matches(query)
+
+    def test_trigger_automaton_routes_across_skills(self):
+        """Overlapping triggers from several skills resolve in a single pass."""
+        automaton = TriggerAutomaton.build([
+            ("cto", "technology strategy", 0.9),
+            ("cto", "strategy", 0.5),
+            ("cfo", "capital", 0.85),
+            ("vc", "venture capital", 0.95),
+        ])
+
+        scores = automaton.match("Venture Capital and technology strategy")
+        assert scores == {"cto": 0.9, "cfo": 0.85, "vc": 0.95}
+        assert automaton.match("payroll") == {}
+
+    def test_registry_routes_through_trigger_automaton(self):
+        """Registry queries score skill modules through the compiled automaton."""
+        registry = HeadElfSkillRegistry()
+        registry.get_all_skills()["headelf-executive-cto-intelligence"]["module"] = self._load_cto_module()
+
+        assert "headelf-executive-cto-intelligence" in registry.get_trigger_automaton().skill_ids
+        matches = registry.find_skill_by_query("chief technology officer")
+        assert matches[0]["skill"]["id"] == "headelf-executive-cto-intelligence"
+        assert matches[0]["score"] >= 0.95
+
+    def test_registry_scores_agree_with_skill_matches(self):
+        """Weighted triggers are compiled; every other module keeps its own skill_matches score."""
+        import types
+        registry = HeadElfSkillRegistry()
+        cto_module = self._load_cto_module()
+        scanned = []
+
+        def skill_matches(query):
+            scanned.append(query)
+            return 0.9
+
+        unweighted = types.SimpleNamespace(get_skill_triggers=lambda: ["public sector"], skill_matches=skill_matches)
+        undeclared = types.SimpleNamespace(skill_matches=lambda query: 0.7)
+        registry.get_all_skills()["headelf-executive-cto-intelligence"]["module"] = cto_module
+        registry.get_all_skills()["headelf-industry-government"]["module"] = unweighted
+        registry.get_all_skills()["headelf-industry-construction"]["module"] = undeclared
+
+        automaton = registry.get_trigger_automaton()
+        assert automaton.skill_ids == {"headelf-executive-cto-intelligence"}
+
+        query = "public sector venture capital"
+        scores = {match["skill"]["id"]: match["score"] for match in registry.find_skill_by_query(query)}
+        assert scores["headelf-executive-cto-intelligence"] == cto_module.skill_matches(query)
+        assert scores["headelf-industry-government"] == 0.9
+        assert scores["headelf-industry-construction"] == 0.7
+        assert scanned == [query]
+
+    def test_query_cache_lru_and_ttl(self):
+        """Results are keyed on normalized text, bounded, and expire."""
+        now = [0.0]
+        cache = QueryResultCache(maxsize=2, ttl=10.0, clock=lambda: now[0])
+
+        cache.put("CTO  Strategy", ["cto"])
+        assert cache.get("cto strategy") == ["cto"]
+        cache.put("cfo", ["cfo"])
+        cache.get("cto strategy")
+        cache.put("ciso", ["ciso"])
+        assert cache.get("cfo") is None
+        assert cache.get("ciso") == ["ciso"]
+
+        now[0] = 11.0
+        assert cache.get("ciso") is None
+
+        stats = cache.get_stats()
+        assert (stats["hits"], stats["misses"], stats["evictions"]) == (3, 2, 1)
+
+    def test_registry_query_cache_invalidated_on_reload(self, tmp_path):
+        """Reloading a skill drops cached rankings so edits are visible."""
+        skills_dir = self._make_skill_tree(tmp_path / "skills")
+        registry = HeadElfSkillRegistry(skills_dir=skills_dir)
+
+        assert registry.find_skill_by_query("geothermal") == []
+        assert registry.find_skill_by_query("Geothermal ") == []
+        assert registry.get_query_cache_stats()["hits"] == 1
+
+        (skills_dir / "industry" / "construction" / "skill.md").write_text("# construction\n\nGeothermal piling.\n")
+        assert registry.reload_skill("headelf-industry-construction")
+
+        matches = registry.find_skill_by_query("geothermal")
+        assert [match["skill"]["id"] for match in matches] == ["headelf-industry-construction"]
+        stats = registry.get_query_cache_stats()
+        assert stats["invalidations"] == 1
+        assert stats["misses"] == 2
+
+    def test_refresh_reloads_only_changed_skills(self, tmp_path):
+        """Added, removed and edited skills are applied without a full rebuild."""
+        skills_dir = self._make_skill_tree(tmp_path / "skills")
+        registry = HeadElfSkillRegistry(lazy=True, skills_dir=skills_dir)
+        industry_view = registry.get_industry_skills()
+        untouched = registry.get_all_skills()["headelf-industry-government"]
+        assert registry.find_skill_by_query("geothermal") == []
+
+        (skills_dir / "industry" / "construction" / "skill.md").write_text("# construction\n\nGeothermal piling.\n")
+        new_skill = skills_dir / "industry" / "mining"
+        new_skill.mkdir()
+        (new_skill / "skill.md").write_text("# mining\n\nGeothermal exploration.\n")
+        (skills_dir / "industry" / "retail-trade" / "skill.md").unlink()
+
+        changes = registry.refresh()
+        assert changes == {
+            "added": ["headelf-industry-mining"],
+            "removed": ["headelf-industry-retail-trade"],
+            "modified": ["headelf-industry-construction"]
+        }
+        assert registry.get_all_skills()["headelf-industry-government"] is untouched
+        assert industry_view is registry.get_industry_skills()
+        assert list(industry_view) == list(HeadElfSkillRegistry(skills_dir=skills_dir).get_industry_skills())
+
+        matches = registry.find_skill_by_query("geothermal")
+        assert {match["skill"]["id"] for match in matches} == {
+            "headelf-industry-construction", "headelf-industry-mining"
+        }
+        assert registry.refresh() == {"added": [], "removed": [], "modified": []}
+
+        # Repeated removals leave no dead slots behind in the record arrays
+        for _ in range(3):
+            (new_skill / "skill.md").rename(new_skill / "skill.md.off")
+            registry.refresh()
+            (new_skill / "skill.md.off").rename(new_skill / "skill.md")
+            registry.refresh()
+        assert len(registry._store.records) == len(registry._store.groups) == len(registry.get_all_skills())
+        assert None not in registry._store.records
+        assert "Geothermal" in registry.get_all_skills()["headelf-industry-mining"]["content"]
+
+    def test_search_index_updates_in_place(self):
+        """Removing and re-adding documents keeps postings and lengths consistent."""
+        index = SkillSearchIndex.build([
+            ("a", "Alpha", "shared alpha terms"),
+            ("b", "Beta", "shared beta terms"),
+        ])
+        index.add("a", "Alpha", "rewritten gamma")
+        index.remove("b")
+
+        assert len(index) == 1
+        assert "shared" not in index.postings
+        assert list(index.rank("gamma")) == ["a"]
+        assert index.search("beta") == {}
+
+    def test_parallel_loading_is_deterministic(self):
+        """Thread-pool loads register the same skills, records and order."""
+        serial = HeadElfSkillRegistry()
+        parallel = HeadElfSkillRegistry(load_workers=8)
+
+        for serial_map, parallel_map in zip(serial._skill_collections(), parallel._skill_collections()):
+            assert list(serial_map) == list(parallel_map)
+        for skill_id, skill_info in serial.get_all_skills().items():
+            assert parallel.get_all_skills()[skill_id] == skill_info
+
+    def test_skill_records_are_slotted_and_dict_compatible(self):
+        """Records avoid per-skill dicts while category maps keep dict semantics."""
+        registry = HeadElfSkillRegistry()
+        skill_info = registry.get_all_skills()["headelf-executive-cto-intelligence"]
+
+        assert not hasattr(skill_info, "__dict__")
+        assert skill_info["content"] is skill_info.content
+        assert set(dict(skill_info)) == {
+            "id", "name", "category", "directory", "size", "mtime",
+            "has_module", "has_content", "content", "module"
+        }
+
+        executive = registry.get_executive_skills()
+        assert "headelf-executive-cto-intelligence" in executive
+        assert "headelf-industry-construction" not in executive
+        assert executive.get("headelf-industry-construction") is None
+        assert executive["headelf-executive-cto-intelligence"] is skill_info
+        with pytest.raises(KeyError):
+            executive["headelf-industry-construction"]
+
+        total = sum(len(collection) for collection in registry._skill_collections()[1:])
+        assert total <= len(registry.get_all_skills())
+
+    def test_corpus_serves_content_from_shared_mapping(self, tmp_path):
+        """Content is packed once and served as slices of the mapped corpus."""
+        skills_dir = self._make_skill_tree(tmp_path / "skills")
+        corpus_path = tmp_path / "corpus.bin"
+        plain = HeadElfSkillRegistry(skills_dir=skills_dir)
+
+        registry = HeadElfSkillRegistry(skills_dir=skills_dir, corpus_path=corpus_path)
+        assert corpus_path.exists()
+        for skill_id, skill_info in registry.get_all_skills().items():
+            assert skill_info.content_mapped
+            assert not skill_info.content_loaded
+            assert skill_info["content"] == plain.get_all_skills()[skill_id]["content"]
+
+        with registry.corpus.get_bytes("headelf-industry-government") as view:
+            assert bytes(view).startswith(b"# government")
+
+        # A second worker reuses the packed file without rewriting it
+        mtime = corpus_path.stat().st_mtime_ns
+        HeadElfSkillRegistry(lazy=True, skills_dir=skills_dir, corpus_path=corpus_path)
+        assert corpus_path.stat().st_mtime_ns == mtime
+
+        (skills_dir / "industry" / "construction" / "skill.md").write_text("# construction\n\nRevised.\n")
+        registry.refresh()
+        assert "Revised" in registry.get_all_skills()["headelf-industry-construction"]["content"]